@@ -0,0 +1,95 @@
+"""
+Regroupement dynamique des requêtes
+Les requêtes HTTP concurrentes sont accumulées dans une file puis
+résolues ensemble, en parallèle, par lots
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+
+class AsyncBatcher:
+    """
+    Accumule jusqu'à max_batch_size requêtes pendant au plus max_queue_time
+    secondes, puis les résout en parallèle
+
+    handler: fonction appelée avec le payload de chaque requête ; synchrone,
+    elle est exécutée dans un thread, coroutine, elle est attendue dans la
+    boucle (ex: soumission à un pool de processus via run_in_executor)
+    """
+
+    def __init__(self, handler: Callable[[Any], Any], max_batch_size: int = 16,
+                 max_queue_time: float = 0.01, max_queue_size: int = 256):
+        self.handler = handler
+        self._is_async = asyncio.iscoroutinefunction(handler)
+        self.max_batch_size = max_batch_size
+        self.max_queue_time = max_queue_time
+        self.max_queue_size = max_queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Démarre la tâche de fond (à appeler depuis la boucle asyncio)"""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Arrête la tâche de fond"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def is_overloaded(self) -> bool:
+        """Vrai si la file d'attente dépasse max_queue_size"""
+        return self._queue is not None and self._queue.qsize() > self.max_queue_size
+
+    async def submit(self, payload: Any) -> Any:
+        """Ajoute une requête au prochain lot et attend son résultat"""
+        if self._task is None:
+            # Batcher non démarré : résolution directe
+            return await self._call(payload)
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((payload, future))
+        return await future
+
+    async def _run(self):
+        """Boucle de fond : forme les lots et les résout"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_queue_time
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._dispatch(batch)
+
+    def _call(self, payload: Any) -> Awaitable[Any]:
+        """Résolution d'une requête : la coroutine du handler, ou le handler dans un thread"""
+        if self._is_async:
+            return self.handler(payload)
+        return asyncio.to_thread(self.handler, payload)
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future]]):
+        """Résout toutes les requêtes du lot en parallèle"""
+        results = await asyncio.gather(
+            *[self._call(payload) for payload, _ in batch],
+            return_exceptions=True
+        )
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue  # Client déconnecté
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,57 @@
+"""
+Encodages CNF des contraintes de cardinalité, partagés par les solveurs
+
+Les clauses sont des tableaux NumPy (une ligne par clause) : chaque
+contrainte est construite d'un bloc pour tous les groupes de même taille
+"""
+from functools import lru_cache
+from itertools import combinations
+from typing import Tuple
+
+import numpy as np
+
+# En dessous de cette taille, l'encodage par paires produit moins de clauses
+# que l'échelle (n(n-1)/2 contre 3n-4, sans variable auxiliaire)
+LADDER_MIN_SIZE = 6
+
+
+def clause_rows(*columns) -> np.ndarray:
+    """
+    Assemble des colonnes de littéraux (diffusées entre elles) en un
+    tableau (nb_clauses, nb_littéraux)
+    """
+    columns = np.broadcast_arrays(*columns)
+    return np.stack(columns, axis=-1).reshape(-1, len(columns)).astype(np.int32, copy=False)
+
+
+@lru_cache(maxsize=None)
+def pair_indices(n: int) -> np.ndarray:
+    """Indices (i, j), i < j, des paires de n littéraux (tableau (n(n-1)/2, 2) en lecture seule)"""
+    pairs = np.array(list(combinations(range(n), 2)), dtype=np.intp).reshape(-1, 2)
+    pairs.flags.writeable = False
+    return pairs
+
+
+def at_most_one(lits: np.ndarray, next_var: int) -> Tuple[np.ndarray, int]:
+    """
+    Contrainte "au plus un" sur chaque ligne de lits (groupes de même taille)
+
+    Encodage séquentiel (échelle) : s_i signifie "un des lits[0..i] est vrai",
+    avec les variables auxiliaires s_0..s_{n-2} de chaque groupe numérotées
+    à partir de next_var. O(n) clauses au lieu des O(n²) de l'encodage par paires
+
+    Returns:
+        (clauses binaires (N, 2), nombre de variables auxiliaires utilisées)
+    """
+    nb_groups, n = lits.shape
+    if n < LADDER_MIN_SIZE:
+        pairs = pair_indices(n)  # (calculées une fois par taille)
+        return clause_rows(-lits[:, pairs[:, 0]], -lits[:, pairs[:, 1]]), 0
+
+    s = next_var + np.arange(nb_groups * (n - 1)).reshape(nb_groups, n - 1)
+    clauses = np.concatenate([
+        clause_rows(-lits[:, :-1], s),           # x_i -> s_i
+        clause_rows(-s[:, :-1], s[:, 1:]),       # s_{i-1} -> s_i
+        clause_rows(-s, -lits[:, 1:]),           # s_{i-1} -> ¬x_i
+    ])
+    return clauses, nb_groups * (n - 1)
@@ -0,0 +1,95 @@
+"""
+Pré-solveur Sudoku par propagation de contraintes (à la Norvig)
+La plupart des grilles "faciles" sont résolues par propagation seule,
+sans générer de CNF ni lancer GopherSAT
+
+Les candidats de chaque case sont un masque de bits uint16 (bit d-1 pour
+le chiffre d) : les éliminations deviennent des opérations bit à bit
+vectorisées par NumPy sur les 27 unités à la fois
+"""
+from typing import List, Optional
+
+import numpy as np
+
+# Masque "tous les chiffres possibles" (9 bits)
+ALL_DIGITS = 0x1FF
+
+# BITS[d] : masque du chiffre d + 1
+BITS = (1 << np.arange(9)).astype(np.uint16)
+
+# Tables indexées par un masque (0..511)
+POPCOUNT = np.array([bin(mask).count('1') for mask in range(512)], dtype=np.uint8)
+DIGIT_OF = np.array([mask.bit_length() if POPCOUNT[mask] == 1 else 0
+                     for mask in range(512)], dtype=np.uint8)
+
+# Unités : 9 lignes, 9 colonnes, 9 sous-grilles (indices de cases 0..80)
+_cells = np.arange(81).reshape(9, 9)
+UNIT_INDEX = np.vstack([
+    _cells,
+    _cells.T,
+    _cells.reshape(3, 3, 3, 3).transpose(0, 2, 1, 3).reshape(9, 9)
+])
+
+# CELL_UNITS[cell] : les 3 unités (ligne, colonne, sous-grille) de la case
+CELL_UNITS = np.array([np.nonzero((UNIT_INDEX == cell).any(axis=1))[0] for cell in range(81)])
+
+
+def propagate(domain: np.ndarray) -> bool:
+    """
+    Propage jusqu'au point fixe sur un tableau de 81 masques (modifié en place) :
+    1. une case réduite à une valeur retire cette valeur de ses pairs
+    2. une unité où un chiffre n'a plus qu'une place l'y affecte
+
+    Returns:
+        False en cas de contradiction
+    """
+    while True:
+        before = domain.copy()
+
+        # (1) Singletons : retirer leur valeur des autres cases des unités
+        single = POPCOUNT[domain] == 1
+        unit_singles = np.where(single, domain, 0)[UNIT_INDEX]
+        unit_or = np.bitwise_or.reduce(unit_singles, axis=1)
+        if (POPCOUNT[unit_singles].sum(axis=1) != POPCOUNT[unit_or]).any():
+            return False  # Deux cases d'une unité fixées au même chiffre
+        eliminated = np.bitwise_or.reduce(unit_or[CELL_UNITS], axis=1)
+        domain[:] = np.where(single, domain, domain & ~eliminated)
+
+        # (2) Chiffres n'ayant qu'une place dans une unité
+        has = (domain[UNIT_INDEX][:, :, None] & BITS) != 0  # [unité, case, chiffre]
+        places = has.sum(axis=1)
+        if (places == 0).any():
+            return False  # Un chiffre n'a plus de place dans une unité
+        unit_idx, digit_idx = np.nonzero(places == 1)
+        if len(unit_idx):
+            cells = UNIT_INDEX[unit_idx, has[unit_idx, :, digit_idx].argmax(axis=1)]
+            forced = np.zeros(81, dtype=np.uint16)
+            np.bitwise_or.at(forced, cells, BITS[digit_idx])
+            if (POPCOUNT[forced[cells]] != 1).any():
+                return False  # Une case forcée à deux chiffres différents
+            domain[cells] = forced[cells]
+
+        if (domain == 0).any():
+            return False
+        if np.array_equal(domain, before):
+            return True
+
+
+def solve_by_propagation(grid: List[List[int]]) -> Optional[List[List[int]]]:
+    """
+    Tente de résoudre la grille par propagation seule
+
+    Args:
+        grid: Grille 9x9 avec 0 pour les cases vides
+
+    Returns:
+        La grille résolue, ou None si la propagation ne suffit pas
+        (ou si la grille est contradictoire : le solveur SAT tranche)
+    """
+    givens = np.asarray(grid, dtype=np.uint8).reshape(81)
+    domain = np.where(givens > 0, BITS[np.maximum(givens, 1) - 1], ALL_DIGITS).astype(np.uint16)
+
+    if not propagate(domain) or (POPCOUNT[domain] != 1).any():
+        return None
+
+    return DIGIT_OF[domain].reshape(9, 9).tolist()
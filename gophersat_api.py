@@ -1,21 +1,35 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query, BackgroundTasks, Request
+from fastapi.responses import ORJSONResponse, HTMLResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError, model_validator
 from typing import List, Optional, Dict, Tuple
 import subprocess
-import tempfile
+import asyncio
 import os
-from graph_coloring import GraphColoringSAT
-from sudoku_solver import SudokuSAT
+import base64
+import binascii
+import orjson
+import multiprocessing
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from gophersat_backend import PySATBackend, PySATSolver, SubprocessBackend, WarmPoolBackend, parse_output
+from batcher import AsyncBatcher
+from result_cache import ResultCache
+from graph_coloring import GraphColoringSAT, render_coloring_plot
+from sudoku_solver import finish_sudoku_grid, prepare_sudoku_grid, render_sudoku_plot, solve_sudoku_grid
 from sokoban_solver import SokobanSAT
-from sokoban_simulator import SokobanSimulator
-from maze_solver import Maze, MazeSolver, create_example_maze
-from sokorridor_search import SokorridorState, SokorridorSearchSolver
-from puzzle_solver import PuzzleState, AStarSolver
+from sokoban_simulator import render_plan
+from maze_solver import solve_example_maze
+from sokorridor_search import solve_sokorridor as search_sokorridor
+from puzzle_solver import solve_puzzle as search_puzzle
 
-app = FastAPI(title="GopherSAT Solver API - SAT Problems Solver")
+# Réponses sérialisées avec orjson (plus rapide que json, accepte les tableaux numpy)
+app = FastAPI(
+    title="GopherSAT Solver API - SAT Problems Solver",
+    default_response_class=ORJSONResponse
+)
 
 # CORS pour permettre les requêtes cross-origin
 app.add_middleware(
@@ -28,6 +42,48 @@ app.add_middleware(
 
 GOPHERSAT_PATH = r"C:\Users\hp\Downloads\gophersat\gophersat.exe"
 
+# Solveur python-sat utilisé dans le processus à la place de GopherSAT
+# (ex: "glucose4", "minisat22", "cadical153") ; None garde GopherSAT
+PYSAT_SOLVER = None
+
+# Processus GopherSAT lancés à l'avance dans le processus serveur (démarrage
+# hors du chemin de la requête) ; le pool de calcul lance GopherSAT à la
+# demande ; 0 : un lancement par résolution
+GOPHERSAT_WARM_PROCESSES = 2
+
+# Processus uvicorn (--workers, transmis aux workers par WEB_CONCURRENCY) :
+# les cœurs sont partagés entre leurs pools de calcul
+API_WORKERS = max(1, int(os.environ.get("WEB_CONCURRENCY", "1")))
+
+# Backend partagé par tous les endpoints SAT
+if PYSAT_SOLVER is not None and PySATSolver is not None:
+    SOLVER_BACKEND = PySATBackend(GOPHERSAT_PATH, PYSAT_SOLVER)
+elif GOPHERSAT_WARM_PROCESSES > 0:
+    SOLVER_BACKEND = WarmPoolBackend(GOPHERSAT_PATH, GOPHERSAT_WARM_PROCESSES)
+else:
+    SOLVER_BACKEND = SubprocessBackend(GOPHERSAT_PATH)
+
+# Caches des résultats (entrées identiques => même résultat)
+CNF_CACHE = ResultCache()
+GRAPH_COLORING_CACHE = ResultCache()
+SUDOKU_CACHE = ResultCache()
+# GopherSAT n'a pas de mode incrémental : un problème Sokoban déjà posé
+# (plan et visualisations) est servi depuis ce cache plutôt que relancé.
+# Comme tous les caches, il est propre au processus : avec --workers N, une
+# requête répétée n'y trouve son résultat que sur le même worker
+SOKOBAN_CACHE = ResultCache(max_size=128)
+
+# Visualisations des coloriages, générées après la réponse (clé : plot_id)
+GRAPH_PLOT_CACHE = ResultCache(max_size=128)
+PENDING_GRAPH_PLOTS: Dict[str, asyncio.Future] = {}
+
+# Attente maximale (secondes) d'un tracé en cours par GET .../plot/{plot_id}
+PLOT_WAIT_TIMEOUT = 30
+
+# Visualisations des Sudoku résolus (clé : plot_id, hash de la grille)
+SUDOKU_PLOT_CACHE = ResultCache(max_size=128)
+PENDING_SUDOKU_PLOTS: Dict[str, asyncio.Future] = {}
+
 # ============================================================================
 # MODÈLES PYDANTIC
 # ============================================================================
@@ -41,7 +97,7 @@ class GraphColoringRequest(BaseModel):
     K: ensemble des couleurs
     """
     V: List[str]  # Sommets
-    E: List[List[str]]  # Arêtes (liste de paires [u, v])
+    E: List[Tuple[str, str]]  # Arêtes (liste de paires [u, v], validées en tuples)
     K: List[str]  # Couleurs
     
     class Config:
@@ -58,8 +114,28 @@ class SudokuRequest(BaseModel):
     Requête pour résoudre un Sudoku
     
     grid: Grille 9x9 avec 0 pour les cases vides, 1-9 pour les cases remplies
+    grid_b64: Forme compacte - base64 des 81 octets de la grille (ligne par ligne)
+    Exactement une des deux formes doit être fournie
     """
-    grid: List[List[int]]
+    grid: Optional[List[List[int]]] = None
+    grid_b64: Optional[str] = None
+    
+    @model_validator(mode="after")
+    def _unify_grid(self):
+        """Décode grid_b64 en grid (une seule des deux formes, pas les deux)"""
+        if self.grid_b64 is not None and self.grid is not None:
+            raise ValueError("grid et grid_b64 sont exclusifs")
+        if self.grid_b64:
+            try:
+                cells = base64.b64decode(self.grid_b64, validate=True)
+            except binascii.Error:
+                raise ValueError("grid_b64 n'est pas du base64 valide")
+            if len(cells) != 81:
+                raise ValueError(f"grid_b64 doit contenir 81 octets (reçu: {len(cells)})")
+            self.grid = np.frombuffer(cells, dtype=np.uint8).reshape(9, 9).tolist()
+        elif self.grid is None:
+            raise ValueError("Il faut fournir grid ou grid_b64")
+        return self
     
     class Config:
         json_schema_extra = {
@@ -102,6 +178,129 @@ class SokobanRequest(BaseModel):
             }
         }
 
+class BatchItem(BaseModel):
+    """
+    Sous-requête d'un lot : endpoint visé (path), corps JSON (body) et
+    paramètres de requête de l'endpoint (params, ex: {"plot": false})
+    """
+    path: str
+    body: dict
+    params: Dict[str, bool] = {}
+
+class BatchRequest(BaseModel):
+    """
+    Requête groupée : plusieurs résolutions en un seul aller-retour HTTP
+    
+    requests: sous-requêtes nommées {nom: {"path": "/sudoku", "body": {...}}}
+    """
+    requests: Dict[str, BatchItem]
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "requests": {
+                    "graph": {
+                        "path": "/graph-coloring",
+                        "body": {"V": ["A", "B", "C"], "E": [["A", "B"], ["B", "C"]], "K": ["r", "v"]}
+                    },
+                    "sokoban": {
+                        "path": "/sokoban",
+                        "body": {"initial_state": {"worker": 2, "boxes": [3]}, "goals": [4], "T": 5, "num_cells": 6}
+                    }
+                }
+            }
+        }
+
+# ============================================================================
+# VÉRIFICATION DE GOPHERSAT
+# ============================================================================
+
+# Intervalle (secondes) entre deux vérifications de l'exécutable
+GOPHERSAT_CHECK_INTERVAL = 30
+
+async def _revalidate_gophersat():
+    """Re-vérifie périodiquement la présence de GopherSAT (hors boucle asyncio)"""
+    while True:
+        await asyncio.sleep(GOPHERSAT_CHECK_INTERVAL)
+        app.state.gophersat_ok = await asyncio.to_thread(SOLVER_BACKEND.is_available)
+
+@app.on_event("startup")
+async def _start_gophersat_check():
+    # Les endpoints lisent app.state.gophersat_ok au lieu d'appeler os.path.exists
+    # (avec PySATBackend : python-sat installé)
+    app.state.gophersat_ok = SOLVER_BACKEND.is_available()
+    app.state.gophersat_check_task = asyncio.create_task(_revalidate_gophersat())
+    if isinstance(SOLVER_BACKEND, WarmPoolBackend):
+        # Préchauffage : les processus GopherSAT sont lancés dès le démarrage,
+        # la première requête n'attend pas leur lancement
+        SOLVER_BACKEND.start()
+
+@app.on_event("shutdown")
+async def _stop_gophersat_check():
+    app.state.gophersat_check_task.cancel()
+    if isinstance(SOLVER_BACKEND, WarmPoolBackend):
+        SOLVER_BACKEND.close()
+
+# ============================================================================
+# CALCULS CPU (VISUALISATIONS SOKOBAN, RECHERCHE SÉANCE 3)
+# ============================================================================
+
+@app.on_event("startup")
+async def _start_cpu_pool():
+    # Rendu matplotlib + encodage GIF, BFS/DFS/A* : CPU pur, exécuté hors du GIL
+    # ("spawn" : pas de fork d'un processus qui a déjà des threads)
+    # Un pool par worker uvicorn : les cœurs sont répartis entre eux
+    app.state.cpu_pool = ProcessPoolExecutor(
+        max_workers=max(1, (os.cpu_count() or 1) // API_WORKERS),
+        mp_context=multiprocessing.get_context("spawn")
+    )
+
+@app.on_event("shutdown")
+async def _stop_cpu_pool():
+    app.state.cpu_pool.shutdown(wait=False, cancel_futures=True)
+
+async def _run_cpu(func, *args):
+    """Exécute func(*args) dans le pool de processus sans bloquer la boucle"""
+    return await asyncio.get_running_loop().run_in_executor(app.state.cpu_pool, func, *args)
+
+# ============================================================================
+# REGROUPEMENT DES REQUÊTES
+# ============================================================================
+
+def _solve_graph_coloring(payload: Tuple[List[str], List[Tuple[str, str]], List[str]]) -> Dict:
+    """Résout un coloriage (V, E, K) - appelé par le batcher dans un thread"""
+    vertices, edges, colors = payload
+    solver = GraphColoringSAT(GOPHERSAT_PATH, backend=SOLVER_BACKEND)
+    # Visualisation générée à part, après la réponse (cf. _schedule_graph_plot)
+    return solver.solve(vertices=vertices, edges=edges, colors=colors, plot=False)
+
+async def _solve_sudoku_grid(payload: Tuple[List[List[int]], bool]) -> Dict:
+    """Résout une grille de Sudoku (grid, include_cnf) - attendu par le batcher dans la boucle"""
+    grid, include_cnf = payload
+    # Visualisation générée à part, après la réponse (cf. _schedule_sudoku_plot)
+    if isinstance(SOLVER_BACKEND, PySATBackend):
+        # Résolution dans le processus : tout se fait dans le pool, hors du GIL du serveur
+        return await _run_cpu(solve_sudoku_grid, SOLVER_BACKEND, grid, include_cnf, False)
+    # Propagation et CNF dans le pool de processus : les grilles d'un même
+    # lot sont construites en parallèle, sans se disputer le GIL. GopherSAT
+    # est lancé depuis le serveur, qui garde les processus préchauffés
+    # (WarmPoolBackend, absents des workers du pool)
+    prepared = await _run_cpu(prepare_sudoku_grid, grid)
+    return await finish_sudoku_grid(SOLVER_BACKEND, prepared, include_cnf)
+
+graph_coloring_batcher = AsyncBatcher(_solve_graph_coloring)
+sudoku_batcher = AsyncBatcher(_solve_sudoku_grid)
+
+@app.on_event("startup")
+async def _start_batchers():
+    graph_coloring_batcher.start()
+    sudoku_batcher.start()
+
+@app.on_event("shutdown")
+async def _stop_batchers():
+    await graph_coloring_batcher.stop()
+    await sudoku_batcher.stop()
+
 # ============================================================================
 # ENDPOINTS
 # ============================================================================
@@ -115,8 +314,11 @@ async def root():
         "endpoints": {
             "POST /solve": "Résoudre un fichier CNF",
             "POST /graph-coloring": "Coloriage de graphe - prend V, E, K et retourne φ",
+            "GET /graph-coloring/plot/{plot_id}": "Visualisation d'un coloriage (générée en arrière-plan)",
             "POST /sudoku": "Résoudre un Sudoku - prend une grille 9x9",
+            "GET /sudoku/plot/{plot_id}": "Visualisation d'un Sudoku résolu (générée en arrière-plan)",
             "POST /sokoban": "Résoudre un Sokorridor - planification à horizon fini",
+            "POST /batch": "Plusieurs résolutions en une requête - {nom: {path, body}}",
             "GET /visualizer": "Interface web pour visualiser les résultats",
             "GET /docs": "Documentation interactive Swagger",
             "GET /health": "Vérifier l'état de GopherSAT"
@@ -128,7 +330,8 @@ async def root():
                 "K": ["r", "v", "b"]
             },
             "sudoku": {
-                "grid": "9x9 array with 0 for empty cells"
+                "grid": "9x9 array with 0 for empty cells",
+                "grid_b64": "(alternative, exclusive with grid) base64 of the 81 cell bytes, row by row"
             },
             "sokoban": {
                 "initial_state": {"worker": 6, "boxes": [2, 9]},
@@ -155,13 +358,31 @@ async def visualizer():
         </body></html>
         """
 
+# Taille des morceaux lus depuis un fichier uploadé
+UPLOAD_CHUNK_SIZE = 1 << 16
+
+# Au-delà de cette taille, Starlette a déjà écrit l'upload sur disque :
+# son descripteur de fichier est passé tel quel en stdin à GopherSAT
+UPLOAD_FD_MIN_SIZE = 1 << 20
+
+async def _iter_upload(file: UploadFile):
+    """Itère sur le contenu d'un upload par morceaux de UPLOAD_CHUNK_SIZE"""
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
 @app.post("/solve")
-async def solve_cnf(file: UploadFile = File(...)):
+async def solve_cnf(file: UploadFile = File(...),
+                    output_format: str = Query("dict", alias="format")):
     """
     Résout un fichier CNF avec GopherSAT
     
     Args:
         file: Fichier CNF à résoudre
+        format: "dict" (assignments {"x1": true, ...}) ou "arrays"
+                (positive_vars / negative_vars, plus compact pour les gros modèles)
         
     Returns:
         Solution SAT avec format présentable
@@ -170,56 +391,70 @@ async def solve_cnf(file: UploadFile = File(...)):
     if not file.filename.endswith('.cnf'):
         raise HTTPException(status_code=400, detail="Le fichier doit avoir l'extension .cnf")
     
+    if output_format not in ("dict", "arrays"):
+        raise HTTPException(status_code=400, detail="Format invalide. Utilisez : dict, arrays")
+    
     # Vérifier que GopherSAT existe
-    if not os.path.exists(GOPHERSAT_PATH):
+    if not app.state.gophersat_ok:
         raise HTTPException(
             status_code=500, 
             detail=f"GopherSAT non trouvé à : {GOPHERSAT_PATH}"
         )
     
-    # Créer un fichier temporaire
-    with tempfile.NamedTemporaryFile(mode='wb', suffix='.cnf', delete=False) as temp_file:
-        temp_path = temp_file.name
-        content = await file.read()
-        temp_file.write(content)
+    # Hasher l'upload par morceaux (le fichier n'est jamais chargé en entier)
+    hasher = ResultCache.hasher()
+    hasher.update(output_format.encode('utf-8') + b'\n')
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        hasher.update(chunk)
+    
+    # Même CNF déjà résolu : réponse servie depuis le cache
+    cache_key = hasher.digest()
+    cached = await CNF_CACHE.get(cache_key)
+    if cached is not None:
+        cached["filename"] = file.filename
+        cached["cache"] = "hit"
+        return ORJSONResponse(content=cached)
     
     try:
-        # Exécuter GopherSAT
-        result = subprocess.run(
-            [GOPHERSAT_PATH, temp_path],
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
-        
-        # Parser la sortie
-        stdout_lines = result.stdout.strip().split('\n')
-        
-        status = "UNKNOWN"
-        solution = []
-        comments = []
+        # Exécuter GopherSAT : un gros upload (sur disque) est donné directement
+        # en stdin, un petit (en mémoire) est transmis par morceaux
+        await file.seek(0)
+        if file.size is not None and file.size >= UPLOAD_FD_MIN_SIZE:
+            result = await SOLVER_BACKEND.run_fd_async(file.file.fileno(), timeout=60)
+        else:
+            result = await SOLVER_BACKEND.run_stream_async(_iter_upload(file), timeout=60)
         
-        for line in stdout_lines:
-            line = line.strip()
-            if line.startswith('s '):
-                status = line[2:].strip()
-            elif line.startswith('v '):
-                vars_str = line[2:].strip()
-                solution.extend(vars_str.split())
-            elif line.startswith('c '):
-                comments.append(line[2:].strip())
+        # Parser la sortie (une seule passe sur les bytes)
+        parsed = parse_output(result.stdout)
+        status = parsed["status"]
+        comments = parsed["comments"]
+        model = parsed["model"]
         
-        # Nettoyer la solution (retirer le 0 final)
-        if solution and solution[-1] == '0':
-            solution = solution[:-1]
+        # Formatter la solution (signe et magnitude calculés une seule fois)
+        raw = " ".join(map(str, model.tolist())) if len(model) else None
+        magnitudes = np.abs(model)
+        positive = model > 0
         
-        # Formatter les assignments
-        assignments = {}
-        if solution:
-            for var in solution:
-                if var != '0':
-                    var_num = abs(int(var))
-                    assignments[f"x{var_num}"] = int(var) > 0
+        if output_format == "arrays":
+            solution = {
+                "raw": raw,
+                "positive_vars": magnitudes[positive].tolist(),
+                "negative_vars": magnitudes[~positive].tolist(),
+                "total_variables": len(model)
+            }
+        else:
+            assignments = dict(zip(
+                (f"x{var_num}" for var_num in magnitudes.tolist()),
+                positive.tolist()
+            ))
+            solution = {
+                "raw": raw,
+                "assignments": assignments if assignments else None,
+                "total_variables": len(assignments)
+            }
         
         response = {
             "status": "success",
@@ -227,32 +462,71 @@ async def solve_cnf(file: UploadFile = File(...)):
             "result": {
                 "satisfiable": status == "SATISFIABLE",
                 "status": status,
-                "solution": {
-                    "raw": " ".join(solution) if solution else None,
-                    "assignments": assignments if assignments else None,
-                    "total_variables": len(assignments) if assignments else 0
-                }
+                "solution": solution
             },
             "execution": {
                 "return_code": result.returncode,
                 "comments": comments if comments else None,
-                "errors": result.stderr if result.stderr else None
+                "errors": result.stderr.decode('utf-8', errors='replace') if result.stderr else None
             }
         }
         
-        return JSONResponse(content=response)
+        await CNF_CACHE.put(cache_key, response)
+        return ORJSONResponse(content=response)
         
     except subprocess.TimeoutExpired:
         raise HTTPException(status_code=408, detail="Timeout après 60 secondes")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur d'exécution: {str(e)}")
+
+def _finish_pending_plot(pending: Dict[str, asyncio.Future], plot_id: str,
+                         future: asyncio.Future, image: Optional[str]):
+    """Débloque les GET en attente du tracé et retire le tracé des tracés en cours"""
+    if pending.get(plot_id) is future:
+        del pending[plot_id]
+    if not future.done():
+        future.set_result(image)
+
+async def _wait_pending_plot(pending: Dict[str, asyncio.Future], plot_id: str,
+                             future: asyncio.Future) -> Optional[str]:
+    """
+    Attend un tracé en cours au plus PLOT_WAIT_TIMEOUT secondes ; au-delà
+    (tâche de fond jamais lancée, ex: réponse interrompue), le tracé est
+    oublié pour qu'une nouvelle résolution le reprogramme, et la réponse est 404
+    """
+    try:
+        return await asyncio.wait_for(asyncio.shield(future), PLOT_WAIT_TIMEOUT)
+    except asyncio.TimeoutError:
+        if pending.get(plot_id) is future:
+            del pending[plot_id]
+        raise HTTPException(status_code=404, detail="Visualisation non terminée, relancez la résolution")
+
+async def _render_graph_plot(plot_id: str, future: asyncio.Future, vertices: List[str],
+                             edges: List[Tuple[str, str]], phi: Dict[str, str]):
+    """Tâche de fond : trace le coloriage dans le pool de processus"""
+    image = None
+    try:
+        image = await _run_cpu(render_coloring_plot, vertices, edges, phi)
+    except Exception as e:
+        print(f"Erreur lors de la génération du plot: {e}")
+    try:
+        await GRAPH_PLOT_CACHE.put(bytes.fromhex(plot_id), {"plot": image})
     finally:
-        # Nettoyer le fichier temporaire
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
+        _finish_pending_plot(PENDING_GRAPH_PLOTS, plot_id, future, image)
+
+async def _schedule_graph_plot(plot_id: str, request: GraphColoringRequest, result: Dict,
+                               background_tasks: BackgroundTasks):
+    """Programme le tracé d'un coloriage s'il n'est ni en cache ni en cours"""
+    if plot_id in PENDING_GRAPH_PLOTS:
+        return
+    if await GRAPH_PLOT_CACHE.get(bytes.fromhex(plot_id)) is not None:
+        return
+    future = PENDING_GRAPH_PLOTS[plot_id] = asyncio.get_running_loop().create_future()
+    background_tasks.add_task(_render_graph_plot, plot_id, future, request.V, request.E, result["phi"])
 
 @app.post("/graph-coloring")
-async def solve_graph_coloring(request: GraphColoringRequest):
+async def solve_graph_coloring(request: GraphColoringRequest, background_tasks: BackgroundTasks,
+                               plot: bool = Query(True, description="Générer la visualisation (false : aucun tracé)")):
     """
     Résout le problème de coloriage de graphe
     
@@ -262,12 +536,17 @@ async def solve_graph_coloring(request: GraphColoringRequest):
         V: Liste des sommets du graphe
         E: Liste des arêtes (paires de sommets)
         K: Liste des couleurs disponibles
+        plot: (paramètre de requête) générer la visualisation, défaut true ;
+            false évite le tracé côté serveur (tests automatisés, CI)
         
     Returns:
         - satisfiable: bool - si un coloriage existe
         - phi: Dict[str, str] - le coloriage φ : V → K (None si non satisfiable)
         - cnf_file: str - le fichier CNF généré
         - stats: Dict - statistiques sur le problème
+        - plot: None - la visualisation est générée après la réponse,
+          à récupérer via GET /graph-coloring/plot/{plot_id}
+        - plot_id: str - identifiant de la visualisation (si satisfiable et plot)
         
     Example:
         {
@@ -286,44 +565,121 @@ async def solve_graph_coloring(request: GraphColoringRequest):
         }
     """
     # Vérifier que GopherSAT existe
-    if not os.path.exists(GOPHERSAT_PATH):
+    if not app.state.gophersat_ok:
         raise HTTPException(
             status_code=500, 
             detail=f"GopherSAT non trouvé à : {GOPHERSAT_PATH}"
         )
     
-    # Convertir E en tuples pour le traitement
-    edges = [(e[0], e[1]) for e in request.E]
+    if graph_coloring_batcher.is_overloaded():
+        raise HTTPException(status_code=429, detail="Serveur surchargé, réessayez plus tard")
     
-    # Créer le solveur
-    solver = GraphColoringSAT(GOPHERSAT_PATH)
+    # Même graphe et mêmes couleurs déjà résolus : réponse servie depuis le cache
+    cache_key = ResultCache.key(repr((request.V, request.E, request.K)).encode('utf-8'))
+    plot_id = cache_key.hex()
+    cached = await GRAPH_COLORING_CACHE.get(cache_key)
+    if cached is not None:
+        if plot and cached["satisfiable"]:
+            cached["plot_id"] = plot_id
+            await _schedule_graph_plot(plot_id, request, cached, background_tasks)
+        cached["cache"] = "hit"
+        return ORJSONResponse(content=cached)
     
-    # Résoudre le problème
-    result = solver.solve(
-        vertices=request.V,
-        edges=edges,
-        colors=request.K
-    )
+    # Résoudre le problème (regroupé avec les requêtes concurrentes)
+    result = await graph_coloring_batcher.submit((request.V, request.E, request.K))
     
     # Vérifier s'il y a une erreur
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
     
-    return JSONResponse(content=result)
+    # Réponse immédiate ; le tracé (layout + PNG) est fait en arrière-plan
+    # (le cache ne garde pas plot_id : il dépend du paramètre plot)
+    await GRAPH_COLORING_CACHE.put(cache_key, result)
+    if plot and result["satisfiable"]:
+        result["plot_id"] = plot_id
+        await _schedule_graph_plot(plot_id, request, result, background_tasks)
+    
+    return ORJSONResponse(content=result)
+
+def _plot_response(http_request: Request, plot_id: str, image: Optional[str]):
+    """
+    Réponse d'un endpoint de visualisation : PNG brut si le client l'accepte
+    (Accept: image/png ou image/*), sans base64 ni JSON ; sinon JSON base64
+    """
+    accept = http_request.headers.get("accept", "")
+    if "image/png" in accept or "image/*" in accept:
+        if image is None:
+            raise HTTPException(status_code=404, detail="Visualisation indisponible (échec du tracé)")
+        return Response(content=base64.b64decode(image), media_type="image/png")
+    return ORJSONResponse(content={"plot_id": plot_id, "plot": image})
+
+@app.get("/graph-coloring/plot/{plot_id}")
+async def get_graph_coloring_plot(plot_id: str, http_request: Request):
+    """
+    Retourne la visualisation d'un coloriage (image PNG en base64, ou PNG
+    brut avec Accept: image/png)
+    Si le tracé est encore en cours, la réponse attend sa fin (au plus
+    PLOT_WAIT_TIMEOUT secondes)
+    """
+    pending = PENDING_GRAPH_PLOTS.get(plot_id)
+    if pending is not None:
+        image = await _wait_pending_plot(PENDING_GRAPH_PLOTS, plot_id, pending)
+    else:
+        try:
+            cached = await GRAPH_PLOT_CACHE.get(bytes.fromhex(plot_id))
+        except ValueError:
+            cached = None
+        if cached is None:
+            raise HTTPException(status_code=404, detail="Visualisation inconnue ou expirée, relancez la résolution")
+        image = cached["plot"]
+    
+    return _plot_response(http_request, plot_id, image)
+
+async def _render_sudoku_plot(plot_id: str, future: asyncio.Future, grid: List[List[int]],
+                              solution: List[List[int]]):
+    """Tâche de fond : trace la grille résolue dans le pool de processus"""
+    image = None
+    try:
+        image = await _run_cpu(render_sudoku_plot, grid, solution)
+    except Exception as e:
+        print(f"Erreur lors de la génération du plot: {e}")
+    try:
+        await SUDOKU_PLOT_CACHE.put(bytes.fromhex(plot_id), {"plot": image})
+    finally:
+        _finish_pending_plot(PENDING_SUDOKU_PLOTS, plot_id, future, image)
+
+async def _schedule_sudoku_plot(plot_id: str, request: SudokuRequest, result: Dict,
+                                background_tasks: BackgroundTasks):
+    """Programme le tracé d'une grille résolue s'il n'est ni en cache ni en cours"""
+    if plot_id in PENDING_SUDOKU_PLOTS:
+        return
+    if await SUDOKU_PLOT_CACHE.get(bytes.fromhex(plot_id)) is not None:
+        return
+    future = PENDING_SUDOKU_PLOTS[plot_id] = asyncio.get_running_loop().create_future()
+    background_tasks.add_task(_render_sudoku_plot, plot_id, future, request.grid, result["solution"])
 
 @app.post("/sudoku")
-async def solve_sudoku(request: SudokuRequest):
+async def solve_sudoku(request: SudokuRequest, background_tasks: BackgroundTasks,
+                       include_cnf: bool = Query(False, description="Inclure le fichier CNF dans la réponse"),
+                       plot: bool = Query(True, description="Générer la visualisation (false : aucun tracé)")):
     """
     Résout un Sudoku en utilisant SAT
     
     Args:
         grid: Grille 9x9 avec 0 pour les cases vides, 1-9 pour les cases remplies
+        grid_b64: (alternative à grid, exclusif) base64 des 81 octets de la grille
+        include_cnf: (paramètre de requête) inclure le fichier CNF, défaut false
+        plot: (paramètre de requête) générer la visualisation, défaut true ;
+            false évite le tracé côté serveur (tests automatisés, CI)
         
     Returns:
         - satisfiable: bool - si le Sudoku est résolvable
         - solution: List[List[int]] - la grille résolue (None si non résolvable)
-        - cnf_file: str - le fichier CNF généré
+        - cnf_file: str - le fichier CNF généré (None sans ?include_cnf=true)
         - stats: Dict - statistiques
+        - plot: None - la visualisation est générée après la réponse,
+          à récupérer via GET /sudoku/plot/{plot_id}
+        - plot_id: str - identifiant de la visualisation (si résolvable et plot)
         
     Example:
         {
@@ -349,23 +705,63 @@ async def solve_sudoku(request: SudokuRequest):
         }
     """
     # Vérifier que GopherSAT existe
-    if not os.path.exists(GOPHERSAT_PATH):
+    if not app.state.gophersat_ok:
         raise HTTPException(
             status_code=500, 
             detail=f"GopherSAT non trouvé à : {GOPHERSAT_PATH}"
         )
     
-    # Créer le solveur
-    solver = SudokuSAT(GOPHERSAT_PATH)
+    if sudoku_batcher.is_overloaded():
+        raise HTTPException(status_code=429, detail="Serveur surchargé, réessayez plus tard")
+    
+    # Même grille déjà résolue : réponse servie depuis le cache
+    plot_id = ResultCache.key(repr(request.grid).encode('utf-8')).hex()
+    cache_key = ResultCache.key(repr((request.grid, include_cnf)).encode('utf-8'))
+    cached = await SUDOKU_CACHE.get(cache_key)
+    if cached is not None:
+        if plot and cached["satisfiable"]:
+            cached["plot_id"] = plot_id
+            await _schedule_sudoku_plot(plot_id, request, cached, background_tasks)
+        cached["cache"] = "hit"
+        return ORJSONResponse(content=cached)
     
-    # Résoudre le Sudoku
-    result = solver.solve(grid=request.grid)
+    # Résoudre le Sudoku (regroupé avec les requêtes concurrentes)
+    result = await sudoku_batcher.submit((request.grid, include_cnf))
     
     # Vérifier s'il y a une erreur
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
     
-    return JSONResponse(content=result)
+    # Réponse immédiate ; le PNG est produit en arrière-plan
+    # (le cache ne garde pas plot_id : il dépend du paramètre plot)
+    await SUDOKU_CACHE.put(cache_key, result)
+    if plot and result["satisfiable"]:
+        result["plot_id"] = plot_id
+        await _schedule_sudoku_plot(plot_id, request, result, background_tasks)
+    
+    return ORJSONResponse(content=result)
+
+@app.get("/sudoku/plot/{plot_id}")
+async def get_sudoku_plot(plot_id: str, http_request: Request):
+    """
+    Retourne la visualisation d'un Sudoku résolu (image PNG en base64, ou
+    PNG brut avec Accept: image/png)
+    Si le tracé est encore en cours, la réponse attend sa fin (au plus
+    PLOT_WAIT_TIMEOUT secondes)
+    """
+    pending = PENDING_SUDOKU_PLOTS.get(plot_id)
+    if pending is not None:
+        image = await _wait_pending_plot(PENDING_SUDOKU_PLOTS, plot_id, pending)
+    else:
+        try:
+            cached = await SUDOKU_PLOT_CACHE.get(bytes.fromhex(plot_id))
+        except ValueError:
+            cached = None
+        if cached is None:
+            raise HTTPException(status_code=404, detail="Visualisation inconnue ou expirée, relancez la résolution")
+        image = cached["plot"]
+    
+    return _plot_response(http_request, plot_id, image)
 
 @app.post("/sokoban")
 async def solve_sokoban(request: SokobanRequest):
@@ -395,17 +791,27 @@ async def solve_sokoban(request: SokobanRequest):
         But: déplacer les caisses sur les objectifs (positions 1 et 10)
     """
     # Vérifier que GopherSAT existe
-    if not os.path.exists(GOPHERSAT_PATH):
+    if not app.state.gophersat_ok:
         raise HTTPException(
             status_code=500, 
             detail=f"GopherSAT non trouvé à : {GOPHERSAT_PATH}"
         )
     
-    # Créer le solveur
-    solver = SokobanSAT(GOPHERSAT_PATH)
+    # Même problème déjà résolu : réponse servie depuis le cache
+    cache_key = ResultCache.key(repr((
+        request.initial_state, request.goals, request.T, request.num_cells
+    )).encode('utf-8'))
+    cached = await SOKOBAN_CACHE.get(cache_key)
+    if cached is not None:
+        cached["cache"] = "hit"
+        return ORJSONResponse(content=cached)
+    
+    # Créer le solveur (grands CNF sérialisés en parallèle dans le pool de processus)
+    solver = SokobanSAT(GOPHERSAT_PATH, backend=SOLVER_BACKEND, executor=app.state.cpu_pool)
     
-    # Résoudre
-    result = solver.solve(
+    # Résoudre (dans un thread pour ne pas bloquer la boucle asyncio)
+    result = await asyncio.to_thread(
+        solver.solve,
         initial_state=request.initial_state,
         goals=request.goals,
         T=request.T,
@@ -416,40 +822,91 @@ async def solve_sokoban(request: SokobanRequest):
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
     
-    # Si satisfiable, simuler et visualiser
+    # Si satisfiable, simuler et visualiser (dans un processus séparé)
     if result["satisfiable"]:
-        simulator = SokobanSimulator(num_cells=request.num_cells)
-        simulator.set_initial_state(
-            request.initial_state['worker'],
-            request.initial_state['boxes'],
-            request.goals
-        )
-        
-        # Exécuter le plan
-        plan_result = simulator.execute_plan(result['plan'])
-        
-        # Générer les visualisations
         try:
-            visualizations = simulator.visualize_plan_execution(plan_result)
-            animated_gif = simulator.create_animated_gif(plan_result, duration=500)
-            result['visualizations'] = visualizations
-            result['animated_gif'] = animated_gif
-            result['simulation'] = {
-                'success': plan_result['success'],
-                'message': plan_result['message'],
-                'goal_reached': plan_result['goal_reached']
-            }
+            rendered = await _run_cpu(
+                render_plan,
+                request.initial_state,
+                request.goals,
+                result['plan'],
+                request.num_cells
+            )
+            result.update(rendered)
         except Exception as e:
             result['visualizations'] = None
             result['animated_gif'] = None
             result['simulation'] = {'error': str(e)}
+            return ORJSONResponse(content=result)  # Échec du rendu : pas mis en cache
+    
+    await SOKOBAN_CACHE.put(cache_key, result)
+    return ORJSONResponse(content=result)
+
+# Endpoints accessibles via /batch : modèle du corps et appel de l'endpoint
+# (params : paramètres de requête de la sous-requête)
+BATCH_ENDPOINTS = {
+    "/graph-coloring": (GraphColoringRequest, lambda request, tasks, params: solve_graph_coloring(
+        request, tasks, plot=params.get("plot", True))),
+    "/sudoku": (SudokuRequest, lambda request, tasks, params: solve_sudoku(
+        request, tasks, include_cnf=params.get("include_cnf", False), plot=params.get("plot", True))),
+    "/sokoban": (SokobanRequest, lambda request, tasks, params: solve_sokoban(request)),
+}
+
+async def _run_batch_item(item: BatchItem, background_tasks: BackgroundTasks) -> Dict:
+    """Exécute une sous-requête de /batch et retourne {"status_code", "body"}"""
+    endpoint = BATCH_ENDPOINTS.get(item.path)
+    if endpoint is None:
+        return {"status_code": 404, "body": {"detail": f"Endpoint non disponible en lot: {item.path}"}}
+    model, handler = endpoint
+    
+    try:
+        request = model.model_validate(item.body)
+    except ValidationError as e:
+        return {"status_code": 422, "body": {"detail": orjson.loads(e.json(include_url=False))}}
     
-    return JSONResponse(content=result)
+    try:
+        response = await handler(request, background_tasks, item.params)
+    except HTTPException as e:
+        return {"status_code": e.status_code, "body": {"detail": e.detail}}
+    except Exception as e:
+        return {"status_code": 500, "body": {"detail": f"Erreur d'exécution: {str(e)}"}}
+    return {"status_code": response.status_code, "body": orjson.loads(response.body)}
+
+@app.post("/batch")
+async def solve_batch(request: BatchRequest, background_tasks: BackgroundTasks):
+    """
+    Exécute plusieurs résolutions en un seul aller-retour HTTP
+    
+    Les sous-requêtes sont résolues en parallèle, chacune par son endpoint
+    (mêmes caches et regroupements) ; une erreur n'affecte que sa propre
+    réponse. Endpoints disponibles : /graph-coloring, /sudoku, /sokoban
+    
+    Example:
+        {
+            "requests": {
+                "graph": {"path": "/graph-coloring", "body": {"V": [...], "E": [...], "K": [...]}},
+                "sudoku": {"path": "/sudoku", "body": {"grid": [[...], ...]}}
+            }
+        }
+        
+        Retourne:
+        {
+            "responses": {
+                "graph": {"status_code": 200, "body": {"satisfiable": true, ...}},
+                "sudoku": {"status_code": 200, "body": {"satisfiable": true, ...}}
+            }
+        }
+    """
+    names = list(request.requests)
+    results = await asyncio.gather(
+        *[_run_batch_item(request.requests[name], background_tasks) for name in names]
+    )
+    return ORJSONResponse(content={"responses": dict(zip(names, results))})
 
 @app.get("/health")
 async def health_check():
     """Vérifie si GopherSAT est accessible"""
-    gophersat_exists = os.path.exists(GOPHERSAT_PATH)
+    gophersat_exists = app.state.gophersat_ok
     return {
         "status": "healthy" if gophersat_exists else "unhealthy",
         "gophersat_path": GOPHERSAT_PATH,
@@ -471,20 +928,13 @@ async def solve_maze(algorithm: str):
         raise HTTPException(status_code=400, detail="Algorithme invalide. Utilisez : bfs, dfs, iddfs")
     
     try:
-        maze = create_example_maze()
-        solver = MazeSolver(maze)
-        
-        if algorithm == 'bfs':
-            path = solver.bfs()
-        elif algorithm == 'dfs':
-            path = solver.dfs()
-        else:  # iddfs
-            path = solver.iddfs()
+        # Recherche exécutée dans le pool de processus (bfs, dfs ou iddfs)
+        path, stats = await _run_cpu(solve_example_maze, algorithm)
         
         return {
             "algorithm": algorithm,
             "path": path,
-            "stats": solver.stats,
+            "stats": stats,
             "success": path is not None
         }
     except Exception as e:
@@ -503,24 +953,26 @@ async def solve_sokorridor(algorithm: str, request: SokorridorRequest):
     """
     Résout le Sokorridor avec l'algorithme spécifié
     
-    Algorithmes disponibles : bfs, iddfs
+    Algorithmes disponibles : bfs, iddfs, bibfs (BFS bidirectionnel),
+    astar (A*, distance des caisses aux goals)
     """
-    if algorithm not in ['bfs', 'iddfs']:
-        raise HTTPException(status_code=400, detail="Algorithme invalide. Utilisez : bfs, iddfs")
+    if algorithm not in ['bfs', 'iddfs', 'bibfs', 'astar']:
+        raise HTTPException(status_code=400, detail="Algorithme invalide. Utilisez : bfs, iddfs, bibfs, astar")
     
     try:
-        initial = SokorridorState(request.worker, request.boxes, num_cells=11)
-        solver = SokorridorSearchSolver(initial, request.goals)
+        # Recherche exécutée dans le pool de processus (bfs, iddfs, bibfs ou astar)
+        solution, stats = await _run_cpu(
+            search_sokorridor, request.worker, request.boxes, request.goals, algorithm
+        )
         
-        if algorithm == 'bfs':
-            solution = solver.bfs()
-        else:  # iddfs
-            solution = solver.iddfs()
+        # États convertis explicitement (SokorridorState utilise __slots__)
+        if solution is not None:
+            solution = [(state.to_dict(), action) for state, action in solution]
         
         return {
             "algorithm": algorithm,
             "solution": solution,
-            "stats": solver.stats,
+            "stats": stats,
             "success": solution is not None
         }
     except Exception as e:
@@ -534,35 +986,37 @@ class PuzzleRequest(BaseModel):
 
 
 @app.post("/puzzle/{heuristic}")
-async def solve_puzzle(heuristic: str, request: PuzzleRequest):
+async def solve_puzzle(heuristic: str, request: PuzzleRequest, bidirectional: bool = False):
     """
     Résout le Taquin avec A* et l'heuristique spécifiée
     
-    Heuristiques disponibles : manhattan, misplaced, euclidean
+    Heuristiques disponibles : manhattan, misplaced, euclidean, pdb
+    (base de motifs : distance exacte, précalculée une fois par but)
+    
+    Query param bidirectional=true : A* bidirectionnel (recherches depuis
+    l'initial et depuis le but, arrêtées à leur rencontre)
     """
-    if heuristic not in ['manhattan', 'misplaced', 'euclidean']:
-        raise HTTPException(status_code=400, detail="Heuristique invalide. Utilisez : manhattan, misplaced, euclidean")
+    if heuristic not in ['manhattan', 'misplaced', 'euclidean', 'pdb']:
+        raise HTTPException(status_code=400, detail="Heuristique invalide. Utilisez : manhattan, misplaced, euclidean, pdb")
     
     try:
-        initial = PuzzleState(request.initial)
-        goal = PuzzleState(request.goal)
-        
-        solver = AStarSolver(initial, goal, heuristic=heuristic)
-        solution = solver.solve()
+        # A* exécuté dans le pool de processus
+        actions, stats = await _run_cpu(search_puzzle, request.initial, request.goal, heuristic, bidirectional)
         
         # Convertir la solution en format sérialisable
-        if solution:
+        if actions:
             solution_serializable = [
-                (None, action) for _, action in solution  # On garde juste les actions
+                (None, action) for action in actions  # On garde juste les actions
             ]
         else:
             solution_serializable = None
         
         return {
             "heuristic": heuristic,
+            "bidirectional": bidirectional,
             "solution": solution_serializable,
-            "stats": solver.stats,
-            "success": solution is not None
+            "stats": stats,
+            "success": actions is not None
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -585,7 +1039,26 @@ async def get_visualizer_seance3():
 
 if __name__ == "__main__":
     import uvicorn
+    parser = argparse.ArgumentParser(description="API GopherSAT")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Nombre de processus uvicorn (défaut : 1). Au-delà, "
+                             "GET /.../plot/{plot_id} peut arriver sur un autre worker "
+                             "que la résolution et répondre 404")
+    args = parser.parse_args()
+    os.environ["WEB_CONCURRENCY"] = str(args.workers)
     print("🚀 Lancement de l'API GopherSAT")
     print("📍 URL: http://127.0.0.1:8000")
     print("📚 Documentation: http://127.0.0.1:8000/docs")
-    uvicorn.run(app, host="127.0.0.1", port=8000)
\ No newline at end of file
+    # Un seul worker par défaut : caches, batchers et visualisations en cours
+    # (plot_id) sont propres à chaque processus ; plusieurs workers exigeraient
+    # un stockage partagé des visualisations (disque, Redis...).
+    # "auto" choisit uvloop + httptools s'ils sont installés
+    # (uvicorn[standard], uvloop hors Windows), sinon asyncio + h11
+    uvicorn.run(
+        "gophersat_api:app",
+        host="127.0.0.1",
+        port=8000,
+        loop="auto",
+        http="auto",
+        workers=args.workers
+    )
\ No newline at end of file
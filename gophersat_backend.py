@@ -0,0 +1,582 @@
+"""
+Backends d'exécution du solveur GopherSAT
+Tous les solveurs (coloriage, Sudoku, Sokoban) et l'endpoint /solve passent
+par un SolverBackend au lieu de lancer GopherSAT eux-mêmes
+
+PySATBackend résout dans le processus avec python-sat (optionnel), sans
+lancer de processus ; sa sortie imite celle de GopherSAT. WarmPoolBackend
+garde des processus GopherSAT lancés à l'avance
+"""
+import asyncio
+import os
+from abc import ABC, abstractmethod
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+from typing import AsyncIterable, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+try:
+    from pysat.solvers import Solver as PySATSolver
+except ImportError:  # python-sat est optionnel (cf. PySATBackend)
+    PySATSolver = None
+
+# Sous Linux/macOS, GopherSAT lit le CNF directement depuis le pipe stdin ;
+# Windows n'a pas d'équivalent à /dev/stdin, on y garde un fichier temporaire
+STDIN_PATH = None if os.name == 'nt' else '/dev/stdin'
+
+# Lignes de sortie DIMACS : "s <statut>", "v <littéraux>", "c <commentaire>"
+# (une regex par type : chaque findall parcourt la sortie en C)
+_S_RE = re.compile(rb'(?m)^s[ \t]+(.*?)[ \t\r]*$')
+_V_RE = re.compile(rb'(?m)^v[ \t]+(.*?)[ \t\r]*$')
+_C_RE = re.compile(rb'(?m)^c[ \t]+(.*?)[ \t\r]*$')
+
+# Lignes d'en-tête d'un CNF DIMACS : commentaires et ligne "p cnf <vars> <clauses>"
+_DIMACS_HEADER_RE = re.compile(rb'(?m)^[ \t]*[cp].*$')
+_PROBLEM_RE = re.compile(rb'(?m)^p[ \t]+cnf[ \t]+(\d+)')
+# Fin de fichier à la SATLIB : une ligne "%" (suivie d'un "0" à ignorer)
+_SATLIB_END_RE = re.compile(rb'(?m)^[ \t]*%')
+
+
+def parse_output(stdout: bytes) -> Dict:
+    """
+    Parse la sortie brute de GopherSAT (regex sur les bytes, sans découpe en lignes)
+
+    Returns:
+        Dictionnaire avec:
+        - status: str (SATISFIABLE, UNSATISFIABLE ou UNKNOWN)
+        - model: np.ndarray int32 des littéraux (sans les 0)
+        - comments: List[str]
+    """
+    statuses = _S_RE.findall(stdout)
+    status = statuses[-1].decode('utf-8', errors='replace') if statuses else "UNKNOWN"
+    values = b' '.join(_V_RE.findall(stdout))
+    comments = [comment.decode('utf-8', errors='replace') for comment in _C_RE.findall(stdout)]
+
+    model = np.array(values.split(), dtype=np.int32)
+    # Retirer le 0 terminal (et les séparateurs de chaque ligne "v")
+    model = model[model != 0]
+
+    return {"status": status, "model": model, "comments": comments}
+
+
+def parse_dimacs(cnf: bytes) -> Tuple[int, List[List[int]]]:
+    """
+    Lit un CNF DIMACS : les littéraux sont convertis d'un bloc par NumPy,
+    puis découpés en clauses aux 0 terminaux. Les commentaires sont ignorés,
+    ainsi que tout ce qui suit une ligne "%" (fin de fichier SATLIB)
+
+    Returns:
+        (nombre de variables de la ligne "p cnf", liste des clauses)
+
+    Raises:
+        ValueError si un littéral n'est pas un entier 32 bits
+    """
+    end = _SATLIB_END_RE.search(cnf)
+    if end is not None:
+        cnf = cnf[:end.start()]
+    problem = _PROBLEM_RE.search(cnf)
+    body = _DIMACS_HEADER_RE.sub(b'', cnf)
+    try:
+        literals = np.array(body.split(), dtype=np.int32)
+    except (ValueError, OverflowError) as e:
+        raise ValueError(f"CNF DIMACS invalide : {e}") from None
+    ends = np.flatnonzero(literals == 0).tolist()
+    flat = literals.tolist()
+    clauses = [flat[start:end] for start, end in zip([0] + [end + 1 for end in ends[:-1]], ends)]
+    return (int(problem.group(1)) if problem else 0), clauses
+
+
+def _as_text(result: subprocess.CompletedProcess) -> subprocess.CompletedProcess:
+    """Décode stdout/stderr d'un CompletedProcess en str"""
+    return subprocess.CompletedProcess(
+        result.args,
+        result.returncode,
+        result.stdout.decode('utf-8', errors='replace'),
+        result.stderr.decode('utf-8', errors='replace')
+    )
+
+
+class SolverBackend(ABC):
+    """Interface commune : prend un CNF DIMACS et retourne la sortie de GopherSAT"""
+
+    def __init__(self, gophersat_path: str):
+        self.gophersat_path = gophersat_path
+
+    def is_available(self) -> bool:
+        """Vérifie que l'exécutable GopherSAT existe"""
+        return os.path.exists(self.gophersat_path)
+
+    @abstractmethod
+    def run(self, cnf: bytes, timeout: int = 60, text: bool = True) -> subprocess.CompletedProcess:
+        """
+        Résout un CNF avec GopherSAT
+
+        Args:
+            cnf: Contenu du fichier CNF (DIMACS)
+            timeout: Durée maximale en secondes
+            text: stdout/stderr décodés en str (sinon bytes bruts)
+
+        Returns:
+            CompletedProcess avec stdout/stderr et returncode
+
+        Raises:
+            subprocess.TimeoutExpired si le solveur dépasse le délai
+        """
+
+    def run_stream(self, chunks: Iterable[bytes], timeout: int = 60, text: bool = True) -> subprocess.CompletedProcess:
+        """
+        Variante de run pour un CNF produit au fil de l'eau (générateur)
+        Par défaut, rassemble les morceaux puis appelle run
+        """
+        return self.run(b''.join(chunks), timeout, text)
+
+    async def run_async(self, cnf: bytes, timeout: int = 60) -> subprocess.CompletedProcess:
+        """
+        Variante asynchrone de run (stdout/stderr en bytes)
+        Par défaut, exécute run dans un thread pour ne pas bloquer la boucle
+        """
+        return await asyncio.to_thread(self.run, cnf, timeout, False)
+
+    async def run_stream_async(self, chunks: AsyncIterable[bytes], timeout: int = 60) -> subprocess.CompletedProcess:
+        """
+        Variante de run_async pour un CNF reçu par morceaux (upload)
+        Par défaut, rassemble les morceaux puis appelle run_async
+        """
+        cnf = b''.join([chunk async for chunk in chunks])
+        return await self.run_async(cnf, timeout)
+
+    async def run_fd_async(self, fd: int, timeout: int = 60) -> subprocess.CompletedProcess:
+        """
+        Variante de run_async pour un CNF déjà sur disque (descripteur de
+        fichier positionné au début). Par défaut, lit le fichier puis appelle run_async
+        """
+        with os.fdopen(os.dup(fd), 'rb') as cnf_file:
+            cnf = await asyncio.to_thread(cnf_file.read)
+        return await self.run_async(cnf, timeout)
+
+
+class SubprocessBackend(SolverBackend):
+    """
+    Lance un processus GopherSAT par résolution
+
+    GopherSAT ne propose ni mode REPL ni lecture incrémentale : chaque CNF
+    demande un nouveau processus. Cette classe est le point d'extension
+    pour un backend persistant (bibliothèque partagée, pool de workers)
+    """
+
+    def run(self, cnf: bytes, timeout: int = 60, text: bool = True) -> subprocess.CompletedProcess:
+        if STDIN_PATH is not None:
+            result = subprocess.run(
+                [self.gophersat_path, STDIN_PATH],
+                input=cnf,
+                capture_output=True,
+                timeout=timeout
+            )
+            return _as_text(result) if text else result
+
+        return self._run_temp_file([cnf], timeout, text)
+
+    def _run_temp_file(self, chunks: Iterable[bytes], timeout: int, text: bool) -> subprocess.CompletedProcess:
+        """Sans /dev/stdin : écrit les morceaux dans un fichier temporaire puis lance GopherSAT dessus"""
+        # GopherSAT attend un chemin de fichier en argument
+        temp_file = tempfile.NamedTemporaryFile(mode='wb', suffix='.cnf', delete=False)
+        temp_path = temp_file.name
+        try:
+            with temp_file:
+                temp_file.writelines(chunks)
+            return subprocess.run(
+                [self.gophersat_path, temp_path],
+                capture_output=True,
+                text=text,
+                timeout=timeout
+            )
+        finally:
+            # Nettoyer le fichier temporaire
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+
+    def run_stream(self, chunks: Iterable[bytes], timeout: int = 60, text: bool = True) -> subprocess.CompletedProcess:
+        if STDIN_PATH is None:
+            # Les morceaux vont dans le fichier au fil de leur génération,
+            # sans assembler le CNF complet en mémoire
+            return self._run_temp_file(chunks, timeout, text)
+
+        # GopherSAT démarre tout de suite et lit le CNF pendant qu'il est
+        # généré : un thread alimente le pipe stdin, communicate lit la sortie
+        args, proc, write_fd = self._start_piped()
+        errors = []
+
+        def feed():
+            try:
+                with open(write_fd, 'wb') as stdin:
+                    for chunk in chunks:
+                        stdin.write(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # GopherSAT s'est arrêté avant la fin du CNF
+            except Exception as e:
+                errors.append(e)  # Erreur du générateur, relancée ci-dessous
+
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+        try:
+            stdout, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            raise
+        finally:
+            feeder.join()
+        if errors:
+            raise errors[0]
+
+        result = subprocess.CompletedProcess(args, proc.returncode, stdout, stderr)
+        return _as_text(result) if text else result
+
+    def _start_piped(self) -> Tuple[List[str], subprocess.Popen, int]:
+        """Lance GopherSAT sur /dev/stdin relié à un pipe : (args, processus, fd d'écriture)"""
+        args = [self.gophersat_path, STDIN_PATH]
+        read_fd, write_fd = os.pipe()
+        try:
+            proc = subprocess.Popen(args, stdin=read_fd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except BaseException:
+            os.close(write_fd)
+            raise
+        finally:
+            os.close(read_fd)
+        return args, proc, write_fd
+
+    async def run_async(self, cnf: bytes, timeout: int = 60) -> subprocess.CompletedProcess:
+        temp_path = None
+        if STDIN_PATH is not None:
+            args = [self.gophersat_path, STDIN_PATH]
+        else:
+            with tempfile.NamedTemporaryFile(mode='wb', suffix='.cnf', delete=False) as temp_file:
+                temp_path = temp_file.name
+                temp_file.write(cnf)
+            args = [self.gophersat_path, temp_path]
+
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *args,
+                stdin=asyncio.subprocess.PIPE if temp_path is None else None,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(
+                    proc.communicate(cnf if temp_path is None else None),
+                    timeout
+                )
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                raise subprocess.TimeoutExpired(args, timeout)
+            return subprocess.CompletedProcess(args, proc.returncode, stdout, stderr)
+        finally:
+            if temp_path is not None and os.path.exists(temp_path):
+                os.unlink(temp_path)
+
+    async def run_stream_async(self, chunks: AsyncIterable[bytes], timeout: int = 60) -> subprocess.CompletedProcess:
+        if STDIN_PATH is None:
+            # Pas de /dev/stdin : les morceaux sont écrits dans le fichier temporaire
+            with tempfile.NamedTemporaryFile(mode='wb', suffix='.cnf', delete=False) as temp_file:
+                temp_path = temp_file.name
+                async for chunk in chunks:
+                    temp_file.write(chunk)
+            try:
+                args = [self.gophersat_path, temp_path]
+                proc = await asyncio.create_subprocess_exec(
+                    *args,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                return await self._communicate(proc, args, None, timeout)
+            finally:
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+
+        args = [self.gophersat_path, STDIN_PATH]
+        proc = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        return await self._communicate(proc, args, chunks, timeout)
+
+    async def run_fd_async(self, fd: int, timeout: int = 60) -> subprocess.CompletedProcess:
+        if STDIN_PATH is None:
+            return await super().run_fd_async(fd, timeout)
+
+        # Le fichier devient directement le stdin de GopherSAT : le noyau
+        # lui sert les données, sans aucune copie par Python
+        args = [self.gophersat_path, STDIN_PATH]
+        proc = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=fd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        return await self._communicate(proc, args, None, timeout)
+
+    async def _communicate(self, proc, args, chunks, timeout: int) -> subprocess.CompletedProcess:
+        """Envoie les morceaux sur stdin tout en lisant stdout/stderr"""
+        async def feed():
+            try:
+                async for chunk in chunks:
+                    proc.stdin.write(chunk)
+                    await proc.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # GopherSAT s'est arrêté avant la fin du CNF
+            finally:
+                proc.stdin.close()
+
+        tasks = [proc.stdout.read(), proc.stderr.read()]
+        if chunks is not None:
+            tasks.append(feed())
+
+        try:
+            outputs = await asyncio.wait_for(asyncio.gather(*tasks), timeout)
+            await proc.wait()
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise subprocess.TimeoutExpired(args, timeout)
+        return subprocess.CompletedProcess(args, proc.returncode, outputs[0], outputs[1])
+
+
+def _write_all(fd: int, data: bytes):
+    """Écrit tout data sur le descripteur (les pipes acceptent des écritures partielles)"""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _copy_fd(src_fd: int, dst_fd: int):
+    """Copie un fichier (depuis sa position courante) vers un pipe"""
+    if sys.platform.startswith('linux'):
+        # sendfile vers un pipe : copie dans le noyau, sans passer par Python
+        while os.sendfile(dst_fd, src_fd, None, 1 << 20):
+            pass
+        return
+    offset = os.lseek(src_fd, 0, os.SEEK_CUR)
+    while True:
+        data = os.pread(src_fd, 1 << 20, offset)
+        if not data:
+            return
+        _write_all(dst_fd, data)
+        offset += len(data)
+
+
+class WarmPoolBackend(SubprocessBackend):
+    """
+    Garde size processus GopherSAT déjà lancés, bloqués sur la lecture de stdin
+
+    GopherSAT ne résout qu'un CNF par processus, mais le lancement (fork/exec,
+    démarrage du runtime Go) ne dépend pas du CNF : il est fait à l'avance,
+    hors du chemin de la requête. Chaque résolution prend un processus prêt
+    et réveille le thread de relance (un seul thread, démarré par start),
+    qui en relance un pour la suivante. Variantes synchrones et asynchrones
+    en profitent ; sans /dev/stdin, comportement de SubprocessBackend
+
+    Les processus en attente restent dans le processus serveur : transmis à
+    un worker du pool de calcul (pickle), le backend devient un simple
+    SubprocessBackend, sans processus GopherSAT gardés en réserve
+    """
+
+    def __init__(self, gophersat_path: str, size: int = 2):
+        super().__init__(gophersat_path)
+        self.size = size
+        self._idle: List[Tuple[List[str], subprocess.Popen, int]] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._closed = False
+
+    def __reduce__(self):
+        return (SubprocessBackend, (self.gophersat_path,))
+
+    def start(self):
+        """Démarre le thread de relance si besoin et le réveille (préchauffage au démarrage de l'API)"""
+        if STDIN_PATH is None:
+            return
+        with self._lock:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._replenish, name="gophersat-warm", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def close(self):
+        """Arrête le thread de relance et les processus en attente"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        self._wake.set()
+        for started in idle:
+            self._discard(started)
+
+    def run(self, cnf: bytes, timeout: int = 60, text: bool = True) -> subprocess.CompletedProcess:
+        if STDIN_PATH is None:
+            return super().run(cnf, timeout, text)
+        return self.run_stream([cnf], timeout, text)
+
+    def _start_piped(self) -> Tuple[List[str], subprocess.Popen, int]:
+        return self._take_idle() or super()._start_piped()
+
+    async def run_async(self, cnf: bytes, timeout: int = 60) -> subprocess.CompletedProcess:
+        started = self._take_idle()
+        if started is None:
+            return await super().run_async(cnf, timeout)
+
+        async def feed(write_fd):
+            await asyncio.to_thread(_write_all, write_fd, cnf)
+        return await self._run_idle_async(started, feed, timeout)
+
+    async def run_stream_async(self, chunks: AsyncIterable[bytes], timeout: int = 60) -> subprocess.CompletedProcess:
+        started = self._take_idle()
+        if started is None:
+            return await super().run_stream_async(chunks, timeout)
+
+        async def feed(write_fd):
+            async for chunk in chunks:
+                await asyncio.to_thread(_write_all, write_fd, chunk)
+        return await self._run_idle_async(started, feed, timeout)
+
+    async def run_fd_async(self, fd: int, timeout: int = 60) -> subprocess.CompletedProcess:
+        started = self._take_idle()
+        if started is None:
+            return await super().run_fd_async(fd, timeout)
+
+        async def feed(write_fd):
+            await asyncio.to_thread(_copy_fd, fd, write_fd)
+        return await self._run_idle_async(started, feed, timeout)
+
+    async def _run_idle_async(self, started, feed, timeout: int) -> subprocess.CompletedProcess:
+        """
+        Résout sur un processus en attente : feed(write_fd) écrit le CNF
+        pendant qu'un thread lit la sortie (le processus est un Popen, pas
+        un processus asyncio)
+        """
+        args, proc, write_fd = started
+
+        def wait():
+            try:
+                return proc.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.communicate()
+                raise
+
+        waiter = asyncio.ensure_future(asyncio.to_thread(wait))
+        try:
+            await feed(write_fd)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # GopherSAT s'est arrêté avant la fin du CNF
+        except BaseException:
+            # Upload interrompu : le processus ne doit pas résoudre un CNF tronqué
+            proc.kill()
+            await asyncio.gather(waiter, return_exceptions=True)
+            raise
+        finally:
+            os.close(write_fd)
+        stdout, stderr = await waiter
+        return subprocess.CompletedProcess(args, proc.returncode, stdout, stderr)
+
+    def _take_idle(self):
+        """Prend un processus en attente encore vivant (None s'il n'y en a pas) et réveille la relance"""
+        if STDIN_PATH is None:
+            return None
+        taken = None
+        with self._lock:
+            while self._idle and taken is None:
+                started = self._idle.pop()
+                if started[1].poll() is None:
+                    taken = started
+                else:
+                    os.close(started[2])  # Processus arrêté pendant l'attente
+        self.start()
+        return taken
+
+    def _replenish(self):
+        """Thread de relance : à chaque réveil, relance des processus jusqu'à en avoir size en attente"""
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            while not self._closed and len(self._idle) < self.size:
+                try:
+                    started = SubprocessBackend._start_piped(self)
+                except OSError:
+                    break  # Exécutable introuvable : la résolution suivante le signalera
+                with self._lock:
+                    if not self._closed:
+                        self._idle.append(started)
+                        started = None
+                if started is not None:
+                    self._discard(started)
+            if self._closed:
+                return
+
+    @staticmethod
+    def _discard(started):
+        """Arrête un processus en attente"""
+        _, proc, write_fd = started
+        os.close(write_fd)
+        proc.kill()
+        proc.communicate()
+
+
+class PySATBackend(SolverBackend):
+    """
+    Résout le CNF dans le processus avec python-sat (Glucose, MiniSat,
+    CaDiCaL...) : ni fork/exec ni pipe, seulement le texte DIMACS à relire
+
+    La sortie produite a le format de GopherSAT ("s ..." puis "v ... 0"),
+    les solveurs et parse_output l'utilisent donc sans changement
+    """
+
+    def __init__(self, gophersat_path: str, solver_name: str = "glucose4"):
+        super().__init__(gophersat_path)
+        self.solver_name = solver_name
+
+    def is_available(self) -> bool:
+        """Vérifie que python-sat est installé"""
+        return PySATSolver is not None
+
+    def run(self, cnf: bytes, timeout: int = 60, text: bool = True) -> subprocess.CompletedProcess:
+        args = ["pysat", self.solver_name]
+        try:
+            nb_vars, clauses = parse_dimacs(cnf)
+        except ValueError as e:
+            # Comme GopherSAT sur un fichier illisible : erreur sur stderr, code non nul
+            result = subprocess.CompletedProcess(args, 1, b"", str(e).encode('utf-8'))
+            return _as_text(result) if text else result
+
+        with PySATSolver(name=self.solver_name, bootstrap_with=clauses) as solver:
+            # Délai : le solveur est interrompu depuis un minuteur
+            timer = threading.Timer(timeout, solver.interrupt)
+            timer.start()
+            try:
+                satisfiable = solver.solve_limited(expect_interrupt=True)
+            finally:
+                timer.cancel()
+            if satisfiable is None:
+                raise subprocess.TimeoutExpired(args, timeout)
+            model = solver.get_model() if satisfiable else None
+
+        lines = [b"c solved in-process by pysat (%s)" % self.solver_name.encode('ascii')]
+        if model is None:
+            lines.append(b"s UNSATISFIABLE")
+        else:
+            # Comme GopherSAT, toutes les variables de la ligne "p cnf" sont
+            # données (celles absentes des clauses sont fausses)
+            values = np.arange(1, max(nb_vars, len(model)) + 1)
+            values[:len(model)] = model
+            values[len(model):] *= -1
+            lines.append(b"s SATISFIABLE")
+            lines.append(b"v " + " ".join(map(str, values.tolist())).encode('ascii') + b" 0")
+        result = subprocess.CompletedProcess(args, 0, b"\n".join(lines) + b"\n", b"")
+        return _as_text(result) if text else result
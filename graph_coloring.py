@@ -1,44 +1,140 @@
 """
 Module pour résoudre le problème de coloriage de graphe avec SAT
 """
-import tempfile
 import subprocess
-import os
 import io
 import base64
-from typing import List, Dict, Tuple, Optional
+import heapq
+from collections import deque
+from functools import lru_cache
+from typing import List, Dict, Iterator, Tuple, Optional, TextIO
 import matplotlib
 matplotlib.use('Agg')  # Backend sans interface graphique
 import matplotlib.pyplot as plt
 import networkx as nx
+from gophersat_backend import SolverBackend, SubprocessBackend, parse_output
+from plotting import PLOT_LOCK
+
+
+# Au-delà de cette taille, la recherche exhaustive est laissée au solveur SAT
+SMALL_GRAPH_SIZE = 10
+
+# Taille (caractères) des morceaux de CNF envoyés à GopherSAT
+CNF_CHUNK_SIZE = 1 << 16
+
+
+@lru_cache(maxsize=128)
+def _spring_layout(vertices: Tuple[str, ...], edges: Tuple[Tuple[str, str], ...]) -> Dict:
+    """Positions des sommets (layout force, 50 itérations) mises en cache par graphe"""
+    G = nx.Graph()
+    G.add_nodes_from(vertices)
+    G.add_edges_from(edges)
+    return nx.spring_layout(G, k=2, iterations=50)
+
+
+def _nb_bits(nb_colors: int) -> int:
+    """Nombre de bits auxiliaires par sommet pour l'encodage binaire : ⌈log₂|K|⌉"""
+    return (nb_colors - 1).bit_length()
+
+
+@lru_cache(maxsize=64)
+def _vertex_clauses(nb_vertices: int, nb_colors: int) -> Tuple[str, int]:
+    """
+    Contraintes 1 et 2 (au moins / au plus une couleur par sommet)
+    Elles ne dépendent que de |V| et |K| : le texte DIMACS est mis en cache
+    
+    L'"au plus une" utilise l'encodage binaire : chaque sommet a ⌈log₂|K|⌉
+    bits auxiliaires (numérotés après les |V|·|K| variables x_{v,c}) et
+    x_{v,c} force ces bits à l'écriture binaire de c. Deux couleurs ayant
+    des codes différents, une seule peut être vraie : |V|·|K|·log|K|
+    clauses binaires au lieu de |V|·|K|²/2
+
+    Returns:
+        (texte DIMACS des clauses, nombre de clauses)
+    """
+    lines = []
+    # Littéraux préformatés : une seule conversion int -> str par variable
+    nb_bits = _nb_bits(nb_colors)
+    var_str = [str(i) for i in range(nb_vertices * (nb_colors + nb_bits) + 1)]
+    neg_str = ["-" + v for v in var_str]
+    
+    # Contrainte 1: Chaque sommet doit avoir au moins une couleur
+    for v_idx in range(nb_vertices):
+        first = v_idx * nb_colors + 1
+        lines.append(" ".join(var_str[first:first + nb_colors]) + " 0")
+    
+    # Contrainte 2: Chaque sommet ne peut avoir qu'une seule couleur (binaire)
+    # ¬x_{v,c} ∨ (b_{v,k} si le bit k de c vaut 1, sinon ¬b_{v,k})
+    first_aux = nb_vertices * nb_colors + 1
+    for v_idx in range(nb_vertices):
+        first = v_idx * nb_colors + 1
+        bits = first_aux + v_idx * nb_bits
+        for c_idx in range(nb_colors):
+            neg = neg_str[first + c_idx] + " "
+            lines.extend([
+                neg + (var_str if (c_idx >> k) & 1 else neg_str)[bits + k] + " 0"
+                for k in range(nb_bits)
+            ])
+    
+    return "\n".join(lines), len(lines)
 
 
 class GraphColoringSAT:
     """Résout le problème de coloriage de graphe en utilisant un solveur SAT"""
     
-    def __init__(self, gophersat_path: str):
+    def __init__(self, gophersat_path: str, backend: Optional[SolverBackend] = None,
+                 symmetry_breaking: bool = True):
+        """
+        symmetry_breaking: ajouter au CNF le cassage de symétrie des couleurs
+        (clique fixée + précédence des valeurs) ; False pour comparer avec
+        l'encodage brut
+        """
         self.gophersat_path = gophersat_path
+        self.backend = backend or SubprocessBackend(gophersat_path)
+        self.break_symmetries = symmetry_breaking
         
-    def encode_variable(self, vertex: str, color: str, vertices: List[str], colors: List[str]) -> int:
+    @staticmethod
+    def index_maps(vertices: List[str], colors: List[str]) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """
+        Tables position_sommet / position_couleur, à construire une fois par
+        CNF (en cas de doublon, la première position compte, comme list.index)
+        """
+        vertex_idx = {}
+        for i, vertex in enumerate(vertices):
+            vertex_idx.setdefault(vertex, i)
+        color_idx = {}
+        for i, color in enumerate(colors):
+            color_idx.setdefault(color, i)
+        return vertex_idx, color_idx
+    
+    def encode_variable(self, vertex: str, color: str, vertices: List[str], colors: List[str],
+                        index: Optional[Tuple[Dict[str, int], Dict[str, int]]] = None) -> int:
         """
         Encode une variable (sommet, couleur) en un entier unique
         Variable x_{v,c} : le sommet v a la couleur c
         
         Formule: position_sommet * nb_couleurs + position_couleur + 1
+        index: tables de index_maps, pour éviter deux recherches linéaires par appel
         """
-        v_idx = vertices.index(vertex)
-        c_idx = colors.index(color)
-        return v_idx * len(colors) + c_idx + 1
+        if index is None:
+            return vertices.index(vertex) * len(colors) + colors.index(color) + 1
+        vertex_idx, color_idx = index
+        return vertex_idx[vertex] * len(colors) + color_idx[color] + 1
     
-    def decode_variable(self, var_num: int, vertices: List[str], colors: List[str]) -> Tuple[str, str]:
-        """Décode un numéro de variable en (sommet, couleur)"""
+    def decode_variable(self, var_num: int, vertices: List[str], colors: List[str]) -> Optional[Tuple[str, str]]:
+        """
+        Décode un numéro de variable en (sommet, couleur)
+        Retourne None pour les bits auxiliaires de l'encodage binaire
+        """
+        if var_num > len(vertices) * len(colors):
+            return None
         var_num -= 1  # Retour à l'indexation 0
         v_idx = var_num // len(colors)
         c_idx = var_num % len(colors)
         return vertices[v_idx], colors[c_idx]
     
-    def generate_cnf(self, vertices: List[str], edges: List[Tuple[str, str]], 
-                     colors: List[str]) -> Tuple[str, int, int]:
+    def iter_cnf_lines(self, vertices: List[str], edges: List[Tuple[str, str]],
+                       colors: List[str]) -> Tuple[int, int, Iterator[str]]:
         """
         Génère le fichier CNF pour le problème de coloriage avec commentaires détaillés
         
@@ -49,68 +145,344 @@ class GraphColoringSAT:
         
         Contraintes:
         1. Chaque sommet doit avoir au moins une couleur
-        2. Chaque sommet ne peut avoir qu'une seule couleur (pairwise)
+        2. Chaque sommet ne peut avoir qu'une seule couleur (encodage binaire)
         3. Deux sommets adjacents ne peuvent avoir la même couleur
         
+        Pré-traitement : une clique du graphe est fixée aux premières couleurs
+        (cassage de symétrie, cf. symmetry_breaking), ce qui donne des clauses
+        unitaires ; les clauses d'arêtes sont simplifiées en conséquence
+        
+        Les compteurs sont calculés d'abord (ils figurent dans la ligne
+        "p cnf"), les lignes sont ensuite produites à la demande, sans
+        construire le CNF complet en mémoire
+        
         Returns:
-            (cnf_content, nb_variables, nb_clauses)
+            (nb_variables, nb_clauses, itérateur des lignes sans "\n")
         """
-        clauses = []
+        # Nombre total de variables: |V| * |K| + bits auxiliaires |V| * ⌈log₂|K|⌉
+        nb_main_variables = len(vertices) * len(colors)
+        nb_bits = _nb_bits(len(colors))
+        nb_variables = nb_main_variables + len(vertices) * nb_bits
+        
+        # Contraintes 1 et 2 : gabarit mis en cache pour (|V|, |K|)
+        vertex_clauses, nb_vertex_clauses = _vertex_clauses(len(vertices), len(colors))
         
-        # Nombre total de variables: |V| * |K|
-        nb_variables = len(vertices) * len(colors)
-        
-        # En-têtes avec commentaires
-        cnf_lines = []
-        edges_str = ','.join(['{'+','.join(e)+'}' for e in edges])
-        cnf_lines.append(f"c Graph coloring for G = (V,E) with V={{{','.join(vertices)}}}, E={{{edges_str}}}")
-        cnf_lines.append(f"c Colors K = {{{','.join(colors)}}}")
-        cnf_lines.append("c")
-        cnf_lines.append("c Variable mapping:")
-        
-        # Mapping des variables avec alignement
-        var_num = 1
-        for vertex in vertices:
-            for color in colors:
-                cnf_lines.append(f"c {var_num:2d} = {vertex}_{color}")
-                var_num += 1
-        cnf_lines.append("c")
-        
-        # Contrainte 1: Chaque sommet doit avoir au moins une couleur
-        for vertex in vertices:
-            clause = []
-            for color in colors:
-                var = self.encode_variable(vertex, color, vertices, colors)
-                clause.append(var)
-            clauses.append(clause)
-        
-        # Contrainte 2: Chaque sommet ne peut avoir qu'une seule couleur (pairwise)
-        for vertex in vertices:
-            for i, color1 in enumerate(colors):
-                for color2 in colors[i+1:]:
-                    var1 = self.encode_variable(vertex, color1, vertices, colors)
-                    var2 = self.encode_variable(vertex, color2, vertices, colors)
-                    clauses.append([-var1, -var2])
-        
-        # Contrainte 3: Deux sommets adjacents ne peuvent avoir la même couleur
+        # (var_of[sommet] : première variable du sommet, cf. encode_variable)
+        vertex_idx, _ = self.index_maps(vertices, colors)
+        nb_colors = len(colors)
+        var_of = {vertex: i * nb_colors + 1 for vertex, i in vertex_idx.items()}
+        
+        # Cassage de symétrie : fixed[sommet] = indice de couleur imposé,
+        # puis clauses de précédence des valeurs
+        if self.break_symmetries:
+            adjacency = self._adjacency(vertices, edges)
+            fixed = self.symmetry_breaking(vertices, edges, colors, adjacency)
+            precedence = self.value_precedence(adjacency, nb_colors, fixed, var_of)
+        else:
+            fixed = {}
+            precedence = []
+        
+        # Unités du cassage de symétrie, propagées sur les clauses d'arêtes :
+        # x_{u,c} est vrai si u est fixé à c, faux si u est fixé à une autre couleur.
+        # Premier passage sur les arêtes : littéraux ¬x_{v,c} devenus unitaires
+        # (ordre conservé) et nombre de clauses d'arêtes restantes
+        forbidden = {}
+        nb_edge_clauses = 0
         for u, v in edges:
-            for color in colors:
-                var_u = self.encode_variable(u, color, vertices, colors)
-                var_v = self.encode_variable(v, color, vertices, colors)
-                clauses.append([-var_u, -var_v])
+            fixed_u = fixed.get(u)
+            fixed_v = fixed.get(v)
+            if fixed_u is None and fixed_v is None:
+                nb_edge_clauses += nb_colors
+            elif fixed_u is None:
+                forbidden.setdefault(var_of[u] + fixed_v)
+            elif fixed_v is None:
+                forbidden.setdefault(var_of[v] + fixed_u)
+            elif fixed_u == fixed_v:
+                nb_edge_clauses += 1  # Conflit (boucle sur un sommet fixé)
+            # Sinon, les deux sommets sont fixés à des couleurs différentes : clauses satisfaites
         
-        nb_clauses = len(clauses)
+        nb_clauses = nb_vertex_clauses + len(fixed) + len(forbidden) + len(precedence) + nb_edge_clauses
         
-        # Ligne p cnf
-        cnf_lines.append(f"p cnf {nb_variables} {nb_clauses}")
+        def lines() -> Iterator[str]:
+            # En-têtes avec commentaires
+            edges_str = ','.join(['{'+','.join(e)+'}' for e in edges])
+            yield f"c Graph coloring for G = (V,E) with V={{{','.join(vertices)}}}, E={{{edges_str}}}"
+            yield f"c Colors K = {{{','.join(colors)}}}"
+            yield "c"
+            yield "c Variable mapping:"
+            
+            # Mapping des variables avec alignement
+            var_num = 1
+            for vertex in vertices:
+                for color in colors:
+                    yield f"c {var_num:2d} = {vertex}_{color}"
+                    var_num += 1
+            if nb_bits:
+                yield (f"c {nb_main_variables + 1}..{nb_variables} = "
+                       f"bits auxiliaires ({nb_bits} par sommet, au plus une couleur)")
+            yield "c"
+            if fixed:
+                fixed_str = ', '.join(f"{vertex}={colors[c_idx]}" for vertex, c_idx in fixed.items())
+                yield f"c Symmetry breaking: {fixed_str}"
+                yield "c"
+            if precedence:
+                yield f"c Value precedence: {len(precedence)} clauses"
+                yield "c"
+            
+            # Ligne p cnf
+            yield f"p cnf {nb_variables} {nb_clauses}"
+            for vertex, c_idx in fixed.items():
+                yield f"{var_of[vertex] + c_idx} 0"
+            for var in forbidden:
+                yield f"-{var} 0"
+            for clause in precedence:
+                yield " ".join(map(str, clause)) + " 0"
+            if vertex_clauses:
+                yield vertex_clauses
+            
+            # Contrainte 3: Deux sommets adjacents ne peuvent avoir la même couleur
+            # Clauses directement préformatées (littéraux négatifs en cache)
+            neg_str = ["-" + str(i) for i in range(nb_variables + 1)]
+            for u, v in edges:
+                first_u = var_of[u]
+                first_v = var_of[v]
+                fixed_u = fixed.get(u)
+                fixed_v = fixed.get(v)
+                if fixed_u is None and fixed_v is None:
+                    if not nb_colors:
+                        continue
+                    yield "\n".join([
+                        neg_str[first_u + c_idx] + " " + neg_str[first_v + c_idx] + " 0"
+                        for c_idx in range(nb_colors)
+                    ])
+                elif fixed_u is not None and fixed_u == fixed_v:
+                    # Conflit gardé pour que GopherSAT conclue
+                    yield neg_str[first_u + fixed_u] + " " + neg_str[first_v + fixed_v] + " 0"
         
-        for clause in clauses:
-            clause_str = " ".join(map(str, clause)) + " 0"
-            cnf_lines.append(clause_str)
+        return nb_variables, nb_clauses, lines()
+    
+    def write_cnf(self, out: TextIO, vertices: List[str], edges: List[Tuple[str, str]],
+                  colors: List[str]) -> Tuple[int, int]:
+        """
+        Écrit le CNF ligne par ligne dans un flux texte (fichier, StringIO)
         
-        cnf_content = "\n".join(cnf_lines)
-        return cnf_content, nb_variables, nb_clauses
+        Returns:
+            (nb_variables, nb_clauses)
+        """
+        nb_variables, nb_clauses, lines = self.iter_cnf_lines(vertices, edges, colors)
+        out.writelines(line + "\n" for line in lines)
+        return nb_variables, nb_clauses
     
+    def generate_cnf(self, vertices: List[str], edges: List[Tuple[str, str]], 
+                     colors: List[str]) -> Tuple[str, int, int]:
+        """
+        Génère le CNF complet en mémoire (cf. iter_cnf_lines)
+        
+        Returns:
+            (cnf_content, nb_variables, nb_clauses)
+        """
+        nb_variables, nb_clauses, lines = self.iter_cnf_lines(vertices, edges, colors)
+        return "\n".join(lines), nb_variables, nb_clauses
+    
+    def _adjacency(self, vertices: List[str], edges: List[Tuple[str, str]]) -> Dict[str, set]:
+        """Voisins de chaque sommet (boucles ignorées)"""
+        adjacency = {vertex: set() for vertex in vertices}
+        for u, v in edges:
+            if u != v:
+                adjacency[u].add(v)
+                adjacency[v].add(u)
+        return adjacency
+
+    def symmetry_breaking(self, vertices: List[str], edges: List[Tuple[str, str]],
+                          colors: List[str], adjacency: Optional[Dict[str, set]] = None) -> Dict[str, int]:
+        """
+        Cassage de symétrie des couleurs : les couleurs étant interchangeables,
+        les sommets d'une clique (construite gloutonnement par degré
+        décroissant, au plus |K| sommets) peuvent recevoir les couleurs
+        0, 1, 2... sans perdre de solution
+
+        Returns:
+            {sommet: indice de couleur imposé}
+        """
+        if adjacency is None:
+            adjacency = self._adjacency(vertices, edges)
+
+        clique = self.greedy_clique(adjacency, len(colors))
+        return {vertex: c_idx for c_idx, vertex in enumerate(clique)}
+
+    def value_precedence(self, adjacency: Dict[str, set], nb_colors: int,
+                         fixed: Dict[str, int], var_of: Dict[str, int]) -> List[List[int]]:
+        """
+        Précédence des valeurs sur les premiers sommets (la clique fixée, puis
+        par degré décroissant) : le i-ème sommet ne prend la couleur c > i
+        que si c - 1 est déjà utilisée par un sommet précédent
+            ¬x_{v_i,c} ∨ x_{v_0,c-1} ∨ ... ∨ x_{v_{i-1},c-1}
+        Toute solution s'y ramène en renumérotant les couleurs dans l'ordre
+        de première apparition. Les clauses déjà satisfaites par fixed sont
+        omises et les littéraux faux retirés
+
+        Returns:
+            Liste de clauses (littéraux entiers)
+        """
+        order = list(fixed) + [
+            vertex for vertex in sorted(adjacency, key=lambda vertex: len(adjacency[vertex]), reverse=True)
+            if vertex not in fixed
+        ]
+        clauses = []
+        for i in range(1, min(nb_colors - 1, len(order) - 1) + 1):
+            vertex = order[i]
+            if vertex in fixed:
+                continue  # Fixé à la couleur i : x_{v_i,c} est faux pour c > i
+            for c_idx in range(i + 1, nb_colors):
+                clause = [-(var_of[vertex] + c_idx)]
+                for previous in order[:i]:
+                    if previous not in fixed:
+                        clause.append(var_of[previous] + c_idx - 1)
+                    elif fixed[previous] == c_idx - 1:
+                        break  # Couleur c - 1 déjà utilisée : clause satisfaite
+                else:
+                    clauses.append(clause)
+        return clauses
+
+    def greedy_clique(self, adjacency: Dict[str, set], limit: int) -> List[str]:
+        """
+        Clique construite gloutonnement par degré décroissant (au plus limit
+        sommets) : une borne inférieure du nombre chromatique
+        """
+        clique = []
+        for vertex in sorted(adjacency, key=lambda vertex: len(adjacency[vertex]), reverse=True):
+            if len(clique) == limit:
+                break
+            if all(member in adjacency[vertex] for member in clique):
+                clique.append(vertex)
+        return clique
+
+    def dsatur_coloring(self, vertices: List[str], adjacency: Dict[str, set],
+                        nb_colors: int) -> Optional[Dict[str, int]]:
+        """
+        Coloriage glouton DSATUR : on colore d'abord le sommet ayant le plus
+        de couleurs distinctes chez ses voisins (puis le plus haut degré),
+        avec la plus petite couleur libre. Réussit toujours si Δ(G) < |K|
+
+        Returns:
+            {sommet: indice de couleur} ou None si DSATUR dépasse nb_colors
+            (le graphe peut malgré tout être coloriable)
+        """
+        order = list(dict.fromkeys(vertices))
+        saturation = {vertex: set() for vertex in order}
+        assignment = {}
+
+        # Tas (-saturation, -degré, rang, sommet) ; les entrées périmées
+        # (saturation changée depuis) sont ignorées au dépilement
+        heap = [(0, -len(adjacency[vertex]), i, vertex) for i, vertex in enumerate(order)]
+        heapq.heapify(heap)
+        rank = {vertex: i for i, vertex in enumerate(order)}
+        while heap:
+            neg_saturation, _, _, u = heapq.heappop(heap)
+            if u in assignment or -neg_saturation != len(saturation[u]):
+                continue
+            color = 0
+            while color in saturation[u]:
+                color += 1
+            if color >= nb_colors:
+                return None
+            assignment[u] = color
+            for v in adjacency[u]:
+                if v not in assignment and color not in saturation[v]:
+                    saturation[v].add(color)
+                    heapq.heappush(heap, (-len(saturation[v]), -len(adjacency[v]), rank[v], v))
+        return assignment
+
+    def bipartition(self, adjacency: Dict[str, set]) -> Optional[Dict[str, int]]:
+        """
+        2-coloriage par parcours en largeur
+
+        Returns:
+            {sommet: 0 ou 1} si le graphe est biparti, sinon None
+        """
+        side = {}
+        for start in adjacency:
+            if start in side:
+                continue
+            side[start] = 0
+            queue = deque([start])
+            while queue:
+                u = queue.popleft()
+                for v in adjacency[u]:
+                    if v not in side:
+                        side[v] = 1 - side[u]
+                        queue.append(v)
+                    elif side[v] == side[u]:
+                        return None
+        return side
+
+    def small_graph_coloring(self, vertices: List[str], adjacency: Dict[str, set],
+                             nb_colors: int) -> Optional[Dict[str, int]]:
+        """
+        Recherche exhaustive (backtracking) d'un coloriage à nb_colors couleurs
+        Une nouvelle couleur n'est essayée qu'une fois (symétrie des couleurs)
+
+        Returns:
+            {sommet: indice de couleur} ou None s'il n'en existe pas
+        """
+        order = list(dict.fromkeys(vertices))
+        assignment = {}
+
+        def backtrack(i: int, used: int) -> bool:
+            if i == len(order):
+                return True
+            u = order[i]
+            forbidden = {assignment[v] for v in adjacency[u] if v in assignment}
+            for c in range(min(used + 1, nb_colors)):
+                if c not in forbidden:
+                    assignment[u] = c
+                    if backtrack(i + 1, max(used, c + 1)):
+                        return True
+                    del assignment[u]
+            return False
+
+        return assignment if backtrack(0, 0) else None
+
+    def fast_coloring(self, vertices: List[str], edges: List[Tuple[str, str]],
+                      colors: List[str]) -> Tuple[bool, Optional[Dict[str, str]]]:
+        """
+        Pré-solveur sans SAT pour les cas simples :
+        - graphe biparti : 2-coloriage par BFS
+        - coloriage glouton DSATUR en au plus |K| couleurs (toujours
+          trouvé si le degré maximal est < |K|)
+        - petit graphe (|V| <= SMALL_GRAPH_SIZE) : recherche exhaustive
+        - clique de plus de |K| sommets : aucun coloriage
+
+        Returns:
+            (decided, phi) - decided=False si le solveur SAT doit trancher ;
+            phi=None si le graphe n'est pas coloriable avec K
+        """
+        adjacency = {vertex: set() for vertex in vertices}
+        for u, v in edges:
+            if u == v:
+                return True, None  # Boucle : aucun coloriage possible
+            adjacency[u].add(v)
+            adjacency[v].add(u)
+
+        side = self.bipartition(adjacency)
+        if side is not None and (len(colors) >= 2 or not edges):
+            return True, {vertex: colors[side[vertex]] for vertex in vertices}
+
+        assignment = self.dsatur_coloring(vertices, adjacency, len(colors))
+        if assignment is not None:
+            return True, {vertex: colors[assignment[vertex]] for vertex in vertices}
+
+        if len(adjacency) <= SMALL_GRAPH_SIZE:
+            assignment = self.small_graph_coloring(vertices, adjacency, len(colors))
+            if assignment is None:
+                return True, None
+            return True, {vertex: colors[assignment[vertex]] for vertex in vertices}
+
+        if len(self.greedy_clique(adjacency, len(colors) + 1)) > len(colors):
+            return True, None  # K_{|K|+1} : plus de sommets que de couleurs
+
+        return False, None
+
     def plot_graph(self, vertices: List[str], edges: List[Tuple[str, str]], 
                    coloring: Dict[str, str]) -> str:
         """
@@ -157,14 +529,14 @@ class GraphColoringSAT:
             matplotlib_color = color_map.get(color.lower(), color)
             node_colors.append(matplotlib_color)
         
-        # Créer la figure
-        plt.figure(figsize=(10, 8))
+        # Créer la figure (API objet : la figure est fermée explicitement)
+        fig, ax = plt.subplots(figsize=(10, 8))
         
-        # Position des nœuds (layout automatique)
-        pos = nx.spring_layout(G, k=2, iterations=50)
+        # Position des nœuds (layout automatique, en cache pour ce graphe)
+        pos = _spring_layout(tuple(vertices), tuple(tuple(edge) for edge in edges))
         
         # Dessiner le graphe
-        nx.draw(G, pos, 
+        nx.draw(G, pos, ax=ax,
                 node_color=node_colors,
                 node_size=1500,
                 with_labels=True,
@@ -175,7 +547,7 @@ class GraphColoringSAT:
                 linewidths=2,
                 edgecolors='black')
         
-        plt.title("Graphe Colorié", fontsize=18, fontweight='bold')
+        ax.set_title("Graphe Colorié", fontsize=18, fontweight='bold')
         
         # Ajouter une légende avec les couleurs utilisées
         unique_colors = set(coloring.values())
@@ -187,19 +559,29 @@ class GraphColoringSAT:
                           markerfacecolor=matplotlib_color, markersize=10,
                           label=f'Couleur: {color}')
             )
-        plt.legend(handles=legend_elements, loc='upper right')
+        ax.legend(handles=legend_elements, loc='upper right')
         
         # Convertir en base64
         buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
+        fig.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
+        plt.close(fig)
         buffer.seek(0)
         image_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-        plt.close()
         
         return image_base64
     
+    def render_plot(self, vertices: List[str], edges: List[Tuple[str, str]],
+                    phi: Dict[str, str]) -> Optional[str]:
+        """Visualisation du coloriage (base64), None en cas d'erreur de tracé"""
+        try:
+            with PLOT_LOCK:
+                return self.plot_graph(vertices, edges, phi)
+        except Exception as e:
+            print(f"Erreur lors de la génération du plot: {e}")
+            return None
+    
     def solve(self, vertices: List[str], edges: List[Tuple[str, str]], 
-              colors: List[str]) -> Dict:
+              colors: List[str], plot: bool = True) -> Dict:
         """
         Résout le problème de coloriage de graphe
         
@@ -210,12 +592,15 @@ class GraphColoringSAT:
             vertices: V - Liste des sommets (ex: ['A', 'B', 'C', 'D'])
             edges: E - Liste des arêtes (ex: [('A', 'B'), ('A', 'C')])
             colors: K - Liste des couleurs (ex: ['r', 'v', 'b'])
+            plot: générer la visualisation (sinon "plot" vaut None et
+                  l'image peut être produite à part avec render_plot)
             
         Returns:
             Dictionnaire avec:
             - satisfiable: bool
             - phi: Dict[str, str] ou None (le coloriage φ : V → K)
-            - cnf_file: str (le fichier CNF généré)
+            - cnf_file: str (le fichier CNF généré, None si résolu sans SAT)
+            - fast_path: bool (résolu par le pré-solveur, sans GopherSAT)
             - stats: Dict (statistiques)
         """
         # Validation
@@ -230,62 +615,84 @@ class GraphColoringSAT:
             if u not in vertex_set or v not in vertex_set:
                 return {"error": f"Arête invalide: ({u}, {v}) - sommets non dans V"}
         
-        # Générer le CNF
+        # Pré-solveur : graphes bipartis et petits graphes, sans CNF ni GopherSAT
+        decided, phi = self.fast_coloring(vertices, edges, colors)
+        if decided:
+            stats = {
+                "nb_variables": 0,
+                "nb_clauses": 0,
+                "nb_vertices": len(vertices),
+                "nb_edges": len(edges),
+                "nb_colors": len(colors)
+            }
+            if phi is None:
+                return {
+                    "satisfiable": False,
+                    "phi": None,
+                    "message": f"Aucun coloriage n'existe pour ce graphe avec K = {{{','.join(colors)}}}",
+                    "cnf_file": None,
+                    "fast_path": True,
+                    "stats": stats
+                }
+            
+            plot_image = self.render_plot(vertices, edges, phi) if plot else None
+            
+            stats["colors_used"] = len(set(phi.values()))
+            return {
+                "satisfiable": True,
+                "phi": phi,  # φ : V → K (le coloriage)
+                "message": f"Coloriage trouvé: φ : V → K où φ = {phi}",
+                "plot": plot_image,  # Image base64
+                "cnf_file": None,
+                "fast_path": True,
+                "stats": stats
+            }
+        
+        # Générer le CNF (les lignes sont produites pendant la résolution)
         try:
-            cnf_content, nb_vars, nb_clauses = self.generate_cnf(vertices, edges, colors)
+            nb_vars, nb_clauses, lines = self.iter_cnf_lines(vertices, edges, colors)
         except Exception as e:
             return {"error": f"Erreur lors de la génération du CNF: {str(e)}"}
         
-        # Créer un fichier temporaire avec encodage UTF-8
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.cnf', delete=False, newline='\n', encoding='utf-8') as temp_file:
-            temp_path = temp_file.name
-            temp_file.write(cnf_content)
-            temp_file.write('\n')  # Ajouter une ligne vide à la fin
-            temp_file.flush()  # Forcer l'écriture
+        cnf_parts = []  # Copie du CNF pour la réponse (cnf_file)
+        
+        def cnf_chunks():
+            batch = []
+            size = 0
+            for line in lines:
+                cnf_parts.append(line)
+                batch.append(line)
+                size += len(line)
+                if size >= CNF_CHUNK_SIZE:
+                    yield ("\n".join(batch) + "\n").encode('utf-8')
+                    batch = []
+                    size = 0
+            if batch:
+                yield ("\n".join(batch) + "\n").encode('utf-8')
         
         try:
-            # Exécuter GopherSAT
-            result = subprocess.run(
-                [self.gophersat_path, temp_path],
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            # Exécuter GopherSAT en lui envoyant le CNF au fil de sa génération
+            result = self.backend.run_stream(cnf_chunks(), timeout=60, text=False)
+            cnf_content = "\n".join(cnf_parts) + "\n"
             
-            # Parser la sortie
-            stdout_lines = result.stdout.strip().split('\n')
-            
-            status = "UNKNOWN"
-            solution_vars = []
-            
-            for line in stdout_lines:
-                line = line.strip()
-                if line.startswith('s '):
-                    status = line[2:].strip()
-                elif line.startswith('v '):
-                    vars_str = line[2:].strip()
-                    solution_vars.extend(vars_str.split())
-            
-            # Nettoyer la solution
-            if solution_vars and solution_vars[-1] == '0':
-                solution_vars = solution_vars[:-1]
+            # Parser la sortie (une seule passe regex sur les bytes)
+            parsed = parse_output(result.stdout)
+            status = parsed["status"]
+            model = parsed["model"]
             
             if status == "SATISFIABLE":
-                # Décoder la solution - φ : V → K
-                phi = {}  # Le coloriage φ
-                for var_str in solution_vars:
-                    if var_str != '0':
-                        var_num = int(var_str)
-                        if var_num > 0:  # Variable vraie
-                            vertex, color = self.decode_variable(var_num, vertices, colors)
-                            phi[vertex] = color
+                # Décoder la solution - φ : V → K (vectorisé - cf. decode_variable)
+                # Variables vraies, hors bits auxiliaires
+                nb_colors = len(colors)
+                true_vars = model[(model > 0) & (model <= len(vertices) * nb_colors)] - 1
+                phi = {  # Le coloriage φ
+                    vertices[v_idx]: colors[c_idx]
+                    for v_idx, c_idx in zip((true_vars // nb_colors).tolist(),
+                                            (true_vars % nb_colors).tolist())
+                }
                 
                 # Générer la visualisation
-                try:
-                    plot_image = self.plot_graph(vertices, edges, phi)
-                except Exception as e:
-                    plot_image = None
-                    print(f"Erreur lors de la génération du plot: {e}")
+                plot_image = self.render_plot(vertices, edges, phi) if plot else None
                 
                 return {
                     "satisfiable": True,
@@ -293,6 +700,7 @@ class GraphColoringSAT:
                     "message": f"Coloriage trouvé: φ : V → K où φ = {phi}",
                     "plot": plot_image,  # Image base64
                     "cnf_file": cnf_content,
+                    "fast_path": False,
                     "stats": {
                         "nb_variables": nb_vars,
                         "nb_clauses": nb_clauses,
@@ -302,8 +710,8 @@ class GraphColoringSAT:
                         "colors_used": len(set(phi.values()))
                     },
                     "debug_info": {
-                        "gophersat_stdout": result.stdout,
-                        "gophersat_stderr": result.stderr,
+                        "gophersat_stdout": result.stdout.decode('utf-8', errors='replace'),
+                        "gophersat_stderr": result.stderr.decode('utf-8', errors='replace'),
                         "return_code": result.returncode
                     }
                 }
@@ -313,6 +721,7 @@ class GraphColoringSAT:
                     "phi": None,
                     "message": f"Aucun coloriage n'existe pour ce graphe avec K = {{{','.join(colors)}}}",
                     "cnf_file": cnf_content,
+                    "fast_path": False,
                     "stats": {
                         "nb_variables": nb_vars,
                         "nb_clauses": nb_clauses,
@@ -321,8 +730,8 @@ class GraphColoringSAT:
                         "nb_colors": len(colors)
                     },
                     "debug_info": {
-                        "gophersat_stdout": result.stdout,
-                        "gophersat_stderr": result.stderr,
+                        "gophersat_stdout": result.stdout.decode('utf-8', errors='replace'),
+                        "gophersat_stderr": result.stderr.decode('utf-8', errors='replace'),
                         "return_code": result.returncode,
                         "parsed_status": status
                     }
@@ -332,7 +741,12 @@ class GraphColoringSAT:
             return {"error": "Timeout lors de l'exécution du solveur (>60s)"}
         except Exception as e:
             return {"error": f"Erreur lors de l'exécution: {str(e)}"}
-        finally:
-          
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
\ No newline at end of file
+
+
+def render_coloring_plot(vertices: List[str], edges: List[Tuple[str, str]],
+                         phi: Dict[str, str]) -> Optional[str]:
+    """
+    Visualisation d'un coloriage (base64), hors de la résolution
+    Fonction de module pour pouvoir être exécutée dans un ProcessPoolExecutor
+    """
+    return GraphColoringSAT(gophersat_path=None).render_plot(vertices, edges, phi)
\ No newline at end of file
@@ -4,10 +4,142 @@ Implémente BFS, DFS, IDDFS pour résoudre un labyrinthe
 """
 from typing import List, Tuple, Optional, Set
 from collections import deque
+from functools import lru_cache
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # Numba optionnel : BFS/DFS en Python pur
+    njit = None
+
+# Octet d'un mur dans Maze.flat
+WALL = ord('#')
+
+# Case pas encore atteinte (tableau des parents)
+UNSEEN = -1
+
+
+# ----------------------------------------------------------------------------
+# Noyaux BFS/DFS compilés par Numba (sur la grille à plat en uint8)
+# Ils retournent (chemin en indices à plat, [explorés, générés, frontière max])
+# et reproduisent exactement l'ordre et les stats des versions Python
+# ----------------------------------------------------------------------------
+
+def _cell_neighbors(flat, rows, cols, cell, out):
+    """Écrit dans out les voisins libres de cell (haut, droite, bas, gauche)"""
+    n = 0
+    r = cell // cols
+    c = cell - r * cols
+    if r > 0 and flat[cell - cols] != WALL:
+        out[n] = cell - cols
+        n += 1
+    if c < cols - 1 and flat[cell + 1] != WALL:
+        out[n] = cell + 1
+        n += 1
+    if r < rows - 1 and flat[cell + cols] != WALL:
+        out[n] = cell + cols
+        n += 1
+    if c > 0 and flat[cell - 1] != WALL:
+        out[n] = cell - 1
+        n += 1
+    return n
+
+
+def _path_from_parents(parents, start, goal):
+    """Chemin départ -> but à partir du tableau des parents"""
+    length = 1
+    cur = goal
+    while cur != start:
+        cur = parents[cur]
+        length += 1
+    path = np.empty(length, np.int32)
+    cur = goal
+    for i in range(length - 1, -1, -1):
+        path[i] = cur
+        cur = parents[cur]
+    return path
+
+
+def _bfs_kernel(flat, rows, cols, start, goal):
+    size = rows * cols
+    stats = np.zeros(3, np.int64)
+    parents = np.full(size, UNSEEN, np.int32)  # Sert aussi d'ensemble exploré
+    queue = np.empty(size, np.int32)  # Chaque case est enfilée au plus une fois
+    succ = np.empty(4, np.int32)
+    parents[start] = start
+    queue[0] = start
+    head = 0
+    tail = 1
+
+    while head < tail:
+        stats[2] = max(stats[2], tail - head)
+        cell = queue[head]
+        head += 1
+        stats[0] += 1
+
+        if cell == goal:
+            return _path_from_parents(parents, start, goal), stats
+
+        for k in range(_cell_neighbors(flat, rows, cols, cell, succ)):
+            nxt = succ[k]
+            if parents[nxt] == UNSEEN:
+                parents[nxt] = cell
+                queue[tail] = nxt
+                tail += 1
+                stats[1] += 1
+
+    return np.empty(0, np.int32), stats
+
+
+def _dfs_kernel(flat, rows, cols, start, goal, max_depth):
+    size = rows * cols
+    stats = np.zeros(3, np.int64)
+    parents = np.full(size, UNSEEN, np.int32)
+    # Pile (case, parent, profondeur) : au plus 4 empilements par case explorée
+    stack = np.empty((4 * size + 1, 3), np.int32)
+    succ = np.empty(4, np.int32)
+    stack[0, 0] = start
+    stack[0, 1] = start
+    stack[0, 2] = 0
+    top = 1
+
+    while top > 0:
+        stats[2] = max(stats[2], top)
+        top -= 1
+        cell = stack[top, 0]
+        if parents[cell] != UNSEEN:
+            continue
+
+        parents[cell] = stack[top, 1]
+        depth = stack[top, 2]
+        stats[0] += 1
+
+        if cell == goal:
+            return _path_from_parents(parents, start, goal), stats
+
+        if max_depth < 0 or depth < max_depth:
+            n = _cell_neighbors(flat, rows, cols, cell, succ)
+            for k in range(n - 1, -1, -1):  # Ordre inverse pour respecter l'ordre
+                nxt = succ[k]
+                if parents[nxt] == UNSEEN:
+                    stack[top, 0] = nxt
+                    stack[top, 1] = cell
+                    stack[top, 2] = depth + 1
+                    top += 1
+                    stats[1] += 1
+
+    return np.empty(0, np.int32), stats
+
+
+if njit is not None:
+    _cell_neighbors = njit(cache=True)(_cell_neighbors)
+    _path_from_parents = njit(cache=True)(_path_from_parents)
+    _bfs_kernel = njit(cache=True)(_bfs_kernel)
+    _dfs_kernel = njit(cache=True)(_dfs_kernel)
 
 
 class Maze:
-    """Représente un labyrinthe 2D"""
+    """Représente un labyrinthe 2D (en lecture seule une fois construit)"""
     
     def __init__(self, grid: List[List[str]]):
         """
@@ -20,37 +152,70 @@ class Maze:
         self.grid = grid
         self.rows = len(grid)
         self.cols = len(grid[0]) if grid else 0
-        self.start = self._find_position('S')
-        self.goal = self._find_position('G')
+        
+        # Grille à plat : la case (r, c) est l'octet d'indice r * cols + c
+        self.flat = "".join("".join(row) for row in grid).encode('latin-1', errors='replace')
+        self.start_index = self._find_index('S')
+        self.goal_index = self._find_index('G')
+        self.start = self.position(self.start_index)
+        self.goal = self.position(self.goal_index)
+        self.flat_array = np.frombuffer(self.flat, dtype=np.uint8)  # Pour les noyaux Numba
+        
+        # Indices des voisins de chaque case (vide pour un mur), calculés
+        # une seule fois dans l'ordre de successors
+        self.neighbors = self._compute_neighbors()
+    
+    def _find_index(self, char: str) -> int:
+        """Trouve l'indice (à plat) d'un caractère dans le labyrinthe"""
+        index = self.flat.find(ord(char))
+        if index < 0:
+            raise ValueError(f"Caractère '{char}' non trouvé dans le labyrinthe")
+        return index
+    
+    def position(self, index: int) -> Tuple[int, int]:
+        """Convertit un indice à plat en position (ligne, colonne)"""
+        return divmod(index, self.cols)
     
-    def _find_position(self, char: str) -> Tuple[int, int]:
-        """Trouve la position d'un caractère dans le labyrinthe"""
-        for r in range(self.rows):
-            for c in range(self.cols):
-                if self.grid[r][c] == char:
-                    return (r, c)
-        raise ValueError(f"Caractère '{char}' non trouvé dans le labyrinthe")
+    def index(self, pos: Tuple[int, int]) -> int:
+        """Convertit une position (ligne, colonne) en indice à plat"""
+        return pos[0] * self.cols + pos[1]
     
     def is_valid(self, pos: Tuple[int, int]) -> bool:
         """Vérifie si une position est valide (pas un mur, dans les limites)"""
         r, c = pos
-        if r < 0 or r >= self.rows or c < 0 or c >= self.cols:
-            return False
-        return self.grid[r][c] != '#'
+        return 0 <= r < self.rows and 0 <= c < self.cols and self.flat[r * self.cols + c] != WALL
     
     def successors(self, pos: Tuple[int, int]) -> List[Tuple[int, int]]:
         """
         Retourne les successeurs d'une position
         Ordre: haut, droite, bas, gauche (comme demandé)
         """
-        r, c = pos
-        candidates = [
-            (r - 1, c),  # haut
-            (r, c + 1),  # droite
-            (r + 1, c),  # bas
-            (r, c - 1)   # gauche
-        ]
-        return [p for p in candidates if self.is_valid(p)]
+        if not self.is_valid(pos):
+            r, c = pos
+            candidates = [(r - 1, c), (r, c + 1), (r + 1, c), (r, c - 1)]
+            return [p for p in candidates if self.is_valid(p)]
+        return [self.position(i) for i in self.neighbors[self.index(pos)]]
+    
+    def _compute_neighbors(self) -> List[List[int]]:
+        """Voisins libres de chaque case, en indices à plat (haut, droite, bas, gauche)"""
+        rows, cols, flat = self.rows, self.cols, self.flat
+        neighbors = []
+        for i, cell in enumerate(flat):
+            if cell == WALL:
+                neighbors.append([])
+                continue
+            r, c = divmod(i, cols)
+            succ = []
+            if r > 0 and flat[i - cols] != WALL:
+                succ.append(i - cols)  # haut
+            if c < cols - 1 and flat[i + 1] != WALL:
+                succ.append(i + 1)  # droite
+            if r < rows - 1 and flat[i + cols] != WALL:
+                succ.append(i + cols)  # bas
+            if c > 0 and flat[i - 1] != WALL:
+                succ.append(i - 1)  # gauche
+            neighbors.append(succ)
+        return neighbors
     
     def is_goal(self, pos: Tuple[int, int]) -> bool:
         """Vérifie si une position est le but"""
@@ -58,7 +223,11 @@ class Maze:
 
 
 class MazeSolver:
-    """Résout un labyrinthe avec différents algorithmes"""
+    """
+    Résout un labyrinthe avec différents algorithmes
+    Les recherches travaillent sur les indices à plat du Maze ; les chemins
+    retournés sont convertis en positions (ligne, colonne)
+    """
     
     def __init__(self, maze: Maze):
         self.maze = maze
@@ -73,24 +242,35 @@ class MazeSolver:
         Breadth-First Search (recherche en largeur)
         Utilise une file FIFO
         """
+        if njit is not None:
+            maze = self.maze
+            return self._from_kernel(*_bfs_kernel(
+                maze.flat_array, maze.rows, maze.cols, maze.start_index, maze.goal_index
+            ))
+        
         self._reset_stats()
+        start, goal = self.maze.start_index, self.maze.goal_index
+        neighbors = self.maze.neighbors
         
-        frontier = deque([(self.maze.start, [self.maze.start])])
-        explored = {self.maze.start}
+        # La frontière ne stocke que des indices ; parents sert aussi
+        # d'ensemble exploré et permet de reconstruire le chemin à la fin
+        frontier = deque([start])
+        parents = [UNSEEN] * len(neighbors)
+        parents[start] = start
         
         while frontier:
             self.stats['max_frontier_size'] = max(self.stats['max_frontier_size'], len(frontier))
             
-            pos, path = frontier.popleft()
+            cell = frontier.popleft()
             self.stats['nodes_explored'] += 1
             
-            if self.maze.is_goal(pos):
-                return path
+            if cell == goal:
+                return self._reconstruct_path(parents, cell)
             
-            for succ in self.maze.successors(pos):
-                if succ not in explored:
-                    explored.add(succ)
-                    frontier.append((succ, path + [succ]))
+            for succ in neighbors[cell]:
+                if parents[succ] == UNSEEN:
+                    parents[succ] = cell
+                    frontier.append(succ)
                     self.stats['nodes_generated'] += 1
         
         return None  # Pas de solution
@@ -101,30 +281,39 @@ class MazeSolver:
         Utilise une pile LIFO
         max_depth: profondeur maximale (None = illimitée)
         """
+        if njit is not None:
+            maze = self.maze
+            return self._from_kernel(*_dfs_kernel(
+                maze.flat_array, maze.rows, maze.cols, maze.start_index, maze.goal_index,
+                -1 if max_depth is None else max_depth
+            ))
+        
         self._reset_stats()
+        start, goal = self.maze.start_index, self.maze.goal_index
+        neighbors = self.maze.neighbors
         
-        # Format: (position, chemin, profondeur)
-        frontier = [(self.maze.start, [self.maze.start], 0)]
-        explored = set()
+        # Format: (indice, parent, profondeur) ; le parent est fixé au dépilement
+        frontier = [(start, start, 0)]
+        parents = [UNSEEN] * len(neighbors)  # Sert aussi d'ensemble exploré
         
         while frontier:
             self.stats['max_frontier_size'] = max(self.stats['max_frontier_size'], len(frontier))
             
-            pos, path, depth = frontier.pop()  # LIFO
+            cell, parent, depth = frontier.pop()  # LIFO
             
-            if pos in explored:
+            if parents[cell] != UNSEEN:
                 continue
             
-            explored.add(pos)
+            parents[cell] = parent
             self.stats['nodes_explored'] += 1
             
-            if self.maze.is_goal(pos):
-                return path
+            if cell == goal:
+                return self._reconstruct_path(parents, cell)
             
             if max_depth is None or depth < max_depth:
-                for succ in reversed(self.maze.successors(pos)):  # Reversed pour respecter l'ordre
-                    if succ not in explored:
-                        frontier.append((succ, path + [succ], depth + 1))
+                for succ in reversed(neighbors[cell]):  # Reversed pour respecter l'ordre
+                    if parents[succ] == UNSEEN:
+                        frontier.append((succ, cell, depth + 1))
                         self.stats['nodes_generated'] += 1
         
         return None
@@ -133,14 +322,88 @@ class MazeSolver:
         """
         Iterative Deepening DFS
         DFS avec profondeur maximale itérative
+        (stats : celles de la dernière itération)
         """
         for depth in range(max_depth):
-            result = self.dfs(max_depth=depth)
+            result = self._depth_limited_search(depth)
             if result is not None:
                 return result
         
         return None
     
+    def _depth_limited_search(self, limit: int) -> Optional[List[Tuple[int, int]]]:
+        """
+        DFS limitée à limit pas, pour l'IDDFS
+        
+        Pas d'ensemble exploré global (il ferait manquer des solutions à
+        profondeur limitée) : une case n'est ré-explorée que si on l'atteint
+        par un chemin plus court que les précédents de cette itération.
+        Une seule liste de chemin (append/pop) et une pile d'itérateurs
+        sur les voisins précalculés
+        """
+        self._reset_stats()
+        start, goal = self.maze.start_index, self.maze.goal_index
+        neighbors = self.maze.neighbors
+        
+        path = [start]
+        best_depth = [limit + 1] * len(neighbors)
+        best_depth[start] = 0
+        stack = [iter(neighbors[start]) if limit > 0 else iter(())]
+        self.stats['nodes_explored'] += 1
+        
+        if start == goal:
+            return self._to_positions(path)
+        
+        while stack:
+            self.stats['max_frontier_size'] = max(self.stats['max_frontier_size'], len(stack))
+            
+            succ = next(stack[-1], None)
+            if succ is None:
+                # Tous les voisins essayés : retour arrière
+                stack.pop()
+                path.pop()
+                continue
+            
+            depth = len(path)
+            if best_depth[succ] <= depth:
+                continue  # Déjà atteinte au moins aussi tôt (ou sur le chemin)
+            best_depth[succ] = depth
+            self.stats['nodes_generated'] += 1
+            self.stats['nodes_explored'] += 1
+            
+            path.append(succ)
+            if succ == goal:
+                return self._to_positions(path)
+            stack.append(iter(neighbors[succ]) if depth < limit else iter(()))
+        
+        return None
+    
+    def _reconstruct_path(self, parents: List[int], goal: int) -> List[Tuple[int, int]]:
+        """Remonte les parents depuis le but pour obtenir le chemin départ -> but"""
+        path = [goal]
+        cur = goal
+        while parents[cur] != cur:  # Le départ est son propre parent
+            cur = parents[cur]
+            path.append(cur)
+        path.reverse()
+        return self._to_positions(path)
+    
+    def _from_kernel(self, path: np.ndarray, stats: np.ndarray) -> Optional[List[Tuple[int, int]]]:
+        """Reprend le résultat d'un noyau Numba (chemin vide = pas de solution)"""
+        self.stats = {
+            'nodes_explored': int(stats[0]),
+            'nodes_generated': int(stats[1]),
+            'max_frontier_size': int(stats[2])
+        }
+        if len(path) == 0:
+            return None
+        return self._to_positions(path.tolist())
+    
+    def _to_positions(self, path: List[int]) -> List[Tuple[int, int]]:
+        """Convertit un chemin d'indices à plat en positions (ligne, colonne)"""
+        cols = self.maze.cols
+        return [divmod(cell, cols) for cell in path]
+    
     def _reset_stats(self):
         """Réinitialise les statistiques"""
         self.stats = {
@@ -150,9 +413,13 @@ class MazeSolver:
         }
 
 
+@lru_cache(maxsize=None)
 def create_example_maze() -> Maze:
     """
     Crée le labyrinthe de l'exemple (page 8 du PDF)
+    Construit une seule fois par processus : le Maze (et ses voisins
+    précalculés) est partagé et ne doit pas être modifié ; seul le
+    MazeSolver, qui porte les stats, est créé à chaque résolution
     
     4  [S] [ ] [ ] [ ]
     3  [ ] [#] [ ] [#]
@@ -169,6 +436,19 @@ def create_example_maze() -> Maze:
     return Maze(grid)
 
 
+def solve_example_maze(algorithm: str) -> Tuple[Optional[List[Tuple[int, int]]], dict]:
+    """
+    Résout le labyrinthe de l'exemple avec bfs, dfs ou iddfs
+    Fonction de module pour pouvoir être exécutée dans un ProcessPoolExecutor
+
+    Returns:
+        (chemin ou None, stats)
+    """
+    solver = MazeSolver(create_example_maze())
+    path = getattr(solver, algorithm)()
+    return path, solver.stats
+
+
 def print_maze_with_path(maze: Maze, path: Optional[List[Tuple[int, int]]]):
     """Affiche le labyrinthe avec le chemin trouvé"""
     if path is None:
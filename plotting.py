@@ -0,0 +1,8 @@
+"""
+Outils communs aux visualisations matplotlib
+"""
+import threading
+
+# pyplot repose sur un état global (figure courante) : les solveurs étant
+# exécutés dans des threads par le batcher, les tracés sont sérialisés
+PLOT_LOCK = threading.Lock()
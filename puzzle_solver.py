@@ -2,39 +2,352 @@
 Taquin (8-Puzzle) Solver avec A*
 Séance 3 - Recherche informée
 """
-from typing import List, Tuple, Optional
+from typing import Callable, List, Tuple, Optional
+from collections import deque
+from functools import lru_cache
+import hashlib
 import heapq
+import os
+import struct
+import tempfile
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # Numba optionnel : A* en Python pur
+    njit = None
+
+INF = float('inf')
+
+# Noms des actions, dans l'ordre de génération des successeurs
+ACTIONS = ('haut', 'droite', 'bas', 'gauche')
+
+# Action inverse (la case vide revient sur ses pas)
+OPPOSITE = {'haut': 'bas', 'bas': 'haut', 'droite': 'gauche', 'gauche': 'droite'}
+
+# Nombre de grilles 3x3 (permutations de 0..8) ; seule la moitié est
+# atteignable depuis un état donné (parité)
+N_STATES = 362880
+
+# best_g d'une grille jamais atteinte (noyau Numba)
+G_UNSEEN = np.iinfo(np.int32).max
+
+# Files du noyau Numba indexées par (f, profondeur) : le diamètre du taquin
+# 3x3 est 31, donc profondeur <= 32 et f <= 32 + 32 (h <= 8 tuiles x 4)
+DEPTH_SLOTS = 64
+F_SLOTS = 128
+
+# Base de motifs : valeur d'une grille non atteignable depuis le but
+PDB_UNREACHABLE = 0xFF
+
+# Répertoire des bases de motifs précalculées (un fichier par but), propre
+# à l'application ; au plus PDB_CACHE_MAX_FILES fichiers (les plus anciens
+# sont supprimés)
+PDB_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'puzzle_pdb')
+PDB_CACHE_MAX_FILES = 4
+
+# En-tête d'un fichier de base : format, version, but, BLAKE2b du contenu
+PDB_MAGIC = b'PDB'
+PDB_VERSION = 1
+PDB_HEADER = struct.Struct('<3sBQ16s')
+
+
+def pack_board(board: List[List[int]]) -> int:
+    """
+    Code la grille 3x3 en un entier : la case i (= 3 * ligne + colonne)
+    occupe les bits 4i à 4i + 3
+    """
+    key = 0
+    for i, val in enumerate(val for row in board for val in row):
+        if not 0 <= val <= 0xF:
+            raise ValueError(f"Tuile invalide: {val}")
+        key |= val << (4 * i)
+    return key
+
+
+def tile_at(key: int, i: int) -> int:
+    """Valeur de la case i d'une grille codée"""
+    return (key >> (4 * i)) & 0xF
+
+
+def _build_moves() -> List[List[Tuple[int, str]]]:
+    """MOVES[case vide] : (nouvelle case vide, action) dans l'ordre haut, droite, bas, gauche"""
+    moves = []
+    for i in range(9):
+        r, c = divmod(i, 3)
+        candidates = [((r - 1, c), 'haut'), ((r, c + 1), 'droite'), ((r + 1, c), 'bas'), ((r, c - 1), 'gauche')]
+        moves.append([(3 * nr + nc, action) for (nr, nc), action in candidates
+                      if 0 <= nr < 3 and 0 <= nc < 3])
+    return moves
+
+
+# Déplacements possibles de la case vide, calculés une fois
+MOVES = _build_moves()
+
+# Décalage du quartet de chaque case, et indice de la case
+_SHIFTS = 4 * np.arange(9, dtype=np.int64)
+_CELLS = np.arange(9)
+
+
+def unpack_board(key: int) -> np.ndarray:
+    """
+    Indices 9 * tuile + case des 9 cases d'une grille codée, pour indexer
+    les tables de goal_cost_tables
+    """
+    return 9 * ((np.int64(key) >> _SHIFTS) & 0xF) + _CELLS
+
+
+@lru_cache(maxsize=32)
+def goal_cost_tables(goal_key: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Distances de Manhattan et euclidienne de la tuile t en case i vers sa
+    place dans le but, à l'indice 9 * t + i (0 pour la case vide)
+    Calculées une fois par but
+    """
+    goal_row = np.zeros(16, dtype=np.int64)
+    goal_col = np.zeros(16, dtype=np.int64)
+    goal_tiles = (np.int64(goal_key) >> _SHIFTS) & 0xF
+    goal_row[goal_tiles], goal_col[goal_tiles] = np.divmod(_CELLS, 3)
+    
+    rows, cols = np.divmod(_CELLS, 3)
+    d_row = rows[None, :] - goal_row[:, None]  # [tuile, case]
+    d_col = cols[None, :] - goal_col[:, None]
+    manhattan = np.abs(d_row) + np.abs(d_col)
+    euclidean = np.sqrt(d_row ** 2 + d_col ** 2)
+    manhattan[0] = 0
+    euclidean[0] = 0.0
+    manhattan.flags.writeable = False
+    euclidean.flags.writeable = False
+    return manhattan.ravel(), euclidean.ravel()
+
+# Mêmes déplacements en tableaux pour le noyau Numba (-1 : pas de mouvement)
+MOVE_CELLS = np.full((9, 4), -1, np.int8)
+MOVE_ACTIONS = np.full((9, 4), -1, np.int8)
+for _i, _moves in enumerate(MOVES):
+    for _k, (_j, _action) in enumerate(_moves):
+        MOVE_CELLS[_i, _k] = _j
+        MOVE_ACTIONS[_i, _k] = ACTIONS.index(_action)
+
+
+def specialize_additive(costs: List[float]) -> Callable[[int], float]:
+    """
+    Génère une heuristique spécialisée pour la grille 3x3 : la boucle sur
+    les cases est déroulée en 9 lectures de table, décalages et indices
+    écrits en constantes dans le code source, compilé une fois
+    
+    costs: contribution de la tuile t en case i, à l'indice 9 * t + i
+    """
+    table = tuple(costs[9 * val + i] for i in range(9) for val in range(16))  # Indice 16 * case + tuile
+    terms = ' + '.join(f"t[{16 * i} + ((key >> {4 * i}) & 15)]" if i else "t[key & 15]" for i in range(9))
+    source = f"def h(key, t=t):\n    return {terms}\n"
+    namespace = {'t': table}
+    exec(compile(source, '<heuristique 3x3>', 'exec'), namespace)
+    return namespace['h']
+
+
+def is_permutation(key: int) -> bool:
+    """Vrai si la grille codée contient exactement les tuiles 0..8"""
+    return sorted(tile_at(key, i) for i in range(9)) == list(range(9))
+
+
+# ----------------------------------------------------------------------------
+# Noyau A* compilé par Numba (heuristiques entières : Manhattan, mal placées)
+# Les grilles restent codées en int64 ; best_g et l'ensemble exploré sont des
+# tableaux indexés par le rang de la permutation. Même frontière (files FIFO
+# par (f, -g)), même ordre et mêmes stats que AStarSolver.solve en Python
+# ----------------------------------------------------------------------------
+
+def _rank(key):
+    """Rang (code de Lehmer) de la permutation codée dans key, dans 0..9!-1"""
+    rank = 0
+    for i in range(9):
+        tile = (key >> (4 * i)) & 0xF
+        smaller = 0
+        for j in range(i + 1, 9):
+            if ((key >> (4 * j)) & 0xF) < tile:
+                smaller += 1
+        rank = rank * (9 - i) + smaller
+    return rank
+
+
+def _astar_kernel(init_key, init_empty, init_g, goal_key, tile_cost, move_cells, move_actions):
+    """
+    tile_cost[9 * tuile + case] : contribution de la tuile à l'heuristique
+    (h est la somme sur les cases ; un déplacement la modifie en O(1))
+
+    Returns:
+        (trouvé, codes d'actions int8, [explorés, générés, frontière max])
+    """
+    stats = np.zeros(3, np.int64)
+    # Chaque grille atteignable est explorée au plus une fois, et chaque
+    # exploration ajoute au plus 4 entrées à la frontière
+    size = 4 * (N_STATES // 2) + 1
+    entry_key = np.empty(size, np.int64)
+    entry_empty = np.empty(size, np.int8)
+    entry_g = np.empty(size, np.int32)
+    entry_h = np.empty(size, np.int32)
+    entry_parent = np.empty(size, np.int32)
+    entry_action = np.empty(size, np.int8)
+    entry_next = np.empty(size, np.int32)
+    best_g = np.full(N_STATES, G_UNSEEN, np.int32)
+    explored = np.zeros(N_STATES, np.bool_)
+    # Files FIFO chaînées par (f, -g) : file d'indice
+    # f' * DEPTH_SLOTS + (DEPTH_SLOTS - 1 - d), d = g - init_g et f' = d + h
+    # (même ordre que f = g + h, à f égal la plus profonde d'abord)
+    bucket_head = np.full(F_SLOTS * DEPTH_SLOTS, -1, np.int32)
+    bucket_tail = np.full(F_SLOTS * DEPTH_SLOTS, -1, np.int32)
+
+    h = 0
+    for i in range(9):
+        h += tile_cost[9 * ((init_key >> (4 * i)) & 0xF) + i]
+    entry_key[0] = init_key
+    entry_empty[0] = init_empty
+    entry_g[0] = init_g
+    entry_h[0] = h
+    entry_parent[0] = -1
+    entry_action[0] = -1
+    entry_next[0] = -1
+    best_g[_rank(init_key)] = init_g
+    min_slot = h * DEPTH_SLOTS + DEPTH_SLOTS - 1
+    bucket_head[min_slot] = 0
+    bucket_tail[min_slot] = 0
+    n_entries = 1
+    frontier_size = 1
+
+    while frontier_size > 0:
+        stats[2] = max(stats[2], frontier_size)
+
+        while bucket_head[min_slot] == -1:
+            min_slot += 1
+        e = bucket_head[min_slot]
+        bucket_head[min_slot] = entry_next[e]
+        frontier_size -= 1
+
+        key = entry_key[e]
+        rank = _rank(key)
+        # Entrée périmée : la grille a été réinsérée avec un meilleur g
+        if entry_g[e] != best_g[rank] or explored[rank]:
+            continue
+
+        explored[rank] = True
+        stats[0] += 1
+
+        if key == goal_key:
+            length = 0
+            cur = e
+            while entry_parent[cur] != -1:
+                length += 1
+                cur = entry_parent[cur]
+            actions = np.empty(length, np.int8)
+            cur = e
+            for k in range(length - 1, -1, -1):
+                actions[k] = entry_action[cur]
+                cur = entry_parent[cur]
+            return True, actions, stats
+
+        i = int(entry_empty[e])
+        g = entry_g[e] + 1
+        for k in range(4):
+            j = int(move_cells[i, k])
+            if j < 0:
+                break
+            # Même échange de quartets que PuzzleState.successors
+            moved = (key >> (4 * j)) & 0xF
+            new_key = (key & ~(0xF << (4 * j))) | (moved << (4 * i))
+            new_rank = _rank(new_key)
+            if explored[new_rank] or g >= best_g[new_rank]:
+                continue
+            best_g[new_rank] = g
+            h = entry_h[e] + tile_cost[9 * moved + i] - tile_cost[9 * moved + j]
+            depth = g - init_g
+            slot = (depth + h) * DEPTH_SLOTS + DEPTH_SLOTS - 1 - depth
+
+            entry_key[n_entries] = new_key
+            entry_empty[n_entries] = j
+            entry_g[n_entries] = g
+            entry_h[n_entries] = h
+            entry_parent[n_entries] = e
+            entry_action[n_entries] = move_actions[i, k]
+            entry_next[n_entries] = -1
+            if bucket_head[slot] == -1:
+                bucket_head[slot] = n_entries
+            else:
+                entry_next[bucket_tail[slot]] = n_entries
+            bucket_tail[slot] = n_entries
+            min_slot = min(min_slot, slot)
+            n_entries += 1
+            frontier_size += 1
+            stats[1] += 1
+
+    return False, np.empty(0, np.int8), stats
+
+
+if njit is not None:
+    _rank = njit(cache=True)(_rank)
+    _astar_kernel = njit(cache=True)(_astar_kernel)
 
 
 class PuzzleState:
-    """État du taquin 3x3"""
+    """
+    État du taquin 3x3
+    La grille est codée dans l'entier key (cf. pack_board) : hash et égalité
+    sont ceux d'un int, et les successeurs sont obtenus par échange de
+    deux quartets, sans copier de listes
+    h: valeur de l'heuristique (None tant qu'elle n'est pas calculée)
+    __slots__ : pas de __dict__ par nœud (A* en crée des centaines de milliers)
+    """
     
-    def __init__(self, board: List[List[int]], parent=None, action=None, g=0):
+    __slots__ = ('key', 'parent', 'action', 'g', 'h', 'empty_idx')
+    
+    def __init__(self, board: List[List[int]], parent=None, action=None, g=0, h=None):
         """
         board: grille 3x3 avec 0 représentant la case vide
         parent: état parent
         action: action qui a mené à cet état
         g: coût depuis l'initial
+        h: heuristique de l'état, si déjà connue
         """
-        self.board = [row[:] for row in board]  # Copie
+        self.key = pack_board(board)
         self.parent = parent
         self.action = action
         self.g = g
-        self.empty_pos = self._find_empty()
+        self.h = h
+        self.empty_idx = self._find_empty()
+    
+    @classmethod
+    def from_key(cls, key: int, empty_idx: int, parent=None, action=None, g=0, h=None) -> 'PuzzleState':
+        """Crée un état directement depuis une grille codée"""
+        state = cls.__new__(cls)
+        state.key = key
+        state.parent = parent
+        state.action = action
+        state.g = g
+        state.h = h
+        state.empty_idx = empty_idx
+        return state
+    
+    @property
+    def board(self) -> List[List[int]]:
+        """Grille 3x3 (reconstruite depuis key)"""
+        return [[tile_at(self.key, 3 * r + c) for c in range(3)] for r in range(3)]
+    
+    @property
+    def empty_pos(self) -> Tuple[int, int]:
+        """Position (ligne, colonne) de la case vide"""
+        return divmod(self.empty_idx, 3)
         
-    def _find_empty(self) -> Tuple[int, int]:
-        """Trouve la position de la case vide (0)"""
-        for r in range(3):
-            for c in range(3):
-                if self.board[r][c] == 0:
-                    return (r, c)
+    def _find_empty(self) -> int:
+        """Trouve l'indice de la case vide (0)"""
+        for i in range(9):
+            if tile_at(self.key, i) == 0:
+                return i
         raise ValueError("Pas de case vide!")
     
     def __eq__(self, other):
-        return self.board == other.board
+        return self.key == other.key
     
     def __hash__(self):
-        return hash(tuple(tuple(row) for row in self.board))
+        return hash(self.key)
     
     def __repr__(self):
         return '\n'.join([' '.join([str(x) if x != 0 else '∅' for x in row]) for row in self.board])
@@ -43,31 +356,32 @@ class PuzzleState:
         # Pour heapq
         return False
     
-    def successors(self) -> List['PuzzleState']:
-        """Génère les successeurs (haut, droite, bas, gauche)"""
-        r, c = self.empty_pos
-        succs = []
+    def successors(self, tile_dist: Optional[List[int]] = None) -> List['PuzzleState']:
+        """
+        Génère les successeurs (haut, droite, bas, gauche)
         
-        moves = [
-            ((-1, 0), 'haut'),
-            ((0, 1), 'droite'),
-            ((1, 0), 'bas'),
-            ((0, -1), 'gauche')
-        ]
+        tile_dist: distance de Manhattan de chaque tuile selon sa case
+        (indice 9 * tuile + case, cf. AStarSolver._tile_distances). Si elle
+        est fournie et que self.h est connue, le h de chaque successeur est
+        mis à jour en O(1) : seule la tuile déplacée change de distance
+        """
+        key, i, g = self.key, self.empty_idx, self.g + 1
+        incremental = tile_dist is not None and self.h is not None
+        succs = []
         
-        for (dr, dc), action in moves:
-            nr, nc = r + dr, c + dc
-            if 0 <= nr < 3 and 0 <= nc < 3:
-                new_board = [row[:] for row in self.board]
-                # Échanger la case vide avec la case adjacente
-                new_board[r][c], new_board[nr][nc] = new_board[nr][nc], new_board[r][c]
-                succs.append(PuzzleState(new_board, parent=self, action=action, g=self.g + 1))
+        for j, action in MOVES[i]:
+            # Échanger la case vide avec la case adjacente : la tuile
+            # déplacée passe de j à i, la case j devient vide (0)
+            moved = (key >> (4 * j)) & 0xF
+            new_key = (key & ~(0xF << (4 * j))) | (moved << (4 * i))
+            h = self.h + tile_dist[9 * moved + i] - tile_dist[9 * moved + j] if incremental else None
+            succs.append(PuzzleState.from_key(new_key, j, parent=self, action=action, g=g, h=h))
         
         return succs
     
     def is_goal(self, goal_state: 'PuzzleState') -> bool:
         """Vérifie si cet état est le but"""
-        return self.board == goal_state.board
+        return self.key == goal_state.key
     
     def get_path(self) -> List[Tuple['PuzzleState', str]]:
         """Reconstruit le chemin depuis l'initial"""
@@ -80,33 +394,17 @@ class PuzzleState:
 
 
 class Heuristic:
-    """Différentes heuristiques pour le taquin"""
+    """Différentes heuristiques pour le taquin (calculées sur les grilles codées)"""
     
     @staticmethod
     def manhattan_distance(state: PuzzleState, goal: PuzzleState) -> int:
         """
         Distance de Manhattan
         Somme des distances de chaque tuile vers sa position finale
+        (une seule indexation NumPy dans la table du but)
         """
-        distance = 0
-        goal_positions = {}
-        
-        # Trouver les positions dans le but
-        for r in range(3):
-            for c in range(3):
-                val = goal.board[r][c]
-                if val != 0:
-                    goal_positions[val] = (r, c)
-        
-        # Calculer la distance pour chaque tuile
-        for r in range(3):
-            for c in range(3):
-                val = state.board[r][c]
-                if val != 0:
-                    gr, gc = goal_positions[val]
-                    distance += abs(r - gr) + abs(c - gc)
-        
-        return distance
+        manhattan, _ = goal_cost_tables(goal.key)
+        return int(manhattan[unpack_board(state.key)].sum())
     
     @staticmethod
     def misplaced_tiles(state: PuzzleState, goal: PuzzleState) -> int:
@@ -114,10 +412,13 @@ class Heuristic:
         Nombre de tuiles mal placées
         """
         count = 0
-        for r in range(3):
-            for c in range(3):
-                if state.board[r][c] != 0 and state.board[r][c] != goal.board[r][c]:
-                    count += 1
+        key, goal_key = state.key, goal.key
+        for i in range(9):
+            val = key & 0xF
+            if val != 0 and val != goal_key & 0xF:
+                count += 1
+            key >>= 4
+            goal_key >>= 4
         return count
     
     @staticmethod
@@ -125,23 +426,119 @@ class Heuristic:
         """
         Distance euclidienne
         """
-        distance = 0.0
-        goal_positions = {}
-        
-        for r in range(3):
-            for c in range(3):
-                val = goal.board[r][c]
-                if val != 0:
-                    goal_positions[val] = (r, c)
+        _, euclidean = goal_cost_tables(goal.key)
+        return float(euclidean[unpack_board(state.key)].sum())
+    
+    @staticmethod
+    def build_pdb(goal: PuzzleState) -> bytes:
+        """
+        Base de motifs complète : BFS depuis le but sur les grilles codées
+        (les mouvements sont réversibles). L'octet d'indice _rank(grille)
+        est la distance exacte de la grille au but, PDB_UNREACHABLE pour
+        l'autre classe de parité
+        """
+        if not is_permutation(goal.key):
+            raise ValueError("La base de motifs exige un but contenant les tuiles 0..8")
         
-        for r in range(3):
-            for c in range(3):
-                val = state.board[r][c]
-                if val != 0:
-                    gr, gc = goal_positions[val]
-                    distance += ((r - gr)**2 + (c - gc)**2) ** 0.5
+        depths = {goal.key: 0}
+        layer = [(goal.key, goal.empty_idx)]
+        depth = 0
+        while layer:
+            depth += 1
+            next_layer = []
+            for key, i in layer:
+                for j, _ in MOVES[i]:
+                    moved = (key >> (4 * j)) & 0xF
+                    new_key = (key & ~(0xF << (4 * j))) | (moved << (4 * i))
+                    if new_key not in depths:
+                        depths[new_key] = depth
+                        next_layer.append((new_key, j))
+            layer = next_layer
         
-        return distance
+        pdb = bytearray([PDB_UNREACHABLE]) * N_STATES
+        for key, depth in depths.items():
+            pdb[_rank(key)] = depth
+        return bytes(pdb)
+    
+    @staticmethod
+    def pattern_database(state: PuzzleState, goal: PuzzleState) -> float:
+        """
+        Distance exacte lue dans la base de motifs du but (cf. load_pdb)
+        """
+        if not is_permutation(state.key):
+            return INF
+        depth = load_pdb(goal.key)[_rank(state.key)]
+        return INF if depth == PDB_UNREACHABLE else depth
+
+
+def _pdb_digest(pdb: bytes) -> bytes:
+    """Empreinte du contenu d'une base, vérifiée à la lecture"""
+    return hashlib.blake2b(pdb, digest_size=16).digest()
+
+
+def _read_pdb(path: str, goal_key: int) -> Optional[bytes]:
+    """
+    Lit une base enregistrée ; None si absente ou invalide (format, version,
+    but, taille, empreinte, ou distance du but non nulle)
+    """
+    try:
+        with open(path, 'rb') as pdb_file:
+            data = pdb_file.read()
+    except OSError:
+        return None
+    if len(data) != PDB_HEADER.size + N_STATES:
+        return None
+    magic, version, key, digest = PDB_HEADER.unpack_from(data)
+    pdb = data[PDB_HEADER.size:]
+    if (magic != PDB_MAGIC or version != PDB_VERSION or key != goal_key
+            or digest != _pdb_digest(pdb) or pdb[_rank(goal_key)] != 0):
+        return None
+    return pdb
+
+
+def _write_pdb(path: str, goal_key: int, pdb: bytes):
+    """
+    Enregistre une base (écriture atomique : plusieurs workers peuvent la
+    créer) puis ne garde que les PDB_CACHE_MAX_FILES plus récentes
+    """
+    os.makedirs(PDB_CACHE_DIR, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=PDB_CACHE_DIR, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            temp_file.write(PDB_HEADER.pack(PDB_MAGIC, PDB_VERSION, goal_key, _pdb_digest(pdb)))
+            temp_file.write(pdb)
+        os.replace(temp_path, path)
+    except OSError:
+        os.unlink(temp_path)
+        raise
+    
+    entries = [entry for entry in os.scandir(PDB_CACHE_DIR) if entry.name.endswith('.pdb')]
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in entries[PDB_CACHE_MAX_FILES:]:
+        try:
+            os.unlink(entry.path)
+        except OSError:
+            pass  # Déjà supprimé par un autre worker
+
+
+@lru_cache(maxsize=8)
+def load_pdb(goal_key: int) -> bytes:
+    """
+    Base de motifs d'un but, lue depuis PDB_CACHE_DIR (si l'en-tête et
+    l'empreinte sont valides) ou calculée puis enregistrée
+    """
+    path = os.path.join(PDB_CACHE_DIR, f"{goal_key:09x}.pdb")
+    pdb = _read_pdb(path, goal_key)
+    if pdb is not None:
+        return pdb
+    
+    goal = PuzzleState.from_key(goal_key, next(i for i in range(9) if tile_at(goal_key, i) == 0))
+    pdb = Heuristic.build_pdb(goal)
+    try:
+        _write_pdb(path, goal_key, pdb)
+    except OSError:
+        pass  # Cache disque facultatif
+    return pdb
 
 
 class AStarSolver:
@@ -150,11 +547,13 @@ class AStarSolver:
     def __init__(self, initial: PuzzleState, goal: PuzzleState, heuristic='manhattan'):
         self.initial = initial
         self.goal = goal
+        self._goal_key = goal.key  # Test du but : une comparaison d'entiers
         
         heuristics = {
             'manhattan': Heuristic.manhattan_distance,
             'misplaced': Heuristic.misplaced_tiles,
-            'euclidean': Heuristic.euclidean_distance
+            'euclidean': Heuristic.euclidean_distance,
+            'pdb': Heuristic.pattern_database
         }
         self.h_func = heuristics.get(heuristic, Heuristic.manhattan_distance)
         self.heuristic_name = heuristic
@@ -165,41 +564,275 @@ class AStarSolver:
             'max_frontier_size': 0
         }
     
+    def _goal_tables(self) -> Tuple[List[int], List[int], List[int]]:
+        """Tuile de chaque case du but, et ligne/colonne de chaque tuile dans le but"""
+        goal_tile = [tile_at(self.goal.key, i) for i in range(9)]
+        goal_row = [0] * 16
+        goal_col = [0] * 16
+        for i, val in enumerate(goal_tile):
+            goal_row[val], goal_col[val] = divmod(i, 3)
+        return goal_tile, goal_row, goal_col
+    
+    def _tile_distances(self) -> List[int]:
+        """Distance de Manhattan de la tuile t en case i vers le but, à l'indice 9 * t + i (0 pour la case vide)"""
+        manhattan, _ = goal_cost_tables(self.goal.key)
+        return manhattan.tolist()
+    
+    def _additive_costs(self) -> Optional[List[float]]:
+        """
+        Contribution de chaque tuile à l'heuristique selon sa case (indice
+        9 * tuile + case), ou None si l'heuristique n'est pas une somme par
+        tuile (base de motifs)
+        """
+        manhattan, euclidean = goal_cost_tables(self.goal.key)
+        if self.h_func is Heuristic.manhattan_distance:
+            return manhattan.tolist()
+        if self.h_func is Heuristic.misplaced_tiles:
+            goal_tile, _, _ = self._goal_tables()
+            return [int(val != 0 and val != goal_tile[i]) for val in range(16) for i in range(9)]
+        if self.h_func is Heuristic.euclidean_distance:
+            return euclidean.tolist()
+        return None
+    
+    def _tile_costs(self) -> Optional[List[int]]:
+        """Comme _additive_costs, limité aux heuristiques entières (noyau Numba)"""
+        if self.h_func is Heuristic.euclidean_distance:
+            return None
+        return self._additive_costs()
+    
+    def _key_heuristic(self) -> Callable[[int], float]:
+        """
+        Heuristique choisie, évaluée directement sur une grille codée
+        Les heuristiques additives sont générées déroulées pour ce but
+        (cf. specialize_additive)
+        """
+        costs = self._additive_costs()
+        if costs is not None:
+            return specialize_additive(costs)
+        
+        # Base de motifs
+        if not is_permutation(self.goal.key):
+            raise ValueError("La base de motifs exige un but contenant les tuiles 0..8")
+        if not is_permutation(self.initial.key):
+            return lambda key: INF  # Tuiles différentes de celles du but
+        pdb = load_pdb(self.goal.key)
+        
+        # Les successeurs d'une permutation sont des permutations
+        def h(key: int) -> float:
+            depth = pdb[_rank(key)]
+            return INF if depth == PDB_UNREACHABLE else depth
+        return h
+    
     def solve(self) -> Optional[List[Tuple[PuzzleState, str]]]:
-        """Résout avec A*"""
+        """
+        Résout avec A*
+        Un successeur n'est ajouté à la frontière que s'il améliore le
+        meilleur coût g connu pour sa grille (best_g)
+        Avec Manhattan, le h des successeurs est mis à jour incrémentalement
+        Si Numba est disponible, les heuristiques entières passent par le
+        noyau compilé (_astar_kernel)
+        Les compteurs sont des variables locales, recopiées dans self.stats
+        à la fin (pas d'accès au dictionnaire dans la boucle)
+        """
+        tile_costs = self._tile_costs()
+        if (njit is not None and tile_costs is not None
+                and is_permutation(self.initial.key) and is_permutation(self.goal.key)):
+            return self._solve_kernel(tile_costs)
+        
         self.stats = {'nodes_explored': 0, 'nodes_generated': 0, 'max_frontier_size': 0}
+        h_key = self._key_heuristic()
+        tile_dist = self._tile_distances() if self.h_func is Heuristic.manhattan_distance else None
         
-        # Frontière: (f, compteur, état)
-        # f = g + h
-        # compteur pour départager les états avec même f
-        counter = 0
-        h_initial = self.h_func(self.initial, self.goal)
-        frontier = [(h_initial, counter, self.initial)]
-        explored = set()
+        # Copie de l'initial portant son h (l'état fourni n'est pas modifié)
+        initial = self.initial
+        initial = PuzzleState.from_key(initial.key, initial.empty_idx, g=initial.g, h=h_key(initial.key))
+        if initial.h == INF:
+            return None  # Base de motifs : but inatteignable (parité)
         
-        while frontier:
-            self.stats['max_frontier_size'] = max(self.stats['max_frontier_size'], len(frontier))
-            
-            f, _, state = heapq.heappop(frontier)
+        # Frontière en files par priorité (f, -g) : buckets[(f, -g)] est une
+        # file FIFO, priorities le tas des priorités présentes. À f égal, la
+        # grille la plus profonde passe d'abord (plus proche du but). Les f
+        # et g sont de petits entiers (ou peu de valeurs distinctes pour
+        # l'euclidienne) : le tas reste minuscule
+        priority = (initial.g + initial.h, -initial.g)
+        buckets = {priority: deque([initial])}
+        priorities = [priority]
+        frontier_size = max_frontier = 1
+        nodes_generated = 0
+        explored = set()  # Grilles codées (PuzzleState.key)
+        best_g = {initial.key: initial.g}
+        goal_key = self._goal_key
+        solution = None
+        
+        while priorities:
+            priority = priorities[0]
+            bucket = buckets[priority]
+            state = bucket.popleft()
+            if not bucket:
+                del buckets[priority]
+                heapq.heappop(priorities)
+            frontier_size -= 1
             
-            if state in explored:
+            # Entrée périmée : la grille a été réinsérée avec un meilleur g
+            if state.g != best_g[state.key] or state.key in explored:
                 continue
             
-            explored.add(state)
-            self.stats['nodes_explored'] += 1
+            explored.add(state.key)
             
-            if state.is_goal(self.goal):
-                return state.get_path()
+            if state.key == goal_key:
+                solution = state.get_path()
+                break
             
-            for succ in state.successors():
-                if succ not in explored:
-                    h = self.h_func(succ, self.goal)
-                    f = succ.g + h
-                    counter += 1
-                    heapq.heappush(frontier, (f, counter, succ))
-                    self.stats['nodes_generated'] += 1
+            for succ in state.successors(tile_dist):
+                key = succ.key
+                if key in explored or succ.g >= best_g.get(key, INF):
+                    continue
+                best_g[key] = succ.g
+                if succ.h is None:
+                    succ.h = h_key(key)
+                priority = (succ.g + succ.h, -succ.g)
+                bucket = buckets.get(priority)
+                if bucket is None:
+                    buckets[priority] = bucket = deque()
+                    heapq.heappush(priorities, priority)
+                bucket.append(succ)
+                frontier_size += 1
+                if frontier_size > max_frontier:
+                    max_frontier = frontier_size
+                nodes_generated += 1
         
-        return None
+        # Chaque grille explorée l'est une seule fois : len(explored) suffit
+        self.stats = {
+            'nodes_explored': len(explored),
+            'nodes_generated': nodes_generated,
+            'max_frontier_size': max_frontier
+        }
+        return solution
+    
+    def solve_bidirectional(self) -> Optional[List[Tuple[PuzzleState, str]]]:
+        """
+        A* bidirectionnel : une recherche avant depuis l'initial et une
+        recherche arrière depuis le but (les mouvements sont réversibles),
+        chacune guidée par l'heuristique choisie vers l'autre extrémité
+        On développe le côté dont la frontière est la plus petite ; chaque
+        grille générée déjà atteinte par l'autre côté donne un raccord de
+        coût mu. Arrêt dès que mu <= max(f min avant, f min arrière) :
+        pour une heuristique cohérente, aucun chemin plus court ne reste
+        Avec la base de motifs, seule la recherche avant l'utilise : la
+        recherche arrière (vers l'initial, différent à chaque requête) est
+        guidée par Manhattan, sans construire de base pour cet initial
+        """
+        self.stats = {'nodes_explored': 0, 'nodes_generated': 0, 'max_frontier_size': 0}
+        if self.initial.key == self._goal_key:
+            return []
+        
+        backward_heuristic = 'manhattan' if self.heuristic_name == 'pdb' else self.heuristic_name
+        sides = []
+        for solver, start in ((self, self.initial),
+                              (AStarSolver(self.goal, self.initial, backward_heuristic), self.goal)):
+            h_key = solver._key_heuristic()
+            root = PuzzleState.from_key(start.key, start.empty_idx, h=h_key(start.key))
+            if root.h == INF:
+                return None  # Base de motifs : extrémités de parités différentes
+            sides.append({
+                'h': h_key,
+                'tile_dist': solver._tile_distances() if solver.h_func is Heuristic.manhattan_distance else None,
+                # Entrées (f, -g, grille codée) : uniquement des nombres, à f
+                # égal la plus profonde d'abord ; l'état est lu dans best
+                'frontier': [(root.h, 0, root.key)],
+                'best': {root.key: root},  # Meilleur état connu par grille
+                'explored': set()
+            })
+        forward, backward = sides
+        
+        nodes_generated = 0
+        max_frontier = 0
+        mu = INF
+        meeting = None  # (état avant, état arrière) sur la même grille
+        
+        while forward['frontier'] and backward['frontier']:
+            frontier_size = len(forward['frontier']) + len(backward['frontier'])
+            if frontier_size > max_frontier:
+                max_frontier = frontier_size
+            
+            if mu <= max(forward['frontier'][0][0], backward['frontier'][0][0]):
+                break
+            
+            if len(forward['frontier']) <= len(backward['frontier']):
+                side, other = forward, backward
+            else:
+                side, other = backward, forward
+            
+            _, neg_g, key = heapq.heappop(side['frontier'])
+            state = side['best'][key]
+            if key in side['explored'] or state.g != -neg_g:
+                continue  # Entrée périmée
+            
+            side['explored'].add(state.key)
+            
+            best, h_key = side['best'], side['h']
+            for succ in state.successors(side['tile_dist']):
+                key = succ.key
+                if key in side['explored']:
+                    continue
+                known = best.get(key)
+                if known is not None and succ.g >= known.g:
+                    continue
+                best[key] = succ
+                
+                match = other['best'].get(key)
+                if match is not None and succ.g + match.g < mu:
+                    mu = succ.g + match.g
+                    meeting = (succ, match) if side is forward else (match, succ)
+                
+                if succ.h is None:
+                    succ.h = h_key(key)
+                if succ.g + succ.h >= mu:
+                    continue  # Ne peut plus améliorer le meilleur raccord
+                heapq.heappush(side['frontier'], (succ.g + succ.h, -succ.g, key))
+                nodes_generated += 1
+        
+        self.stats = {
+            'nodes_explored': len(forward['explored']) + len(backward['explored']),
+            'nodes_generated': nodes_generated,
+            'max_frontier_size': max_frontier
+        }
+        if meeting is None:
+            return None
+        
+        # Moitié avant telle quelle, puis moitié arrière parcourue vers le
+        # but avec les actions inversées
+        path = meeting[0].get_path()
+        state, node = meeting[0], meeting[1]
+        while node.parent is not None:
+            action = OPPOSITE[node.action]
+            node = node.parent
+            state = PuzzleState.from_key(node.key, node.empty_idx, parent=state, action=action, g=state.g + 1)
+            path.append((state, action))
+        return path
+    
+    def _solve_kernel(self, tile_costs: List[int]) -> Optional[List[Tuple[PuzzleState, str]]]:
+        """Résout avec _astar_kernel puis rejoue les actions pour reconstruire le chemin"""
+        initial = self.initial
+        found, actions, stats = _astar_kernel(
+            initial.key, initial.empty_idx, initial.g, self.goal.key,
+            np.array(tile_costs, np.int32), MOVE_CELLS, MOVE_ACTIONS
+        )
+        self.stats = {
+            'nodes_explored': int(stats[0]),
+            'nodes_generated': int(stats[1]),
+            'max_frontier_size': int(stats[2])
+        }
+        if not found:
+            return None
+        
+        path = []
+        state = initial
+        for code in actions:
+            action = ACTIONS[code]
+            state = next(succ for succ in state.successors() if succ.action == action)
+            path.append((state, action))
+        return path
 
 
 def create_example_states() -> Tuple[PuzzleState, PuzzleState]:
@@ -226,6 +859,21 @@ def create_example_states() -> Tuple[PuzzleState, PuzzleState]:
     return initial, goal
 
 
+def solve_puzzle(initial: List[List[int]], goal: List[List[int]],
+                 heuristic: str = 'manhattan', bidirectional: bool = False) -> Tuple[Optional[List[str]], dict]:
+    """
+    Résout un taquin avec A* (bidirectionnel si demandé)
+    Fonction de module pour pouvoir être exécutée dans un ProcessPoolExecutor
+
+    Returns:
+        (actions de la solution ou None, stats)
+    """
+    solver = AStarSolver(PuzzleState(initial), PuzzleState(goal), heuristic=heuristic)
+    solution = solver.solve_bidirectional() if bidirectional else solver.solve()
+    actions = [action for _, action in solution] if solution is not None else None
+    return actions, solver.stats
+
+
 def print_solution(solution: Optional[List[Tuple[PuzzleState, str]]], initial: PuzzleState):
     """Affiche la solution"""
     if solution is None:
@@ -256,7 +904,7 @@ def main():
     print("\nÉtat but:")
     print(goal)
     
-    heuristics = ['manhattan', 'misplaced', 'euclidean']
+    heuristics = ['manhattan', 'misplaced', 'euclidean', 'pdb']
     
     for h_name in heuristics:
         print("\n" + "="*60)
@@ -0,0 +1,52 @@
+"""
+Cache LRU des résultats du solveur
+La résolution SAT est déterministe pour une entrée donnée : une requête
+identique est servie depuis le cache au lieu de relancer GopherSAT
+"""
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class ResultCache:
+    """
+    Cache LRU (max_size entrées) indexé par un hash BLAKE2b du contenu
+
+    Chaque résultat retourné est une copie : le dictionnaire stocké n'est
+    jamais modifié par les endpoints
+    """
+
+    def __init__(self, max_size: int = 512):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, Dict]" = OrderedDict()
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def hasher():
+        """Hash incrémental (appeler update puis digest) pour un contenu reçu par morceaux"""
+        return hashlib.blake2b(digest_size=16)
+
+    @staticmethod
+    def key(content: bytes) -> bytes:
+        """Calcule la clé de cache (digest 128 bits) d'un contenu"""
+        hasher = ResultCache.hasher()
+        hasher.update(content)
+        return hasher.digest()
+
+    async def get(self, key: bytes) -> Optional[Dict]:
+        """Retourne une copie du résultat en cache, ou None"""
+        async with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                return None
+            self._entries.move_to_end(key)
+            return dict(result)
+
+    async def put(self, key: bytes, result: Dict):
+        """Ajoute un résultat en évinçant le moins récemment utilisé"""
+        async with self._lock:
+            self._entries[key] = dict(result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
@@ -9,9 +9,29 @@ import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 import io
 import base64
+import numpy as np
 from PIL import Image
 
 
+def _palette_image() -> Image.Image:
+    """Palette fixe des images du GIF (les couleurs de visualize)"""
+    image = Image.new('P', (1, 1))
+    image.putpalette([
+        255, 255, 255,  # blanc
+        0, 0, 0,        # bordures, texte
+        144, 238, 144,  # objectif (lightgreen)
+        128, 128, 128,  # mur, numéros (gray)
+        0, 0, 255,      # worker (blue)
+        255, 165, 0,    # caisse (orange)
+        165, 42, 42,    # bordure de caisse (brown)
+        192, 192, 192,  # anticrénelage
+    ] + [0, 0, 0] * 248)
+    return image
+
+
+PALETTE_IMG = _palette_image()
+
+
 class SokobanSimulator:
     """Simule l'exécution d'un plan Sokorridor"""
     
@@ -22,23 +42,35 @@ class SokobanSimulator:
     def reset(self):
         """Réinitialise l'état"""
         self.worker_pos = 0
-        self.boxes = []
+        self.boxes_set = set()
         self.goals = []
+        self.goals_set = set()
         self.walls = [0, self.num_cells - 1]  # Murs aux extrémités
+        self.walls_set = set(self.walls)
         self.history = []
     
+    @property
+    def boxes(self) -> List[int]:
+        """Positions des caisses (croissantes, dérivées de boxes_set)"""
+        return sorted(self.boxes_set)
+    
+    @boxes.setter
+    def boxes(self, positions: List[int]):
+        self.boxes_set = set(positions)
+    
     def set_initial_state(self, worker_pos: int, boxes: List[int], goals: List[int]):
         """Définit l'état initial"""
         self.worker_pos = worker_pos
-        self.boxes = boxes.copy()
+        self.boxes_set = set(boxes)
         self.goals = goals
+        self.goals_set = set(goals)
         self.history = [self.get_state()]
     
     def get_state(self) -> Dict:
         """Retourne l'état actuel"""
         return {
             'worker': self.worker_pos,
-            'boxes': self.boxes.copy()
+            'boxes': self.boxes
         }
     
     def is_valid_position(self, pos: int) -> bool:
@@ -47,7 +79,7 @@ class SokobanSimulator:
     
     def is_goal_reached(self) -> bool:
         """Vérifie si tous les objectifs sont atteints"""
-        return set(self.boxes) == set(self.goals)
+        return self.boxes_set == self.goals_set
     
     def execute_action(self, action: str) -> Tuple[bool, str]:
         """
@@ -74,7 +106,7 @@ class SokobanSimulator:
         if not self.is_valid_position(new_pos):
             return False, "Mur à droite"
         
-        if new_pos in self.boxes:
+        if new_pos in self.boxes_set:
             return False, "Caisse bloque le passage"
         
         self.worker_pos = new_pos
@@ -88,7 +120,7 @@ class SokobanSimulator:
         if not self.is_valid_position(new_pos):
             return False, "Mur à gauche"
         
-        if new_pos in self.boxes:
+        if new_pos in self.boxes_set:
             return False, "Caisse bloque le passage"
         
         self.worker_pos = new_pos
@@ -103,18 +135,18 @@ class SokobanSimulator:
         if not self.is_valid_position(box_pos):
             return False, "Pas de case à droite"
         
-        if box_pos not in self.boxes:
+        if box_pos not in self.boxes_set:
             return False, "Pas de caisse à pousser"
         
         if not self.is_valid_position(new_box_pos):
             return False, "Mur bloque la caisse"
         
-        if new_box_pos in self.boxes:
+        if new_box_pos in self.boxes_set:
             return False, "Une autre caisse bloque"
         
         # Déplacer la caisse
-        self.boxes.remove(box_pos)
-        self.boxes.append(new_box_pos)
+        self.boxes_set.discard(box_pos)
+        self.boxes_set.add(new_box_pos)
         
         # Déplacer le worker
         self.worker_pos = box_pos
@@ -130,18 +162,18 @@ class SokobanSimulator:
         if not self.is_valid_position(box_pos):
             return False, "Pas de case à gauche"
         
-        if box_pos not in self.boxes:
+        if box_pos not in self.boxes_set:
             return False, "Pas de caisse à pousser"
         
         if not self.is_valid_position(new_box_pos):
             return False, "Mur bloque la caisse"
         
-        if new_box_pos in self.boxes:
+        if new_box_pos in self.boxes_set:
             return False, "Une autre caisse bloque"
         
         # Déplacer la caisse
-        self.boxes.remove(box_pos)
-        self.boxes.append(new_box_pos)
+        self.boxes_set.discard(box_pos)
+        self.boxes_set.add(new_box_pos)
         
         # Déplacer le worker
         self.worker_pos = box_pos
@@ -194,21 +226,23 @@ class SokobanSimulator:
         if state is None:
             state = self.get_state()
         
+        boxes = set(state['boxes'])
+        
         # Créer la ligne de représentation
         line = ['#']  # Mur gauche
         
         for pos in range(1, self.num_cells - 1):
             if pos == state['worker']:
-                if pos in self.goals:
+                if pos in self.goals_set:
                     line.append('+')  # Worker sur objectif
                 else:
                     line.append('@')
-            elif pos in state['boxes']:
-                if pos in self.goals:
+            elif pos in boxes:
+                if pos in self.goals_set:
                     line.append('*')  # Caisse sur objectif
                 else:
                     line.append('$')
-            elif pos in self.goals:
+            elif pos in self.goals_set:
                 line.append('.')
             else:
                 line.append(' ')
@@ -227,10 +261,46 @@ class SokobanSimulator:
         Returns:
             Image encodée en base64
         """
+        fig = self._draw_figure(state, title)
+        
+        # Convertir en base64
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
+        buffer.seek(0)
+        image_base64 = base64.b64encode(buffer.read()).decode('utf-8')
+        plt.close(fig)
+        
+        return image_base64
+    
+    def _visualize_to_pil(self, state: Dict = None, title: str = "") -> Image.Image:
+        """
+        Même rendu que visualize, lu directement dans le tampon RGBA du
+        canvas Agg (ni encodage PNG ni base64), quantifié sur la palette fixe
+        PALETTE_IMG : toutes les images du GIF partagent la même palette
+        Le recadrage sur le contenu (marge de 0.1 pouce) remplace
+        bbox_inches='tight'
+        """
+        fig = self._draw_figure(state, title)
+        fig.canvas.draw()
+        rgb = np.asarray(fig.canvas.buffer_rgba())[:, :, :3]
+        plt.close(fig)
+        
+        ink = (rgb != 255).any(axis=2)
+        rows = np.nonzero(ink.any(axis=1))[0]
+        cols = np.nonzero(ink.any(axis=0))[0]
+        if len(rows):
+            pad = round(0.1 * fig.dpi)
+            rgb = rgb[max(rows[0] - pad, 0):rows[-1] + pad + 1,
+                      max(cols[0] - pad, 0):cols[-1] + pad + 1]
+        return Image.fromarray(rgb).quantize(palette=PALETTE_IMG, dither=Image.Dither.NONE)
+    
+    def _draw_figure(self, state: Dict = None, title: str = ""):
+        """Dessine l'état dans une nouvelle figure (à fermer par l'appelant)"""
         if state is None:
             state = self.get_state()
+        boxes = set(state['boxes'])
         
-        fig, ax = plt.subplots(figsize=(12, 2))
+        fig, ax = plt.subplots(figsize=(12, 2), dpi=100)
         
         # Configuration
         cell_size = 1
@@ -245,9 +315,9 @@ class SokobanSimulator:
         # Dessiner les cases
         for pos in range(self.num_cells):
             # Fond
-            if pos in self.goals:
+            if pos in self.goals_set:
                 color = 'lightgreen'
-            elif pos in self.walls:
+            elif pos in self.walls_set:
                 color = 'gray'
             else:
                 color = 'white'
@@ -265,7 +335,7 @@ class SokobanSimulator:
                 ax.text(pos, 0.5, '@', ha='center', va='center',
                        fontsize=16, fontweight='bold', color='white')
             
-            if pos in state['boxes']:
+            if pos in boxes:
                 # Caisse
                 box_rect = patches.Rectangle((pos - 0.25, 0.25), 0.5, 0.5,
                                             linewidth=2, edgecolor='brown',
@@ -285,16 +355,8 @@ class SokobanSimulator:
         ax.text(6, legend_y, '░ = Objectif', fontsize=10, 
                bbox=dict(boxstyle='round', facecolor='lightgreen'))
         
-        plt.tight_layout()
-        
-        # Convertir en base64
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-        plt.close()
-        
-        return image_base64
+        fig.tight_layout()
+        return fig
     
     def visualize_plan_execution(self, plan_result: Dict) -> List[str]:
         """
@@ -330,9 +392,7 @@ class SokobanSimulator:
         pil_images = []
         
         # État initial
-        img_b64 = self.visualize(self.history[0], "État Initial")
-        img_data = base64.b64decode(img_b64)
-        pil_images.append(Image.open(io.BytesIO(img_data)))
+        pil_images.append(self._visualize_to_pil(self.history[0], "État Initial"))
         
         # Chaque étape
         for i, step in enumerate(plan_result['steps']):
@@ -345,9 +405,7 @@ class SokobanSimulator:
             action_sym = action_symbols.get(step['action'], step['action'])
             title = f"t={step['time']}: {action_sym}"
             
-            img_b64 = self.visualize(step['state'], title)
-            img_data = base64.b64decode(img_b64)
-            pil_images.append(Image.open(io.BytesIO(img_data)))
+            pil_images.append(self._visualize_to_pil(step['state'], title))
         
         # Créer le GIF
         gif_buffer = io.BytesIO()
@@ -357,7 +415,9 @@ class SokobanSimulator:
             save_all=True,
             append_images=pil_images[1:],
             duration=duration,
-            loop=0  # Loop infiniment
+            loop=0,  # Loop infiniment
+            optimize=False,  # Palette déjà commune aux images
+            disposal=2
         )
         gif_buffer.seek(0)
         
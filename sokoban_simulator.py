@@ -5,40 +5,127 @@ Permet de visualiser et vérifier l'exécution d'un plan
 from typing import List, Dict, Tuple
 import matplotlib
 matplotlib.use('Agg')
-import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib.figure import Figure
 import io
 import base64
+import numpy as np
 from PIL import Image
 
 
+# Tuiles du GIF animé (mêmes couleurs que visualize), en indices de palette
+_TILE_SIZE = 48
+_PALETTE = [
+    255, 255, 255,  # 0 blanc
+    0, 0, 0,        # 1 bordure
+    144, 238, 144,  # 2 objectif (lightgreen)
+    128, 128, 128,  # 3 mur (gray)
+    0, 0, 255,      # 4 worker (blue)
+    255, 165, 0,    # 5 caisse (orange)
+    165, 42, 42,    # 6 bordure de caisse (brown)
+]
+_FLOOR, _GOAL, _WALL = 0, 1, 2  # Fond d'une case
+_EMPTY, _BOX, _WORKER = 0, 1, 2  # Contenu d'une case
+
+
+def _build_tiles() -> np.ndarray:
+    """Précalcule les tuiles : _TILES[fond, contenu] -> image (H, W)"""
+    size = _TILE_SIZE
+    yy, xx = np.mgrid[0:size, 0:size]
+    center = (size - 1) / 2
+    
+    def square(half: float) -> np.ndarray:
+        return (abs(xx - center) <= half) & (abs(yy - center) <= half)
+    
+    # Case : carré de 0.8 bordé de noir, caisse : carré de 0.5 bordé de brun,
+    # worker : disque de rayon 0.3 (proportions de visualize)
+    worker = (xx - center) ** 2 + (yy - center) ** 2 <= (0.3 * size) ** 2
+    
+    tiles = np.zeros((3, 3, size, size), dtype=np.uint8)
+    for background, color in ((_FLOOR, 0), (_GOAL, 2), (_WALL, 3)):
+        base = np.zeros((size, size), dtype=np.uint8)
+        base[square(0.4 * size)] = 1
+        base[square(0.4 * size - 2)] = color
+        tiles[background, _EMPTY] = base
+        tiles[background, _BOX] = base
+        tiles[background, _BOX][square(0.25 * size)] = 6
+        tiles[background, _BOX][square(0.25 * size - 2)] = 5
+        tiles[background, _WORKER] = base
+        tiles[background, _WORKER][worker] = 4
+    return tiles
+
+
+_TILES = _build_tiles()
+
+
+def positions_mask(positions: List[int]) -> int:
+    """Masque de bits d'un ensemble de cases (bit p pour la case p)"""
+    mask = 0
+    for pos in positions:
+        if pos < 0:
+            raise ValueError(f"Position hors du couloir: {pos}")
+        mask |= 1 << pos
+    return mask
+
+
+def mask_positions(mask: int) -> List[int]:
+    """Cases (croissantes) d'un masque de bits"""
+    positions = []
+    while mask:
+        low = mask & -mask
+        positions.append(low.bit_length() - 1)
+        mask ^= low
+    return positions
+
+
 class SokobanSimulator:
-    """Simule l'exécution d'un plan Sokorridor"""
+    """
+    Simule l'exécution d'un plan Sokorridor
+    Caisses, objectifs et murs sont aussi tenus en masques de bits
+    (boxes_mask, goals_mask, walls_mask) : tests d'occupation en O(1)
+    """
     
     def __init__(self, num_cells: int = 11):
         self.num_cells = num_cells
+        self._fig = None  # Figure de visualize (cf. _figure)
+        self._ax = None
+        self._fig_config = None
+        self._frame_artists = []
         self.reset()
     
     def reset(self):
         """Réinitialise l'état"""
         self.worker_pos = 0
-        self.boxes = []
+        self.boxes_mask = 0
         self.goals = []
+        self.goals_mask = 0
         self.walls = []  # PAS de murs dans le modèle 1D
+        self.walls_mask = 0
         self.history = []
+        self.record_history = True  # False pendant execute_plan(record='compact')
+    
+    @property
+    def boxes(self) -> List[int]:
+        """Positions des caisses (vue dérivée de boxes_mask)"""
+        return mask_positions(self.boxes_mask)
+    
+    @boxes.setter
+    def boxes(self, positions: List[int]):
+        self.boxes_mask = positions_mask(positions)
     
     def set_initial_state(self, worker_pos: int, boxes: List[int], goals: List[int]):
         """Définit l'état initial"""
         self.worker_pos = worker_pos
-        self.boxes = boxes.copy()
+        self.boxes_mask = positions_mask(boxes)
         self.goals = goals
+        self.goals_mask = positions_mask(goals)
         self.history = [self.get_state()]
     
     def get_state(self) -> Dict:
         """Retourne l'état actuel"""
         return {
             'worker': self.worker_pos,
-            'boxes': self.boxes.copy()
+            'boxes': self.boxes
         }
     
     def is_valid_position(self, pos: int) -> bool:
@@ -47,7 +134,7 @@ class SokobanSimulator:
     
     def is_goal_reached(self) -> bool:
         """Vérifie si tous les objectifs sont atteints"""
-        return set(self.boxes) == set(self.goals)
+        return self.boxes_mask == self.goals_mask
     
     def execute_action(self, action: str) -> Tuple[bool, str]:
         """
@@ -74,11 +161,12 @@ class SokobanSimulator:
         if not self.is_valid_position(new_pos):
             return False, "Hors limites"
         
-        if new_pos in self.boxes:
+        if (self.boxes_mask >> new_pos) & 1:
             return False, "Caisse bloque le passage"
         
         self.worker_pos = new_pos
-        self.history.append(self.get_state())
+        if self.record_history:
+            self.history.append(self.get_state())
         return True, "Déplacé à droite"
     
     def move_left(self) -> Tuple[bool, str]:
@@ -88,11 +176,12 @@ class SokobanSimulator:
         if not self.is_valid_position(new_pos):
             return False, "Hors limites"
         
-        if new_pos in self.boxes:
+        if (self.boxes_mask >> new_pos) & 1:
             return False, "Caisse bloque le passage"
         
         self.worker_pos = new_pos
-        self.history.append(self.get_state())
+        if self.record_history:
+            self.history.append(self.get_state())
         return True, "Déplacé à gauche"
     
     def push_right(self) -> Tuple[bool, str]:
@@ -103,20 +192,20 @@ class SokobanSimulator:
         if not self.is_valid_position(box_pos) or not self.is_valid_position(new_box_pos):
             return False, "Hors limites"
         
-        if box_pos not in self.boxes:
+        if not (self.boxes_mask >> box_pos) & 1:
             return False, "Pas de caisse à pousser"
         
-        if new_box_pos in self.boxes:
+        if (self.boxes_mask >> new_box_pos) & 1:
             return False, "Une autre caisse bloque"
         
         # Déplacer la caisse
-        self.boxes.remove(box_pos)
-        self.boxes.append(new_box_pos)
+        self.boxes_mask ^= (1 << box_pos) | (1 << new_box_pos)
         
         # Déplacer le worker
         self.worker_pos = box_pos
         
-        self.history.append(self.get_state())
+        if self.record_history:
+            self.history.append(self.get_state())
         return True, "Caisse poussée à droite"
     
     def push_left(self) -> Tuple[bool, str]:
@@ -127,82 +216,109 @@ class SokobanSimulator:
         if not self.is_valid_position(box_pos) or not self.is_valid_position(new_box_pos):
             return False, "Hors limites"
         
-        if box_pos not in self.boxes:
+        if not (self.boxes_mask >> box_pos) & 1:
             return False, "Pas de caisse à pousser"
         
-        if new_box_pos in self.boxes:
+        if (self.boxes_mask >> new_box_pos) & 1:
             return False, "Une autre caisse bloque"
         
         # Déplacer la caisse
-        self.boxes.remove(box_pos)
-        self.boxes.append(new_box_pos)
+        self.boxes_mask ^= (1 << box_pos) | (1 << new_box_pos)
         
         # Déplacer le worker
         self.worker_pos = box_pos
         
-        self.history.append(self.get_state())
+        if self.record_history:
+            self.history.append(self.get_state())
         return True, "Caisse poussée à gauche"
     
-    def execute_plan(self, plan: List[Tuple[int, str]]) -> Dict:
+    def execute_plan(self, plan: List[Tuple[int, str]], record: str = 'full') -> Dict:
         """
         Exécute un plan complet
         
         Args:
             plan: Liste de (time, action)
+            record: 'full' (détail de chaque étape : steps et history) ou
+                'compact' (seulement trace, sans aucun dictionnaire par étape)
             
         Returns:
-            Résultat de l'exécution
+            Résultat de l'exécution, dont trace : tableau int16
+            [étapes + 1, 1 + caisses], une ligne par état (initial puis après
+            chaque action) contenant le worker puis les caisses croissantes
         """
+        if record not in ('full', 'compact'):
+            raise ValueError(f"Mode d'enregistrement inconnu: {record}")
+        full = record == 'full'
+        
+        trace = np.empty((len(plan) + 1, 1 + bin(self.boxes_mask).count('1')), dtype=np.int16)
+        trace[0, 0] = self.worker_pos
+        trace[0, 1:] = self.boxes
         results = []
         
-        for time, action in plan:
-            success, message = self.execute_action(action)
-            results.append({
-                'time': time,
-                'action': action,
-                'success': success,
-                'message': message,
-                'state': self.get_state()
-            })
-            
-            if not success:
-                return {
-                    'success': False,
-                    'message': f"Échec à l'étape {time}: {message}",
-                    'steps': results,
-                    'goal_reached': False
-                }
+        self.record_history = full
+        try:
+            for t, (time, action) in enumerate(plan, 1):
+                success, message = self.execute_action(action)
+                trace[t, 0] = self.worker_pos
+                trace[t, 1:] = self.boxes
+                if full:
+                    results.append({
+                        'time': time,
+                        'action': action,
+                        'success': success,
+                        'message': message,
+                        'state': self.get_state()
+                    })
+                
+                if not success:
+                    result = {
+                        'success': False,
+                        'message': f"Échec à l'étape {time}: {message}",
+                        'goal_reached': False,
+                        'trace': trace[:t + 1]
+                    }
+                    if full:
+                        result['steps'] = results
+                    return result
+        finally:
+            self.record_history = True
         
         goal_reached = self.is_goal_reached()
         
-        return {
+        result = {
             'success': True,
             'message': "Plan exécuté avec succès" if goal_reached else "Plan exécuté mais objectif non atteint",
-            'steps': results,
             'goal_reached': goal_reached,
-            'history': self.history
+            'trace': trace
         }
+        if full:
+            result['steps'] = results
+            result['history'] = self.history
+        return result
     
     def render_state(self, state: Dict = None, title: str = "") -> str:
         """Génère une représentation ASCII de l'état"""
         if state is None:
             state = self.get_state()
         
+        boxes_mask = positions_mask(state['boxes'])
+        
         # Créer la ligne de représentation
         line = ['#']  # Mur gauche
         
         for pos in range(1, self.num_cells - 1):
+            on_goal = (self.goals_mask >> pos) & 1
             if pos == state['worker']:
-                if pos in self.goals:
+                if on_goal:
                     line.append('+')  # Worker sur objectif
                 else:
                     line.append('@')
-            elif pos in state['boxes']:
-                if pos in self.goals:
+            elif (boxes_mask >> pos) & 1:
+                if on_goal:
                     line.append('*')  # Caisse sur objectif
                 else:
                     line.append('$')
-            elif pos in self.goals:
+            elif on_goal:
                 line.append('.')
             else:
                 line.append(' ')
@@ -214,34 +330,32 @@ class SokobanSimulator:
             result = f"{title}\n{result}"
         return result
     
-    def visualize(self, state: Dict = None, title: str = "") -> str:
+    def _figure(self) -> Tuple[Figure, "matplotlib.axes.Axes"]:
         """
-        Génère une visualisation graphique de l'état
-        
-        Returns:
-            Image encodée en base64
+        Figure de visualize, créée une fois par configuration du couloir :
+        axes, cases, numéros et légende sont dessinés une seule fois, seuls
+        le worker, les caisses et le titre changent d'une image à l'autre
+        (Figure hors pyplot : pas d'état global, libérée avec le simulateur)
         """
-        if state is None:
-            state = self.get_state()
+        config = (self.num_cells, self.goals_mask, self.walls_mask)
+        if self._fig is not None and self._fig_config == config:
+            return self._fig, self._ax
         
-        fig, ax = plt.subplots(figsize=(12, 2))
+        fig = Figure(figsize=(12, 2))
+        ax = fig.subplots()
         
         # Configuration
-        cell_size = 1
         ax.set_xlim(-0.5, self.num_cells - 0.5)
         ax.set_ylim(-0.5, 1.5)
         ax.set_aspect('equal')
         ax.axis('off')
         
-        if title:
-            ax.set_title(title, fontsize=14, fontweight='bold')
-        
         # Dessiner les cases
         for pos in range(self.num_cells):
             # Fond
-            if pos in self.goals:
+            if (self.goals_mask >> pos) & 1:
                 color = 'lightgreen'
-            elif pos in self.walls:
+            elif (self.walls_mask >> pos) & 1:
                 color = 'gray'
             else:
                 color = 'white'
@@ -251,23 +365,6 @@ class SokobanSimulator:
                                      facecolor=color)
             ax.add_patch(rect)
             
-            # Contenu
-            if pos == state['worker']:
-                # Worker (personnage)
-                circle = patches.Circle((pos, 0.5), 0.3, color='blue')
-                ax.add_patch(circle)
-                ax.text(pos, 0.5, '@', ha='center', va='center',
-                       fontsize=16, fontweight='bold', color='white')
-            
-            if pos in state['boxes']:
-                # Caisse
-                box_rect = patches.Rectangle((pos - 0.25, 0.25), 0.5, 0.5,
-                                            linewidth=2, edgecolor='brown',
-                                            facecolor='orange')
-                ax.add_patch(box_rect)
-                ax.text(pos, 0.5, '$', ha='center', va='center',
-                       fontsize=14, fontweight='bold', color='brown')
-            
             # Numéros de cases
             ax.text(pos, -0.2, str(pos), ha='center', va='center',
                    fontsize=10, color='gray')
@@ -279,14 +376,53 @@ class SokobanSimulator:
         ax.text(6, legend_y, '░ = Objectif', fontsize=10, 
                bbox=dict(boxstyle='round', facecolor='lightgreen'))
         
-        plt.tight_layout()
+        self._fig, self._ax, self._fig_config = fig, ax, config
+        self._frame_artists = []
+        return fig, ax
+    
+    def visualize(self, state: Dict = None, title: str = "") -> str:
+        """
+        Génère une visualisation graphique de l'état
+        
+        Returns:
+            Image encodée en base64
+        """
+        if state is None:
+            state = self.get_state()
+        
+        fig, ax = self._figure()
+        
+        # Retirer le contenu de l'image précédente
+        for artist in self._frame_artists:
+            artist.remove()
+        self._frame_artists = []
+        
+        ax.set_title(title, fontsize=14, fontweight='bold')
+        
+        # Worker (personnage)
+        pos = state['worker']
+        if 0 <= pos < self.num_cells:
+            self._frame_artists.append(ax.add_patch(patches.Circle((pos, 0.5), 0.3, color='blue')))
+            self._frame_artists.append(ax.text(pos, 0.5, '@', ha='center', va='center',
+                                               fontsize=16, fontweight='bold', color='white'))
+        
+        # Caisses
+        for pos in state['boxes']:
+            if 0 <= pos < self.num_cells:
+                box_rect = patches.Rectangle((pos - 0.25, 0.25), 0.5, 0.5,
+                                            linewidth=2, edgecolor='brown',
+                                            facecolor='orange')
+                self._frame_artists.append(ax.add_patch(box_rect))
+                self._frame_artists.append(ax.text(pos, 0.5, '$', ha='center', va='center',
+                                                   fontsize=14, fontweight='bold', color='brown'))
+        
+        fig.tight_layout()
         
         # Convertir en base64
         buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
+        fig.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
         buffer.seek(0)
         image_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-        plt.close()
         
         return image_base64
     
@@ -313,6 +449,10 @@ class SokobanSimulator:
         """
         Crée un GIF animé de l'exécution du plan
         
+        Les images sont assemblées directement en NumPy à partir de tuiles
+        précalculées (une par type de case), en mode palette : ni rendu
+        matplotlib ni quantification des couleurs par image
+        
         Args:
             plan_result: Résultat de l'exécution du plan
             duration: Durée de chaque frame en millisecondes
@@ -320,28 +460,36 @@ class SokobanSimulator:
         Returns:
             GIF encodé en base64
         """
-        # Générer toutes les images
-        pil_images = []
+        trace = plan_result.get('trace')
+        if trace is None:
+            states = [self.history[0]] + [step['state'] for step in plan_result['steps']]
+            trace = np.array([[state['worker']] + sorted(state['boxes']) for state in states], dtype=np.intp)
+        trace = np.asarray(trace, dtype=np.intp)
+        
+        # Fond de chaque case (fixe) et contenu de chaque case par image
+        background = np.full(self.num_cells, _FLOOR, dtype=np.intp)
+        background[[pos for pos in self.goals if 0 <= pos < self.num_cells]] = _GOAL
+        background[[pos for pos in self.walls if 0 <= pos < self.num_cells]] = _WALL
+        n_frames = len(trace)
+        content = np.full((n_frames, self.num_cells), _EMPTY, dtype=np.intp)
+        frame_idx = np.arange(n_frames)
+        content[frame_idx[:, None], trace[:, 1:]] = _BOX
+        content[frame_idx, trace[:, 0]] = _WORKER
+        
+        # Une seule indexation : (images, cases, H, W) -> (images, H, cases * W)
+        frames = _TILES[background, content]
+        frames = frames.transpose(0, 2, 1, 3).reshape(n_frames, _TILE_SIZE, -1)
+        
+        # Fusionner les images identiques consécutives (durées cumulées)
+        keep = np.ones(len(frames), dtype=bool)
+        keep[1:] = (frames[1:] != frames[:-1]).any(axis=(1, 2))
+        durations = np.diff(np.append(np.nonzero(keep)[0], len(frames))) * duration
         
-        # État initial
-        img_b64 = self.visualize(self.history[0], "État Initial")
-        img_data = base64.b64decode(img_b64)
-        pil_images.append(Image.open(io.BytesIO(img_data)))
-        
-        # Chaque étape
-        for i, step in enumerate(plan_result['steps']):
-            action_symbols = {
-                'move_right': '→',
-                'move_left': '←',
-                'push_right': '⇒',
-                'push_left': '⇐'
-            }
-            action_sym = action_symbols.get(step['action'], step['action'])
-            title = f"t={step['time']}: {action_sym}"
-            
-            img_b64 = self.visualize(step['state'], title)
-            img_data = base64.b64decode(img_b64)
-            pil_images.append(Image.open(io.BytesIO(img_data)))
+        pil_images = []
+        for frame in frames[keep]:
+            image = Image.fromarray(frame, mode='P')
+            image.putpalette(_PALETTE)
+            pil_images.append(image)
         
         # Créer le GIF
         gif_buffer = io.BytesIO()
@@ -350,7 +498,7 @@ class SokobanSimulator:
             format='GIF',
             save_all=True,
             append_images=pil_images[1:],
-            duration=duration,
+            duration=durations.tolist(),
             loop=0  # Loop infiniment
         )
         gif_buffer.seek(0)
@@ -358,4 +506,34 @@ class SokobanSimulator:
         # Encoder en base64
         gif_base64 = base64.b64encode(gif_buffer.read()).decode('utf-8')
         
-        return gif_base64
\ No newline at end of file
+        return gif_base64
+
+
+def render_plan(initial_state: Dict, goals: List[int], plan: List[Tuple[int, str]],
+                num_cells: int = 11) -> Dict:
+    """
+    Rejoue un plan et génère ses visualisations (images + GIF animé)
+    Fonction de module pour pouvoir être exécutée dans un ProcessPoolExecutor
+
+    Returns:
+        Dictionnaire avec simulation, visualizations et animated_gif
+    """
+    simulator = SokobanSimulator(num_cells=num_cells)
+    simulator.set_initial_state(initial_state['worker'], initial_state['boxes'], goals)
+
+    # Exécuter le plan
+    plan_result = simulator.execute_plan(plan)
+
+    # Générer les visualisations
+    visualizations = simulator.visualize_plan_execution(plan_result)
+    animated_gif = simulator.create_animated_gif(plan_result, duration=500)
+
+    return {
+        'visualizations': visualizations,
+        'animated_gif': animated_gif,
+        'simulation': {
+            'success': plan_result['success'],
+            'message': plan_result['message'],
+            'goal_reached': plan_result['goal_reached']
+        }
+    }
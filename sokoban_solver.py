@@ -1,17 +1,52 @@
 """
 Sokoban SAT Solver - VERSION FINALE
 Encodage simple : chaque action définit complètement l'état suivant
+
+Les variables sont une grille régulière (temps, case, action) : chaque
+famille de clauses est construite d'un bloc comme un tableau NumPy int32
+(une ligne par clause), sans boucle Python sur les cases
 """
-import tempfile
-import subprocess
-import os
-from typing import List, Dict, Tuple
-from itertools import combinations
+import io
+from concurrent.futures import Executor
+from typing import BinaryIO, Iterator, List, Dict, Tuple, Optional
+import numpy as np
+from cardinality import at_most_one, clause_rows
+from gophersat_backend import SolverBackend, SubprocessBackend, parse_output
+
+# Nombre de clauses formatées par appel (borne la mémoire de sérialisation)
+WRITE_BATCH = 1 << 15
+
+# Sérialisation répartie sur l'executor à partir de cette taille (T * C) ;
+# en dessous, l'envoi des tableaux aux processus coûte plus qu'il ne rapporte
+PARALLEL_MIN_SIZE = 200
+
+
+def serialize_batch(clauses: np.ndarray) -> bytes:
+    """
+    Sérialise un tableau de clauses de même largeur en DIMACS
+    Fonction de module pour pouvoir être exécutée dans un ProcessPoolExecutor
+    """
+    line = b"%d " * clauses.shape[1] + b"0\n"
+    return (line * len(clauses)) % tuple(clauses.ravel().tolist())
+
+
+def clause_batches(families: List[np.ndarray]) -> Iterator[np.ndarray]:
+    """Découpe les familles de clauses en lots de WRITE_BATCH lignes (borne la mémoire)"""
+    for family in families:
+        for start in range(0, len(family), WRITE_BATCH):
+            yield family[start:start + WRITE_BATCH]
 
 
 class SokobanSAT:
-    def __init__(self, gophersat_path: str):
+    def __init__(self, gophersat_path: str, backend: Optional[SolverBackend] = None,
+                 executor: Optional[Executor] = None):
+        """
+        executor : pool de processus optionnel pour sérialiser les grands CNF
+        en parallèle (cf. PARALLEL_MIN_SIZE)
+        """
         self.gophersat_path = gophersat_path
+        self.backend = backend or SubprocessBackend(gophersat_path)
+        self.executor = executor
         
     def var(self, name: str, pos: int, time: int, T: int, C: int) -> int:
         """Encodage des variables"""
@@ -23,178 +58,220 @@ class SokobanSAT:
             actions = {'mr': 0, 'ml': 1, 'pr': 2, 'pl': 3}
             return 2 * (T + 1) * C + time * 4 + actions[name] + 1
     
-    def generate_cnf(self, initial: Dict, goals: List[int], T: int, C: int) -> Tuple[str, int, int]:
-        """Génère le CNF"""
-        clauses = []
+    def clause_families(self, initial: Dict, goals: List[int], T: int, C: int) -> Tuple[int, List[np.ndarray]]:
+        """
+        Construit toutes les clauses, regroupées en tableaux (nb_clauses, largeur)
+
+        Returns:
+            (nb_variables, liste des familles de clauses)
+
+        Raises:
+            ValueError si le worker, une caisse ou un but est hors de la grille
+        """
+        # Positions indexées dans les grilles NumPy ci-dessous : un indice
+        # négatif y serait compté depuis la fin, sans erreur
+        for label, positions in (("du worker", [initial['worker']]),
+                                 ("de caisse", initial['boxes']),
+                                 ("de but", goals)):
+            outside = [pos for pos in positions if not 0 <= pos < C]
+            if outside:
+                raise ValueError(f"Position {label} hors de la grille : {outside[0]} "
+                                 f"(cases de 0 à {C - 1})")
+
+        # Grilles de variables (cf. var) : W[t, c], B[t, c], A[t, action]
+        # avec les actions dans l'ordre (mr, ml, pr, pl)
+        W = 1 + np.arange((T + 1) * C).reshape(T + 1, C)
+        B = W + (T + 1) * C
+        A = 2 * (T + 1) * C + 1 + np.arange(T * 4).reshape(T, 4)
         nb_vars = 2 * (T + 1) * C + T * 4
         
-        # État initial
-        clauses.append([self.var('w', initial['worker'], 0, T, C)])
-        for b in initial['boxes']:
-            clauses.append([self.var('b', b, 0, T, C)])
-        for c in range(C):
-            if c not in initial['boxes']:
-                clauses.append([-self.var('b', c, 0, T, C)])
+        # État initial et but (clauses unitaires). Seules ces clauses
+        # dépendent des listes reçues : une caisse ou un but répété y
+        # donnerait un doublon, retiré par np.unique. Les autres familles
+        # sont indexées par (temps, case) distincts et n'en contiennent pas
+        is_box = np.zeros(C, dtype=bool)
+        is_box[initial['boxes']] = True
+        units = np.unique(np.concatenate([
+            [W[0, initial['worker']]],
+            B[0, initial['boxes']],
+            -B[0, ~is_box],
+            B[T, goals],
+        ]))
+        families = [units.reshape(-1, 1)]
         
-        # But
-        for g in goals:
-            clauses.append([self.var('b', g, T, T, C)])
+        # Worker : exactement une case, action : exactement une par temps
+        # (les variables auxiliaires de l'échelle suivent les actions)
+        families.append(W)
+        amo, nb_aux = at_most_one(W, nb_vars + 1)
+        families.append(amo)
+        nb_vars += nb_aux
         
-        # Worker : exactement une case
-        for t in range(T + 1):
-            clauses.append([self.var('w', c, t, T, C) for c in range(C)])
-            for c1 in range(C):
-                for c2 in range(c1 + 1, C):
-                    clauses.append([-self.var('w', c1, t, T, C), -self.var('w', c2, t, T, C)])
+        families.append(A)
+        amo, nb_aux = at_most_one(A, nb_vars + 1)
+        families.append(amo)
+        nb_vars += nb_aux
         
-        # Action : exactement une par temps
-        for t in range(T):
-            clauses.append([self.var(a, 0, t, T, C) for a in ['mr', 'ml', 'pr', 'pl']])
-            for a1, a2 in combinations(['mr', 'ml', 'pr', 'pl'], 2):
-                clauses.append([-self.var(a1, 0, t, T, C), -self.var(a2, 0, t, T, C)])
+        # Transitions : w[t, c] pour t < T, colonnes d'action (T, 1)
+        w = W[:-1]
+        mr, ml, pr, pl = (A[:, i:i + 1] for i in range(4))
         
-        # Transitions
-        for t in range(T):
-            for c in range(C):  # TOUTES les positions sont valides (0 à 10)
-                w = self.var('w', c, t, T, C)
-                
-                # Interdire les actions impossibles aux bords
-                pr = self.var('pr', 0, t, T, C)
-                pl = self.var('pl', 0, t, T, C)
-                
-                # Si worker en position où push_right est impossible, interdire push_right
-                if c + 2 >= C:
-                    clauses.append([-w, -pr])  # worker_c ∧ push_right est IMPOSSIBLE
-                
-                # Si worker en position où push_left est impossible, interdire push_left
-                if c - 2 < 0:
-                    clauses.append([-w, -pl])  # worker_c ∧ push_left est IMPOSSIBLE
-                
-                # MOVE RIGHT
-                if c + 1 < C:
-                    mr = self.var('mr', 0, t, T, C)
-                    b_next = self.var('b', c + 1, t, T, C)
-                    w_next = self.var('w', c + 1, t + 1, T, C)
-                    
-                    clauses.append([-w, -mr, -b_next])  # Précondition
-                    clauses.append([-w, -mr, w_next])    # Effet sur worker
-                    
-                    # Les boxes ne changent PAS
-                    for bc in range(C):
-                        b_t = self.var('b', bc, t, T, C)
-                        b_t1 = self.var('b', bc, t + 1, T, C)
-                        clauses.append([-w, -mr, -b_t, b_t1])
-                        clauses.append([-w, -mr, b_t, -b_t1])
-                
-                # MOVE LEFT
-                if c - 1 >= 0:
-                    ml = self.var('ml', 0, t, T, C)
-                    b_prev = self.var('b', c - 1, t, T, C)
-                    w_prev = self.var('w', c - 1, t + 1, T, C)
-                    
-                    clauses.append([-w, -ml, -b_prev])
-                    clauses.append([-w, -ml, w_prev])
-                    
-                    for bc in range(C):
-                        b_t = self.var('b', bc, t, T, C)
-                        b_t1 = self.var('b', bc, t + 1, T, C)
-                        clauses.append([-w, -ml, -b_t, b_t1])
-                        clauses.append([-w, -ml, b_t, -b_t1])
-                
-                # PUSH RIGHT
-                if c + 2 < C:
-                    pr = self.var('pr', 0, t, T, C)
-                    b_c1_t = self.var('b', c + 1, t, T, C)
-                    b_c2_t = self.var('b', c + 2, t, T, C)
-                    w_c1_t1 = self.var('w', c + 1, t + 1, T, C)
-                    b_c1_t1 = self.var('b', c + 1, t + 1, T, C)
-                    b_c2_t1 = self.var('b', c + 2, t + 1, T, C)
-                    
-                    # Préconditions
-                    clauses.append([-w, -pr, b_c1_t])
-                    clauses.append([-w, -pr, -b_c2_t])
-                    
-                    # Effets
-                    clauses.append([-w, -pr, w_c1_t1])
-                    clauses.append([-w, -pr, -b_c1_t1])
-                    clauses.append([-w, -pr, b_c2_t1])
-                    
-                    # Autres boxes ne changent pas
-                    for bc in range(C):
-                        if bc != c + 1 and bc != c + 2:
-                            b_t = self.var('b', bc, t, T, C)
-                            b_t1 = self.var('b', bc, t + 1, T, C)
-                            clauses.append([-w, -pr, -b_t, b_t1])
-                            clauses.append([-w, -pr, b_t, -b_t1])
-                
-                # PUSH LEFT
-                if c - 2 >= 0:
-                    pl = self.var('pl', 0, t, T, C)
-                    b_cm1_t = self.var('b', c - 1, t, T, C)
-                    b_cm2_t = self.var('b', c - 2, t, T, C)
-                    w_cm1_t1 = self.var('w', c - 1, t + 1, T, C)
-                    b_cm1_t1 = self.var('b', c - 1, t + 1, T, C)
-                    b_cm2_t1 = self.var('b', c - 2, t + 1, T, C)
-                    
-                    clauses.append([-w, -pl, b_cm1_t])
-                    clauses.append([-w, -pl, -b_cm2_t])
-                    clauses.append([-w, -pl, w_cm1_t1])
-                    clauses.append([-w, -pl, -b_cm1_t1])
-                    clauses.append([-w, -pl, b_cm2_t1])
-                    
-                    for bc in range(C):
-                        if bc != c - 1 and bc != c - 2:
-                            b_t = self.var('b', bc, t, T, C)
-                            b_t1 = self.var('b', bc, t + 1, T, C)
-                            clauses.append([-w, -pl, -b_t, b_t1])
-                            clauses.append([-w, -pl, b_t, -b_t1])
+        binary = [
+            # Interdire les poussées impossibles aux bords
+            clause_rows(-w[:, max(C - 2, 0):], -pr),
+            clause_rows(-w[:, :2], -pl),
+        ]
+        ternary = [
+            # MOVE RIGHT : précondition, effet sur worker
+            clause_rows(-w[:, :-1], -mr, -B[:-1, 1:]),
+            clause_rows(-w[:, :-1], -mr, W[1:, 1:]),
+            # MOVE LEFT
+            clause_rows(-w[:, 1:], -ml, -B[:-1, :-1]),
+            clause_rows(-w[:, 1:], -ml, W[1:, :-1]),
+            # PUSH RIGHT : préconditions, effets
+            clause_rows(-w[:, :-2], -pr, B[:-1, 1:-1]),
+            clause_rows(-w[:, :-2], -pr, -B[:-1, 2:]),
+            clause_rows(-w[:, :-2], -pr, W[1:, 1:-1]),
+            clause_rows(-w[:, :-2], -pr, -B[1:, 1:-1]),
+            clause_rows(-w[:, :-2], -pr, B[1:, 2:]),
+            # PUSH LEFT
+            clause_rows(-w[:, 2:], -pl, B[:-1, 1:-1]),
+            clause_rows(-w[:, 2:], -pl, -B[:-1, :-2]),
+            clause_rows(-w[:, 2:], -pl, W[1:, 1:-1]),
+            clause_rows(-w[:, 2:], -pl, -B[1:, 1:-1]),
+            clause_rows(-w[:, 2:], -pl, B[1:, :-2]),
+        ]
+        
+        # Axiomes de cadre, une fois par (temps, action, case) : l'action
+        # étant unique, le littéral du worker est inutile pour les
+        # déplacements. Une poussée ne modifie que les deux cases devant
+        # le worker : le cadre d'une case bc est levé si le worker est
+        # juste derrière elle (bc-1 ou bc-2 pour pr, bc+1 ou bc+2 pour pl)
+        b_t, b_t1 = B[:-1], B[1:]
+        for a in (mr, ml):
+            ternary.append(clause_rows(-a, -b_t, b_t1))
+            ternary.append(clause_rows(-a, b_t, -b_t1))
+        # Cases 0 et C-1 : un seul côté pour le worker, aucun pour l'autre
+        ternary += [
+            clause_rows(-pr, -b_t[:, :1], b_t1[:, :1]),
+            clause_rows(-pr, b_t[:, :1], -b_t1[:, :1]),
+            clause_rows(-pl, -b_t[:, -1:], b_t1[:, -1:]),
+            clause_rows(-pl, b_t[:, -1:], -b_t1[:, -1:]),
+        ]
+        quaternary = [
+            clause_rows(-pr, -b_t[:, 1:2], b_t1[:, 1:2], w[:, :1]),
+            clause_rows(-pr, b_t[:, 1:2], -b_t1[:, 1:2], w[:, :1]),
+            clause_rows(-pl, -b_t[:, C - 2:C - 1], b_t1[:, C - 2:C - 1], w[:, C - 1:]),
+            clause_rows(-pl, b_t[:, C - 2:C - 1], -b_t1[:, C - 2:C - 1], w[:, C - 1:]),
+        ]
+        quinary = [
+            clause_rows(-pr, -b_t[:, 2:], b_t1[:, 2:], w[:, 1:-1], w[:, :-2]),
+            clause_rows(-pr, b_t[:, 2:], -b_t1[:, 2:], w[:, 1:-1], w[:, :-2]),
+            clause_rows(-pl, -b_t[:, :-2], b_t1[:, :-2], w[:, 1:-1], w[:, 2:]),
+            clause_rows(-pl, b_t[:, :-2], -b_t1[:, :-2], w[:, 1:-1], w[:, 2:]),
+        ]
+        
+        # Cassage de symétrie : un aller-retour (mr puis ml, ou ml puis mr)
+        # ne change pas l'état ; tout plan peut donc être réécrit avec ses
+        # allers-retours après la dernière poussée (la case que le worker
+        # vient de quitter est toujours libre pour les rejouer à la fin).
+        # push_after[t] est vrai s'il reste une poussée à partir de t
+        # (les caisses étant indiscernables, il n'y a pas de symétrie entre elles)
+        push_after = nb_vars + 1 + np.arange(T).reshape(T, 1)
+        nb_vars += T
+        binary += [
+            clause_rows(-pr, push_after),
+            clause_rows(-pl, push_after),
+            clause_rows(-push_after[1:], push_after[:-1]),
+        ]
+        ternary += [
+            clause_rows(-mr[:-2], -ml[1:-1], -push_after[2:]),
+            clause_rows(-ml[:-2], -mr[1:-1], -push_after[2:]),
+        ]
         
-        # Génération CNF
-        lines = [f"c Sokoban SAT", f"p cnf {nb_vars} {len(clauses)}"]
-        for clause in clauses:
-            lines.append(" ".join(map(str, clause)) + " 0")
+        for family in (binary, ternary, quaternary, quinary):
+            families.append(np.concatenate(family))
         
-        return "\n".join(lines), nb_vars, len(clauses)
+        return nb_vars, families
+    
+    def iter_cnf_chunks(self, initial: Dict, goals: List[int], T: int, C: int) -> Tuple[int, int, Iterator[bytes]]:
+        """
+        Génère le CNF DIMACS par morceaux de bytes
+
+        Les tableaux de clauses sont construits d'abord (leurs tailles donnent
+        la ligne "p cnf"), la sérialisation est ensuite faite à la demande.
+        Avec un executor et un grand CNF, les lots sont tous soumis d'un coup
+        et rendus dans l'ordre au fur et à mesure qu'ils sont prêts
+
+        Returns:
+            (nb_variables, nb_clauses, itérateur des morceaux)
+        """
+        nb_vars, families = self.clause_families(initial, goals, T, C)
+        nb_clauses = sum(len(family) for family in families)
+        
+        def chunks() -> Iterator[bytes]:
+            yield b"c Sokoban SAT\np cnf %d %d\n" % (nb_vars, nb_clauses)
+            if self.executor is None or T * C < PARALLEL_MIN_SIZE:
+                for batch in clause_batches(families):
+                    yield serialize_batch(batch)
+                return
+            futures = [self.executor.submit(serialize_batch, batch) for batch in clause_batches(families)]
+            try:
+                for future in futures:
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()  # Consommateur arrêté avant la fin
+        
+        return nb_vars, nb_clauses, chunks()
+    
+    def write_cnf(self, out: BinaryIO, initial: Dict, goals: List[int], T: int, C: int) -> Tuple[int, int]:
+        """
+        Écrit le CNF dans un flux binaire (fichier, BytesIO, stdin d'un processus)
+
+        Returns:
+            (nb_variables, nb_clauses)
+        """
+        nb_vars, nb_clauses, chunks = self.iter_cnf_chunks(initial, goals, T, C)
+        out.writelines(chunks)
+        return nb_vars, nb_clauses
+
+    def generate_cnf(self, initial: Dict, goals: List[int], T: int, C: int) -> Tuple[str, int, int]:
+        """
+        Génère le CNF complet en mémoire (cf. write_cnf)
+
+        Returns:
+            (cnf_content, nb_variables, nb_clauses)
+        """
+        buffer = io.BytesIO()
+        nb_vars, nb_clauses = self.write_cnf(buffer, initial, goals, T, C)
+        return buffer.getvalue().decode('ascii'), nb_vars, nb_clauses
     
     def solve(self, initial_state: Dict, goals: List[int], T: int = 15, num_cells: int = 11) -> Dict:
         """Résout le Sokoban"""
         try:
-            cnf, V, C_count = self.generate_cnf(initial_state, goals, T, num_cells)
+            V, C_count, chunks = self.iter_cnf_chunks(initial_state, goals, T, num_cells)
         except Exception as e:
             return {"error": str(e)}
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.cnf', delete=False, newline='\n', encoding='utf-8') as f:
-            f.write(cnf + '\n')
-            temp_path = f.name
-        
         try:
-            result = subprocess.run([self.gophersat_path, temp_path], capture_output=True, text=True, timeout=60)
-            
-            status = None
-            vars_list = []
+            # GopherSAT lit le CNF sur son stdin pendant sa sérialisation
+            result = self.backend.run_stream(chunks, timeout=60, text=False)
             
-            for line in result.stdout.strip().split('\n'):
-                if line.startswith('s '):
-                    status = line[2:].strip()
-                elif line.startswith('v '):
-                    vars_list.extend(line[2:].strip().split())
+            # Parser la sortie (une seule passe regex sur les bytes)
+            parsed = parse_output(result.stdout)
+            status = parsed["status"]
+            model = parsed["model"]
             
             if status == "SATISFIABLE":
-                plan = []
-                action_map = {0: 'move_right', 1: 'move_left', 2: 'push_right', 3: 'push_left'}
+                action_map = ('move_right', 'move_left', 'push_right', 'push_left')
                 offset = 2 * (T + 1) * num_cells
                 
-                for var_str in vars_list:
-                    if var_str and var_str != '0':
-                        var_num = int(var_str)
-                        if var_num > offset:
-                            idx = var_num - offset - 1
-                            time = idx // 4
-                            action_idx = idx % 4
-                            if time < T:
-                                plan.append((time, action_map[action_idx]))
-                
-                plan.sort()
+                # Variables d'action uniquement (les auxiliaires viennent après) ;
+                # idx = 4 * temps + action. GopherSAT rend le modèle par numéro
+                # de variable croissant : le plan est déjà dans l'ordre du temps
+                idx = model[(model > offset) & (model <= offset + 4 * T)] - (offset + 1)
+                plan = [(time, action_map[action])
+                        for time, action in zip((idx >> 2).tolist(), (idx & 3).tolist())]
                 
                 return {
                     "satisfiable": True,
@@ -209,7 +286,4 @@ class SokobanSAT:
                     "stats": {"nb_variables": V, "nb_clauses": C_count, "horizon": T, "num_cells": num_cells}
                 }
         except Exception as e:
-            return {"error": str(e)}
-        finally:
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
\ No newline at end of file
+            return {"error": str(e)}
\ No newline at end of file
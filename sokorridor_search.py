@@ -1,28 +1,309 @@
 """
-Sokorridor Solver - Recherche non informée (BFS, IDDFS)
+Sokorridor Solver - Recherche non informée (BFS, IDDFS, BFS bidirectionnel)
+et informée (A*)
 Séance 3 - Exemple 2
+
+Pendant la recherche, un état est un entier : position du worker dans les
+WORKER_BITS bits de poids faible, masque des caisses (bit p pour la case p)
+au-dessus. SokorridorState ne sert qu'à l'affichage de la solution
 """
-from typing import List, Tuple, Optional, Set
+from typing import List, Tuple, Optional, Set, Union
+from array import array
 from collections import deque
+from functools import lru_cache
+import heapq
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # Numba optionnel : recherches en Python pur
+    njit = None
+
+# Bits réservés à la position du worker dans la clé d'un état
+WORKER_BITS = 8
+WORKER_MASK = (1 << WORKER_BITS) - 1
+
+# Table de transitions mémoïsée : un couloir de 11 cases a au plus
+# 11 * 2^11 états, la table reste partagée entre recherches (et itérations d'IDDFS)
+SUCCESSORS_CACHE_SIZE = 1 << 16
+
+# Codes des actions dans les piles de la DFS (array d'octets)
+ACTIONS = ('move_right', 'push_right', 'move_left', 'push_left')
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+
+# Au-delà, une clé ne tient plus dans un entier non signé 64 bits (array 'Q')
+MAX_ARRAY_CELLS = 64 - WORKER_BITS
+
+# Les noyaux Numba indexent num_cells * 2^num_cells états (tableaux denses)
+MAX_KERNEL_CELLS = 16
+
+# État pas encore atteint (tableau des parents des noyaux)
+UNSEEN = -1
+
+
+def encode(worker: int, boxes_mask: int) -> int:
+    """Clé entière d'un état (worker, masque des caisses)"""
+    return worker | (boxes_mask << WORKER_BITS)
+
+
+def boxes_mask(boxes: List[int]) -> int:
+    """Masque de bits d'un ensemble de cases"""
+    mask = 0
+    for b in boxes:
+        mask |= 1 << b
+    return mask
+
+
+@lru_cache(maxsize=SUCCESSORS_CACHE_SIZE)
+def successors(key: int, num_cells: int) -> Tuple[Tuple[int, str], ...]:
+    """
+    Successeurs d'une clé avec l'action effectuée (tuple mémoïsé)
+    Ordre: droite puis gauche (comme demandé dans le PDF)
+    """
+    worker = key & WORKER_MASK
+    mask = key >> WORKER_BITS
+    succs = []
+    
+    # MOVE RIGHT / PUSH RIGHT
+    right = worker + 1
+    if right < num_cells:
+        if not (mask >> right) & 1:
+            succs.append((encode(right, mask), 'move_right'))
+        elif right + 1 < num_cells and not (mask >> (right + 1)) & 1:
+            succs.append((encode(right, mask ^ (3 << right)), 'push_right'))
+    
+    # MOVE LEFT / PUSH LEFT
+    left = worker - 1
+    if left >= 0:
+        if not (mask >> left) & 1:
+            succs.append((encode(left, mask), 'move_left'))
+        elif left - 1 >= 0 and not (mask >> (left - 1)) & 1:
+            succs.append((encode(left, mask ^ (3 << (left - 1))), 'push_left'))
+    
+    return tuple(succs)
+
+
+# ----------------------------------------------------------------------------
+# Noyaux BFS/DFS compilés par Numba. Un état y est un indice dense
+# masque * num_cells + worker (tableaux de parents au lieu de dictionnaires) ;
+# ils retournent (indices des états du chemin, codes d'action,
+# [explorés, générés, frontière max]) et reproduisent exactement l'ordre et
+# les stats des versions Python
+# ----------------------------------------------------------------------------
+
+def _kernel_successors(worker, mask, num_cells, out_states, out_codes):
+    """Écrit dans out_states/out_codes les successeurs (ordre de successors)"""
+    n = 0
+    right = worker + 1
+    if right < num_cells:
+        if (mask >> right) & 1 == 0:
+            out_states[n] = mask * num_cells + right
+            out_codes[n] = 0  # move_right
+            n += 1
+        elif right + 1 < num_cells and (mask >> (right + 1)) & 1 == 0:
+            out_states[n] = (mask ^ (3 << right)) * num_cells + right
+            out_codes[n] = 1  # push_right
+            n += 1
+    left = worker - 1
+    if left >= 0:
+        if (mask >> left) & 1 == 0:
+            out_states[n] = mask * num_cells + left
+            out_codes[n] = 2  # move_left
+            n += 1
+        elif left >= 1 and (mask >> (left - 1)) & 1 == 0:
+            out_states[n] = (mask ^ (3 << (left - 1))) * num_cells + left
+            out_codes[n] = 3  # push_left
+            n += 1
+    return n
+
+
+def _kernel_path(parents, codes, start, goal):
+    """États (sans le départ) et codes d'action du chemin départ -> but"""
+    length = 0
+    cur = goal
+    while cur != start:
+        cur = parents[cur]
+        length += 1
+    states = np.empty(length, np.int64)
+    actions = np.empty(length, np.int8)
+    cur = goal
+    for i in range(length - 1, -1, -1):
+        states[i] = cur
+        actions[i] = codes[cur]
+        cur = parents[cur]
+    return states, actions
+
+
+def _bfs_kernel(start, goals_mask, num_cells):
+    size = num_cells << num_cells
+    stats = np.zeros(3, np.int64)
+    parents = np.full(size, UNSEEN, np.int64)  # Sert aussi d'ensemble exploré
+    codes = np.zeros(size, np.int8)
+    queue = np.empty(size, np.int64)  # Chaque état est enfilé au plus une fois
+    succ = np.empty(2, np.int64)
+    succ_codes = np.empty(2, np.int8)
+    parents[start] = start
+    queue[0] = start
+    head = 0
+    tail = 1
+
+    while head < tail:
+        stats[2] = max(stats[2], tail - head)
+        state = int(queue[head])
+        head += 1
+        stats[0] += 1
+
+        mask = state // num_cells
+        if mask == goals_mask:
+            states, actions = _kernel_path(parents, codes, start, state)
+            return states, actions, stats
+
+        for k in range(_kernel_successors(state - mask * num_cells, mask, num_cells, succ, succ_codes)):
+            nxt = succ[k]
+            if parents[nxt] == UNSEEN:
+                parents[nxt] = state
+                codes[nxt] = succ_codes[k]
+                queue[tail] = nxt
+                tail += 1
+                stats[1] += 1
+
+    return np.empty(0, np.int64), np.empty(0, np.int8), stats
+
+
+def _dfs_kernel(start, goals_mask, num_cells, max_depth):
+    size = num_cells << num_cells
+    stats = np.zeros(3, np.int64)
+    parents = np.full(size, UNSEEN, np.int64)
+    codes = np.zeros(size, np.int8)
+    # Pile (état, parent, code, profondeur) : au plus 2 empilements par état exploré
+    stack = np.empty((2 * size + 1, 4), np.int64)
+    succ = np.empty(2, np.int64)
+    succ_codes = np.empty(2, np.int8)
+    stack[0, 0] = start
+    stack[0, 1] = start
+    stack[0, 2] = 0
+    stack[0, 3] = 0
+    top = 1
+
+    while top > 0:
+        stats[2] = max(stats[2], top)
+        top -= 1
+        state = int(stack[top, 0])
+        if parents[state] != UNSEEN:
+            continue
+
+        parents[state] = stack[top, 1]
+        codes[state] = stack[top, 2]
+        depth = stack[top, 3]
+        stats[0] += 1
+
+        mask = state // num_cells
+        if mask == goals_mask:
+            states, actions = _kernel_path(parents, codes, start, state)
+            return states, actions, stats
+
+        if max_depth < 0 or depth < max_depth:
+            n = _kernel_successors(state - mask * num_cells, mask, num_cells, succ, succ_codes)
+            for k in range(n - 1, -1, -1):  # Ordre inverse pour respecter l'ordre
+                nxt = succ[k]
+                if parents[nxt] == UNSEEN:
+                    stack[top, 0] = nxt
+                    stack[top, 1] = state
+                    stack[top, 2] = succ_codes[k]
+                    stack[top, 3] = depth + 1
+                    top += 1
+                    stats[1] += 1
+
+    return np.empty(0, np.int64), np.empty(0, np.int8), stats
+
+
+if njit is not None:
+    _kernel_successors = njit(cache=True)(_kernel_successors)
+    _kernel_path = njit(cache=True)(_kernel_path)
+    _bfs_kernel = njit(cache=True)(_bfs_kernel)
+    _dfs_kernel = njit(cache=True)(_dfs_kernel)
+
+
+@lru_cache(maxsize=SUCCESSORS_CACHE_SIZE)
+def predecessors(key: int, num_cells: int) -> Tuple[Tuple[int, str], ...]:
+    """
+    Prédécesseurs d'une clé avec l'action (avant) qui y mène
+    Inverse de successors : une poussée se défait en tirant la caisse
+    """
+    worker = key & WORKER_MASK
+    mask = key >> WORKER_BITS
+    preds = []
+    
+    # Le worker venait de la gauche : move_right, ou push_right si la
+    # caisse est juste devant lui (elle était sur sa case actuelle)
+    left = worker - 1
+    if left >= 0 and not (mask >> left) & 1:
+        preds.append((encode(left, mask), 'move_right'))
+        if worker + 1 < num_cells and (mask >> (worker + 1)) & 1:
+            preds.append((encode(left, mask ^ (3 << worker)), 'push_right'))
+    
+    # Le worker venait de la droite : move_left ou push_left
+    right = worker + 1
+    if right < num_cells and not (mask >> right) & 1:
+        preds.append((encode(right, mask), 'move_left'))
+        if left >= 0 and (mask >> left) & 1:
+            preds.append((encode(right, mask ^ (3 << left)), 'push_left'))
+    
+    return tuple(preds)
+
+
+def mask_boxes(mask: int) -> Tuple[int, ...]:
+    """Cases (croissantes) d'un masque de bits"""
+    boxes = []
+    while mask:
+        low = mask & -mask
+        boxes.append(low.bit_length() - 1)
+        mask ^= low
+    return tuple(boxes)
 
 
 class SokorridorState:
-    """État du Sokorridor"""
+    """État du Sokorridor (caisses en masque de bits, cf. boxes_mask)"""
+    
+    __slots__ = ('worker', 'mask', 'num_cells')
     
     def __init__(self, worker: int, boxes: List[int], num_cells: int = 11):
         self.worker = worker
-        self.boxes = tuple(sorted(boxes))  # Tuple pour hachage
+        self.mask = boxes_mask(boxes)
         self.num_cells = num_cells
     
+    @property
+    def boxes(self) -> Tuple[int, ...]:
+        """Positions des caisses, triées (dérivées du masque)"""
+        return mask_boxes(self.mask)
+    
     def __eq__(self, other):
-        return self.worker == other.worker and self.boxes == other.boxes
+        return self.worker == other.worker and self.mask == other.mask
     
     def __hash__(self):
-        return hash((self.worker, self.boxes))
+        return hash((self.worker, self.mask))
     
     def __repr__(self):
         return f"State(w={self.worker}, b={list(self.boxes)})"
     
+    @property
+    def key(self) -> int:
+        """Clé entière de l'état (cf. encode)"""
+        return encode(self.worker, self.mask)
+    
+    @classmethod
+    def from_key(cls, key: int, num_cells: int = 11) -> 'SokorridorState':
+        """Reconstruit l'état d'une clé"""
+        state = cls.__new__(cls)
+        state.worker = key & WORKER_MASK
+        state.mask = key >> WORKER_BITS
+        state.num_cells = num_cells
+        return state
+    
+    def to_dict(self) -> dict:
+        """Représentation sérialisable (réponse de l'API)"""
+        return {"worker": self.worker, "boxes": list(self.boxes), "num_cells": self.num_cells}
+    
     def to_string(self) -> str:
         """Représentation visuelle"""
         chars = ['.'] * self.num_cells
@@ -40,110 +321,255 @@ class SokorridorState:
         Retourne les successeurs avec l'action effectuée
         Ordre: droite puis gauche (comme demandé dans le PDF)
         """
-        succs = []
-        
-        # MOVE RIGHT
-        if self.worker + 1 < self.num_cells and self.worker + 1 not in self.boxes:
-            new_state = SokorridorState(self.worker + 1, list(self.boxes), self.num_cells)
-            succs.append((new_state, 'move_right'))
-        
-        # PUSH RIGHT
-        if (self.worker + 1 < self.num_cells and 
-            self.worker + 1 in self.boxes and 
-            self.worker + 2 < self.num_cells and 
-            self.worker + 2 not in self.boxes):
-            new_boxes = list(self.boxes)
-            new_boxes.remove(self.worker + 1)
-            new_boxes.append(self.worker + 2)
-            new_state = SokorridorState(self.worker + 1, new_boxes, self.num_cells)
-            succs.append((new_state, 'push_right'))
-        
-        # MOVE LEFT
-        if self.worker - 1 >= 0 and self.worker - 1 not in self.boxes:
-            new_state = SokorridorState(self.worker - 1, list(self.boxes), self.num_cells)
-            succs.append((new_state, 'move_left'))
-        
-        # PUSH LEFT
-        if (self.worker - 1 >= 0 and 
-            self.worker - 1 in self.boxes and 
-            self.worker - 2 >= 0 and 
-            self.worker - 2 not in self.boxes):
-            new_boxes = list(self.boxes)
-            new_boxes.remove(self.worker - 1)
-            new_boxes.append(self.worker - 2)
-            new_state = SokorridorState(self.worker - 1, new_boxes, self.num_cells)
-            succs.append((new_state, 'push_left'))
-        
-        return succs
-    
-    def is_goal(self, goals: List[int]) -> bool:
-        """Vérifie si toutes les boxes sont sur les goals"""
-        return set(self.boxes) == set(goals)
+        return [(SokorridorState.from_key(key, self.num_cells), action)
+                for key, action in successors(self.key, self.num_cells)]
+    
+    def is_goal(self, goals: Union[List[int], int]) -> bool:
+        """
+        Vérifie si toutes les boxes sont sur les goals
+        goals : liste de cases, ou masque déjà calculé (cf. SokorridorSearchSolver.goals_mask)
+        """
+        if not isinstance(goals, int):
+            goals = boxes_mask(goals)
+        return self.mask == goals
 
 
 class SokorridorSearchSolver:
     """Résout Sokorridor avec recherche non informée"""
     
     def __init__(self, initial_state: SokorridorState, goals: List[int]):
+        if initial_state.num_cells > WORKER_MASK + 1:
+            raise ValueError(f"Couloir trop long: {initial_state.num_cells} cases (max {WORKER_MASK + 1})")
         self.initial = initial_state
         self.goals = goals
+        self.num_cells = initial_state.num_cells
+        self.initial_key = initial_state.key
+        self.goals_mask = boxes_mask(goals)
+        self.goal_positions = tuple(sorted(goals))
         self.stats = {
             'nodes_explored': 0,
             'nodes_generated': 0,
             'max_frontier_size': 0
         }
     
+    def _kernel_args(self) -> Optional[Tuple[int, int, int]]:
+        """
+        (indice dense de l'état initial, masque des goals, num_cells) pour les
+        noyaux Numba, ou None s'ils ne s'appliquent pas
+        """
+        if njit is None or self.num_cells > MAX_KERNEL_CELLS:
+            return None
+        mask = self.initial_key >> WORKER_BITS
+        worker = self.initial_key & WORKER_MASK
+        if mask >> self.num_cells or worker >= self.num_cells:
+            return None  # Caisse ou worker hors du couloir
+        # Goal hors du couloir : jamais atteint (-1 ne correspond à aucun masque)
+        goals_mask = -1 if self.goals_mask >> self.num_cells else self.goals_mask
+        return mask * self.num_cells + worker, goals_mask, self.num_cells
+    
     def bfs(self) -> Optional[List[Tuple[SokorridorState, str]]]:
         """Breadth-First Search"""
+        args = self._kernel_args()
+        if args is not None:
+            return self._from_kernel(*_bfs_kernel(*args))
+        
         self._reset_stats()
         
-        # Format: (état, chemin_complet)
-        frontier = deque([(self.initial, [])])
-        explored = {self.initial}
+        num_cells = self.num_cells
+        goals_mask = self.goals_mask
+        
+        # came_from[clé] = (clé parente, action) : sert aussi d'ensemble explored
+        frontier = deque([self.initial_key])
+        came_from = {self.initial_key: (None, None)}
         
         while frontier:
             self.stats['max_frontier_size'] = max(self.stats['max_frontier_size'], len(frontier))
             
-            state, path = frontier.popleft()
+            key = frontier.popleft()
             self.stats['nodes_explored'] += 1
             
-            if state.is_goal(self.goals):
-                return path
+            if key >> WORKER_BITS == goals_mask:
+                return self._reconstruct(came_from, key)
             
-            for succ_state, action in state.successors():
-                if succ_state not in explored:
-                    explored.add(succ_state)
-                    frontier.append((succ_state, path + [(succ_state, action)]))
+            for succ_key, action in successors(key, num_cells):
+                if succ_key not in came_from:
+                    came_from[succ_key] = (key, action)
+                    frontier.append(succ_key)
                     self.stats['nodes_generated'] += 1
         
         return None
     
-    def dfs(self, max_depth: Optional[int] = None) -> Optional[List[Tuple[SokorridorState, str]]]:
-        """Depth-First Search avec profondeur limitée"""
+    def heuristic(self, mask: int) -> int:
+        """
+        Somme des distances caisses -> goals pour la meilleure affectation
+        Sur une ligne, l'affectation optimale associe les caisses et les
+        goals dans l'ordre (triés) : pas besoin de la méthode hongroise.
+        Chaque poussée déplace une caisse d'une case : h est admissible et
+        consistante. Nombres de caisses et de goals différents : but
+        inatteignable, h = 0
+        """
+        boxes = mask_boxes(mask)
+        if len(boxes) != len(self.goal_positions):
+            return 0
+        return sum(abs(b - g) for b, g in zip(boxes, self.goal_positions))
+    
+    def astar(self) -> Optional[List[Tuple[SokorridorState, str]]]:
+        """
+        A* avec l'heuristique d'affectation (cf. heuristic)
+        Égalités sur f départagées en faveur du g le plus grand
+        """
         self._reset_stats()
+        num_cells = self.num_cells
+        goals_mask = self.goals_mask
+        
+        h_cache = {}  # h ne dépend que du masque des caisses
         
-        # Format: (état, chemin, profondeur)
-        frontier = [(self.initial, [], 0)]
-        explored = set()
+        def h(key: int) -> int:
+            mask = key >> WORKER_BITS
+            value = h_cache.get(mask)
+            if value is None:
+                value = h_cache[mask] = self.heuristic(mask)
+            return value
+        
+        start = self.initial_key
+        came_from = {start: (None, None)}
+        best_g = {start: 0}
+        frontier = [(h(start), 0, start)]  # (f, -g, clé)
+        closed = set()
         
         while frontier:
             self.stats['max_frontier_size'] = max(self.stats['max_frontier_size'], len(frontier))
             
-            state, path, depth = frontier.pop()  # LIFO
+            _, neg_g, key = heapq.heappop(frontier)
+            if key in closed:
+                continue  # Entrée obsolète
+            closed.add(key)
+            self.stats['nodes_explored'] += 1
+            
+            if key >> WORKER_BITS == goals_mask:
+                return self._reconstruct(came_from, key)
             
-            if state in explored:
+            g = 1 - neg_g
+            for succ_key, action in successors(key, num_cells):
+                if succ_key in closed or g >= best_g.get(succ_key, g + 1):
+                    continue
+                best_g[succ_key] = g
+                came_from[succ_key] = (key, action)
+                heapq.heappush(frontier, (g + h(succ_key), -g, succ_key))
+                self.stats['nodes_generated'] += 1
+        
+        return None
+    
+    def bibfs(self) -> Optional[List[Tuple[SokorridorState, str]]]:
+        """
+        BFS bidirectionnel : une recherche depuis l'état initial, une depuis
+        les états buts (caisses sur les goals, worker sur n'importe quelle
+        case libre) en suivant les transitions inverses (cf. predecessors)
+        
+        La frontière la plus petite est développée d'un niveau complet ; la
+        meilleure rencontre de ce niveau donne un plan de longueur minimale
+        """
+        self._reset_stats()
+        num_cells = self.num_cells
+        goals_mask = self.goals_mask
+        
+        if self.initial_key >> WORKER_BITS == goals_mask:
+            return []
+        
+        # fwd[clé] = (clé parente, action, profondeur)
+        # bwd[clé] = (clé suivante vers le but, action, profondeur)
+        fwd = {self.initial_key: (None, None, 0)}
+        bwd = {}
+        for worker in range(num_cells):
+            if not (goals_mask >> worker) & 1:
+                bwd[encode(worker, goals_mask)] = (None, None, 0)
+        forward_frontier = [self.initial_key]
+        backward_frontier = list(bwd)
+        
+        while forward_frontier and backward_frontier:
+            self.stats['max_frontier_size'] = max(self.stats['max_frontier_size'],
+                                                  len(forward_frontier) + len(backward_frontier))
+            
+            # Développer le côté le plus petit d'un niveau
+            forward = len(forward_frontier) <= len(backward_frontier)
+            if forward:
+                frontier, seen, other, expand = forward_frontier, fwd, bwd, successors
+            else:
+                frontier, seen, other, expand = backward_frontier, bwd, fwd, predecessors
+            
+            next_frontier = []
+            best = None  # (longueur, clé de rencontre)
+            for key in frontier:
+                self.stats['nodes_explored'] += 1
+                depth = seen[key][2] + 1
+                for next_key, action in expand(key, num_cells):
+                    if next_key in seen:
+                        continue
+                    seen[next_key] = (key, action, depth)
+                    next_frontier.append(next_key)
+                    self.stats['nodes_generated'] += 1
+                    if next_key in other:
+                        length = depth + other[next_key][2]
+                        if best is None or length < best[0]:
+                            best = (length, next_key)
+            
+            if best is not None:
+                return self._splice(fwd, bwd, best[1])
+            
+            if forward:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+        
+        return None
+    
+    def dfs(self, max_depth: Optional[int] = None) -> Optional[List[Tuple[SokorridorState, str]]]:
+        """Depth-First Search avec profondeur limitée"""
+        args = self._kernel_args()
+        if args is not None:
+            return self._from_kernel(*_dfs_kernel(*args, -1 if max_depth is None else max_depth))
+        
+        self._reset_stats()
+        
+        num_cells = self.num_cells
+        goals_mask = self.goals_mask
+        
+        # Frontière en piles parallèles (clé, clé parente, code d'action,
+        # profondeur) plutôt qu'en tuples. Un état peut être empilé
+        # plusieurs fois : son parent est fixé quand il est dépilé
+        # (clés de plus de 64 bits : listes Python, même interface)
+        key_type = 'Q' if num_cells <= MAX_ARRAY_CELLS else None
+        keys = array(key_type, [self.initial_key]) if key_type else [self.initial_key]
+        parents = array(key_type, [0]) if key_type else [0]
+        codes = array('B', [0])
+        depths = array('I', [0])
+        came_from = {}  # Sert aussi d'ensemble explored
+        
+        while keys:
+            self.stats['max_frontier_size'] = max(self.stats['max_frontier_size'], len(keys))
+            
+            # LIFO
+            key = keys.pop()
+            parent = parents.pop()
+            code = codes.pop()
+            depth = depths.pop()
+            
+            if key in came_from:
                 continue
             
-            explored.add(state)
+            came_from[key] = (parent, ACTIONS[code]) if depth else (None, None)
             self.stats['nodes_explored'] += 1
             
-            if state.is_goal(self.goals):
-                return path
+            if key >> WORKER_BITS == goals_mask:
+                return self._reconstruct(came_from, key)
             
             if max_depth is None or depth < max_depth:
-                for succ_state, action in reversed(state.successors()):  # Reversed pour ordre correct
-                    if succ_state not in explored:
-                        frontier.append((succ_state, path + [(succ_state, action)], depth + 1))
+                for succ_key, succ_action in reversed(successors(key, num_cells)):  # Reversed pour ordre correct
+                    if succ_key not in came_from:
+                        keys.append(succ_key)
+                        parents.append(key)
+                        codes.append(ACTION_CODES[succ_action])
+                        depths.append(depth + 1)
                         self.stats['nodes_generated'] += 1
         
         return None
@@ -162,6 +588,42 @@ class SokorridorSearchSolver:
         
         return None
     
+    def _from_kernel(self, states: np.ndarray, codes: np.ndarray,
+                     stats: np.ndarray) -> Optional[List[Tuple[SokorridorState, str]]]:
+        """Reprend le résultat d'un noyau Numba (chemin vide au départ = pas de solution)"""
+        self.stats = {
+            'nodes_explored': int(stats[0]),
+            'nodes_generated': int(stats[1]),
+            'max_frontier_size': int(stats[2])
+        }
+        if len(states) == 0 and self.initial_key >> WORKER_BITS != self.goals_mask:
+            return None
+        num_cells = self.num_cells
+        return [(SokorridorState.from_key(encode(state % num_cells, state // num_cells), num_cells), ACTIONS[code])
+                for state, code in zip(states.tolist(), codes.tolist())]
+    
+    def _reconstruct(self, came_from: dict, key: int) -> List[Tuple[SokorridorState, str]]:
+        """Remonte les parents depuis key et retourne le chemin en états (affichage, réponse de l'API)"""
+        path = []
+        parent, action = came_from[key]
+        while parent is not None:
+            path.append((SokorridorState.from_key(key, self.num_cells), action))
+            key = parent
+            parent, action = came_from[key]
+        path.reverse()
+        return path
+    
+    def _splice(self, fwd: dict, bwd: dict, meet: int) -> List[Tuple[SokorridorState, str]]:
+        """Chemin initial -> meet (parents avant) suivi de meet -> but (liens arrière)"""
+        path = self._reconstruct({key: entry[:2] for key, entry in fwd.items()}, meet)
+        key = meet
+        next_key, action, _ = bwd[key]
+        while next_key is not None:
+            path.append((SokorridorState.from_key(next_key, self.num_cells), action))
+            key = next_key
+            next_key, action, _ = bwd[key]
+        return path
+    
     def _reset_stats(self):
         """Réinitialise les statistiques"""
         self.stats = {
@@ -171,6 +633,20 @@ class SokorridorSearchSolver:
         }
 
 
+def solve_sokorridor(worker: int, boxes: List[int], goals: List[int], algorithm: str,
+                     num_cells: int = 11) -> Tuple[Optional[List[Tuple[SokorridorState, str]]], dict]:
+    """
+    Résout un Sokorridor avec bfs, iddfs, bibfs ou astar
+    Fonction de module pour pouvoir être exécutée dans un ProcessPoolExecutor
+
+    Returns:
+        (solution ou None, stats)
+    """
+    solver = SokorridorSearchSolver(SokorridorState(worker, boxes, num_cells=num_cells), goals)
+    solution = getattr(solver, algorithm)()
+    return solution, solver.stats
+
+
 def print_solution(solution: Optional[List[Tuple[SokorridorState, str]]], initial: SokorridorState):
     """Affiche la solution trouvée"""
     if solution is None:
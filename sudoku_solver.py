@@ -1,23 +1,181 @@
 """
 Module pour résoudre le Sudoku avec SAT
 """
-import tempfile
 import subprocess
-import os
 import io
 import base64
-from typing import List, Dict, Optional
-import matplotlib
-matplotlib.use('Agg')  # Backend sans interface graphique
-import matplotlib.pyplot as plt
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
 import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from cardinality import at_most_one
+from gophersat_backend import SolverBackend, SubprocessBackend, parse_output
+from fast_sudoku import UNIT_INDEX, solve_by_propagation
 
 
+# Gabarit d'une ligne DIMACS par nombre de littéraux (0..9)
+DIMACS_LINES = tuple(b"%d " * width + b"0\n" for width in range(10))
+
+
+def dimacs_block(lits: np.ndarray, mask: Optional[np.ndarray] = None) -> bytes:
+    """
+    Sérialise un tableau de clauses (une par ligne) en lignes DIMACS
+
+    Les littéraux où mask est faux sont retirés (clauses de largeurs
+    variables) : les gabarits DIMACS_LINES de chaque ligne sont mis bout à
+    bout puis remplis par un seul formatage % sur les bytes. Chaque ligne
+    doit garder au moins un littéral (une clause vide s'écrirait "0")
+    """
+    if mask is None:
+        return (DIMACS_LINES[lits.shape[1]] * len(lits)) % tuple(lits.ravel().tolist())
+    template = b"".join([DIMACS_LINES[width] for width in mask.sum(axis=1).tolist()])
+    return template % tuple(lits[mask].tolist())
+
+
+def join_lines(lines: np.ndarray, mask: np.ndarray) -> bytes:
+    """Assemble les lignes DIMACS préformées (tableau de bytes) sélectionnées par mask"""
+    return b"".join(lines[mask].tolist())
+
+
+# Grille 9x9 : listes (entrée de l'API) ou tableau NumPy (usage interne)
+Grid = Union[List[List[int]], np.ndarray]
+
+# Tables indépendantes de la grille, calculées une seule fois à l'import
+# (indices de variable - 1, cf. encode_variable) :
+# - UNIT_SLOTS[unité * 9 + v - 1] : les 9 variables du chiffre v dans l'unité
+#   (unités 0-8 lignes, 9-17 colonnes, 18-26 sous-grilles : l'appartenance
+#   des cases aux sous-grilles vient de UNIT_INDEX, aucune boucle par boîte)
+# - CELL_PAIRS / UNIT_PAIRS : clauses "au plus un" par paires, toutes
+#   préformées, dont la grille ne fait que sélectionner des lignes
+PAIR_I, PAIR_J = np.triu_indices(9, 1)
+CELL_VARS = 1 + np.arange(9 ** 3).reshape(81, 9)
+UNIT_SLOTS = (UNIT_INDEX[:, None, :] * 9 + np.arange(9)[None, :, None]).reshape(-1, 9)
+UNIT_VARS = UNIT_SLOTS + 1
+CELL_PAIRS = np.stack([-CELL_VARS[:, PAIR_I], -CELL_VARS[:, PAIR_J]], axis=-1)
+UNIT_PAIRS = np.stack([-UNIT_VARS[:, PAIR_I], -UNIT_VARS[:, PAIR_J]], axis=-1)
+
+# Lignes DIMACS déjà sérialisées des clauses les plus nombreuses, qui ne
+# dépendent pas de la grille (le CNF n'en garde qu'une sélection) :
+# - UNIT_LINES[variable - 1] : clause unitaire d'une case pré-remplie
+# - CELL_PAIR_LINES[case, paire] : ligne de CELL_PAIRS[case, paire]
+UNIT_LINES = np.array([DIMACS_LINES[1] % var for var in range(1, 9 ** 3 + 1)], dtype=object)
+CELL_PAIR_LINES = np.array(
+    [DIMACS_LINES[2] % pair for pair in map(tuple, CELL_PAIRS.reshape(-1, 2).tolist())],
+    dtype=object
+).reshape(81, 36)
+
+# Commentaires d'en-tête constants
+HEADER_COMMENTS = "\n".join([
+    "c Sudoku SAT encoding",
+    "c",
+    "c Variable encoding: x_{r,c,v} = (r-1)*81 + (c-1)*9 + v",
+    "c   where r,c,v in {1..9}",
+    "c   x_{r,c,v} = true means cell (r,c) contains value v",
+    "c   (only candidate values of empty cells are constrained)",
+])
+
+
+# Rendu de la visualisation (mêmes couleurs que l'ancien tracé), en indices de palette
+_CELL_SIZE = 56
+_PALETTE = [
+    255, 255, 255,  # 0 fond
+    0, 0, 0,        # 1 traits, cases initiales
+    173, 216, 230,  # 2 fond des cases initiales (lightblue)
+    0, 0, 255,      # 3 cases calculées (blue)
+    245, 222, 179,  # 4 légende (wheat)
+]
+_MARGIN, _TITLE_HEIGHT, _LEGEND_HEIGHT = 30, 50, 70
+_PANEL_SIZE = 9 * _CELL_SIZE + 1
+_PANEL_TOP = _TITLE_HEIGHT
+_PANEL_LEFTS = (_MARGIN, 2 * _MARGIN + _PANEL_SIZE)
+
+
+# Polices essayées dans l'ordre (Linux, puis Windows), sinon police par
+# défaut de Pillow (sans accents ni gras)
+_FONTS = ("DejaVuSans.ttf", "arial.ttf")
+_BOLD_FONTS = ("DejaVuSans-Bold.ttf", "arialbd.ttf")
+
+
+def _load_font(names: tuple, size: int) -> ImageFont.FreeTypeFont:
+    """Première police TrueType disponible parmi names"""
+    for name in names:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size=size)
+
+
+def _build_plot_tables() -> tuple:
+    """
+    Précalcule le rendu : tuiles des cases, traits de la grille et image de
+    fond (titres, légende), le tout en indices de palette
+
+    Returns:
+        (tuiles (28, C, C) : 0 vide, 1-9 calculée, 10-18 initiale,
+         19-27 initiale sur fond bleu ; masque des traits d'un panneau ; fond)
+    """
+    size = _CELL_SIZE
+    digit_font = _load_font(_FONTS, 30)
+    given_font = _load_font(_BOLD_FONTS, 30)
+    title_font = _load_font(_BOLD_FONTS, 26)
+    legend_font = _load_font(_FONTS, 16)
+    
+    def glyph(text: str, font) -> np.ndarray:
+        image = Image.new('L', (size, size), 0)
+        ImageDraw.Draw(image).text((size / 2, size / 2), text, fill=255, font=font, anchor='mm')
+        return np.asarray(image) >= 128
+    
+    tiles = np.zeros((28, size, size), dtype=np.uint8)
+    for digit in range(1, 10):
+        solved = glyph(str(digit), digit_font)
+        given = glyph(str(digit), given_font)
+        tiles[digit][solved] = 3
+        tiles[9 + digit][given] = 1
+        tiles[18 + digit] = 2
+        tiles[18 + digit][given] = 1
+    
+    # Traits : fins (1 px), épais (3 px) autour des sous-grilles
+    lines = np.zeros((_PANEL_SIZE, _PANEL_SIZE), dtype=bool)
+    for i in range(10):
+        width = 1 if i % 3 == 0 else 0
+        start, stop = max(i * size - width, 0), min(i * size + width + 1, _PANEL_SIZE)
+        lines[start:stop, :] = True
+        lines[:, start:stop] = True
+    
+    width = 3 * _MARGIN + 2 * _PANEL_SIZE
+    height = _TITLE_HEIGHT + _PANEL_SIZE + _LEGEND_HEIGHT + _MARGIN
+    background = Image.new('P', (width, height), 0)
+    draw = ImageDraw.Draw(background)
+    for left, title in zip(_PANEL_LEFTS, ("Grille Initiale", "Grille Résolue")):
+        draw.text((left + _PANEL_SIZE / 2, _TITLE_HEIGHT / 2), title, fill=1, font=title_font, anchor='mm')
+    legend_top = _PANEL_TOP + _PANEL_SIZE + 15
+    draw.rounded_rectangle((width / 2 - 160, legend_top, width / 2 + 160, legend_top + 50),
+                           radius=8, fill=4)
+    draw.multiline_text((width / 2, legend_top + 25),
+                        "Noir/Fond bleu: Cases initiales\nBleu: Cases calculées",
+                        fill=1, font=legend_font, anchor='mm', align='center')
+    return tiles, lines, np.asarray(background)
+
+
+_TILES, _GRID_LINES, _BACKGROUND = _build_plot_tables()
+
 class SudokuSAT:
     """Résout le Sudoku en utilisant un solveur SAT"""
     
-    def __init__(self, gophersat_path: str):
+    def __init__(self, gophersat_path: str, backend: Optional[SolverBackend] = None,
+                 drop_redundant_alo: bool = True):
+        """
+        drop_redundant_alo : omettre les clauses "au moins un chiffre" des
+        cases (contrainte 1). Elles sont redondantes : dans une ligne, les k
+        chiffres non placés occupent chacun une case vide distincte (au moins
+        un + au plus un par unité et par case), et la ligne n'a que k cases
+        vides. Le CNF est plus petit ; ces clauses aident parfois la
+        propagation du solveur (temps de résolution inchangés mesurés avec
+        Glucose), d'où l'option pour les rétablir
+        """
         self.gophersat_path = gophersat_path
+        self.backend = backend or SubprocessBackend(gophersat_path)
+        self.drop_redundant_alo = drop_redundant_alo
         self.size = 9  # Taille standard du Sudoku 9x9
         self.box_size = 3  # Taille des sous-grilles 3x3
         
@@ -39,12 +197,42 @@ class SudokuSAT:
         value = (var_num % self.size) + 1
         return row, col, value
     
-    def generate_cnf(self, grid: List[List[int]]) -> tuple:
+    def compute_candidates(self, grid: Grid) -> np.ndarray:
         """
-        Génère le fichier CNF pour le Sudoku
+        Candidats de chaque case : les valeurs absentes des cases pré-remplies
+        de sa ligne, de sa colonne et de sa sous-grille
+
+        Returns:
+            Tableau booléen (9, 9, 9) : cand[r, c, v - 1] (0-indexé),
+            entièrement faux pour une case pré-remplie
+        """
+        n, b = self.size, self.box_size
+        cells = np.asarray(grid).reshape(n, n)
+        given = cells[:, :, None] == np.arange(1, n + 1)  # one-hot [ligne, colonne, chiffre]
+        in_row = given.any(axis=1)[:, None, :]
+        in_col = given.any(axis=0)[None, :, :]
+        in_box = given.reshape(b, b, b, b, n).any(axis=(1, 3)).repeat(b, axis=0).repeat(b, axis=1)
+        return (cells == 0)[:, :, None] & ~in_row & ~in_col & ~in_box
+    
+    def iter_cnf_chunks(self, grid: Grid) -> Tuple[int, int, Iterator[bytes]]:
+        """
+        Génère le fichier CNF pour le Sudoku, par morceaux de bytes
+
+        Encodage par candidats : les cases pré-remplies ne reçoivent que leur
+        clause unitaire, et les contraintes des cases vides ne portent que
+        sur leurs candidats (cf. compute_candidates). Un chiffre déjà donné
+        dans une unité n'y est plus contraint. Les variables hors candidats
+        n'apparaissent dans aucune clause et sont ignorées au décodage
+
+        Les clauses sont construites par blocs NumPy, par sélection dans les
+        tables précalculées à l'import (CELL_VARS, UNIT_SLOTS, CELL_PAIRS...) ;
+        les clauses unitaires et les paires des cases sont même choisies
+        parmi des lignes déjà sérialisées (UNIT_LINES, CELL_PAIR_LINES).
+        Chaque bloc est sérialisé à la demande, sans assembler le CNF complet
         
         Contraintes:
-        1. Chaque cellule contient au moins un chiffre (1-9)
+        1. Chaque cellule contient au moins un chiffre (1-9), redondante
+           avec 2 à 5 : omise si drop_redundant_alo
         2. Chaque cellule contient au plus un chiffre
         3. Chaque ligne contient chaque chiffre exactement une fois
         4. Chaque colonne contient chaque chiffre exactement une fois
@@ -55,313 +243,355 @@ class SudokuSAT:
             grid: Grille 9x9 avec 0 pour les cases vides, 1-9 pour les cases remplies
             
         Returns:
-            (cnf_content, nb_variables, nb_clauses)
+            (nb_variables, nb_clauses, itérateur des morceaux)
         """
-        clauses = []
+        n = self.size
+        
+        # Variables x_{r,c,v}: 9 * 9 * 9 = 729 (puis les auxiliaires des échelles)
+        nb_variables = n * n * n
+        
+        # Sélection dans les tables précalculées (CELL_VARS, UNIT_SLOTS...)
+        cells = np.asarray(grid).reshape(n * n)
+        given = cells[:, None] == np.arange(1, n + 1)
+        cand = self.compute_candidates(grid).reshape(n * n, n)
+        empty = cells == 0
         
-        # Nombre total de variables: 9 * 9 * 9 = 729
-        nb_variables = self.size * self.size * self.size
+        # Unités : lignes (unité, chiffre) sur les 9 cases de l'unité
+        unit_cand = cand.reshape(-1)[UNIT_SLOTS]
+        unit_given = given.reshape(-1)[UNIT_SLOTS]
+        placed = unit_given.any(axis=1)
+        
+        # Au moins un : case vide sur ses candidats (contrainte 1, sauf
+        # drop_redundant_alo), chiffre non placé d'une unité sur les cases
+        # où il est candidat
+        cell_alo = np.zeros_like(empty) if self.drop_redundant_alo else empty
+        alo_vars = np.vstack([CELL_VARS[cell_alo], UNIT_VARS[~placed]])
+        alo_mask = np.vstack([cand[cell_alo], unit_cand[~placed]])
+        # Sans candidat, la clause serait vide : contradiction x et non x
+        possible = alo_mask.any(axis=1)
+        impossible = alo_vars[~possible, :1]
+        alo_vars, alo_mask = alo_vars[possible], alo_mask[possible]
+        
+        # Au plus un : paires de candidats d'une case (lignes préformées),
+        # et doublons parmi les cases données d'une unité (grille invalide)
+        cell_pairs = cand[:, PAIR_I] & cand[:, PAIR_J]
+        unit_amo = [UNIT_PAIRS[unit_given[:, PAIR_I] & unit_given[:, PAIR_J]]]
+        
+        # Au plus un par unité sur les cases où le chiffre est candidat (un
+        # chiffre placé n'y est plus candidat) : les groupes sont compactés
+        # par nombre de candidats, en échelle à partir de 6 (cf. at_most_one)
+        # avec des variables auxiliaires après les 729 variables x_{r,c,v}
+        group_sizes = unit_cand.sum(axis=1)
+        for k in np.unique(group_sizes[group_sizes > 1]).tolist():
+            rows = group_sizes == k
+            amo, nb_aux = at_most_one(UNIT_VARS[rows][unit_cand[rows]].reshape(-1, k), nb_variables + 1)
+            unit_amo.append(amo)
+            nb_variables += nb_aux
+        pairs = np.vstack(unit_amo)
+        
+        # Contrainte 6 (clauses unitaires), 1 et 3 à 5 (au moins un), 2 à 5 (au plus un) :
+        # sélection de lignes préformées (join_lines) ou sérialisation (dimacs_block)
+        units = given.reshape(-1)
+        blocks = [
+            (join_lines, UNIT_LINES, units),
+            (dimacs_block, np.vstack([impossible, -impossible]), None),
+            (dimacs_block, alo_vars, alo_mask),
+            (join_lines, CELL_PAIR_LINES, cell_pairs),
+            (dimacs_block, pairs, None),
+        ]
+        nb_clauses = (int(np.count_nonzero(units)) + 2 * len(impossible) + len(alo_vars)
+                      + int(np.count_nonzero(cell_pairs)) + len(pairs))
         
         # En-têtes avec commentaires
-        cnf_lines = []
-        cnf_lines.append("c Sudoku SAT encoding")
-        cnf_lines.append("c")
-        cnf_lines.append("c Variable encoding: x_{r,c,v} = (r-1)*81 + (c-1)*9 + v")
-        cnf_lines.append("c   where r,c,v in {1..9}")
-        cnf_lines.append("c   x_{r,c,v} = true means cell (r,c) contains value v")
+        cnf_lines = [HEADER_COMMENTS]
+        if nb_variables > n ** 3:
+            cnf_lines.append(f"c Variables {n ** 3 + 1}..{nb_variables}: at-most-one ladder auxiliaries")
         cnf_lines.append("c")
         cnf_lines.append("c Initial grid:")
-        for i, row in enumerate(grid, 1):
+        for row_index, row in enumerate(grid, 1):
             row_str = " ".join(str(x) if x != 0 else "." for x in row)
-            cnf_lines.append(f"c   Row {i}: {row_str}")
+            cnf_lines.append(f"c   Row {row_index}: {row_str}")
         cnf_lines.append("c")
         
-        # Contrainte 1: Chaque cellule contient au moins un chiffre
-        for row in range(1, self.size + 1):
-            for col in range(1, self.size + 1):
-                clause = []
-                for value in range(1, self.size + 1):
-                    var = self.encode_variable(row, col, value)
-                    clause.append(var)
-                clauses.append(clause)
-        
-        # Contrainte 2: Chaque cellule contient au plus un chiffre
-        for row in range(1, self.size + 1):
-            for col in range(1, self.size + 1):
-                for v1 in range(1, self.size + 1):
-                    for v2 in range(v1 + 1, self.size + 1):
-                        var1 = self.encode_variable(row, col, v1)
-                        var2 = self.encode_variable(row, col, v2)
-                        clauses.append([-var1, -var2])
-        
-        # Contrainte 3: Chaque ligne contient chaque chiffre exactement une fois
-        for row in range(1, self.size + 1):
-            for value in range(1, self.size + 1):
-                # Au moins une fois
-                clause = []
-                for col in range(1, self.size + 1):
-                    var = self.encode_variable(row, col, value)
-                    clause.append(var)
-                clauses.append(clause)
-                
-                # Au plus une fois
-                for c1 in range(1, self.size + 1):
-                    for c2 in range(c1 + 1, self.size + 1):
-                        var1 = self.encode_variable(row, c1, value)
-                        var2 = self.encode_variable(row, c2, value)
-                        clauses.append([-var1, -var2])
-        
-        # Contrainte 4: Chaque colonne contient chaque chiffre exactement une fois
-        for col in range(1, self.size + 1):
-            for value in range(1, self.size + 1):
-                # Au moins une fois
-                clause = []
-                for row in range(1, self.size + 1):
-                    var = self.encode_variable(row, col, value)
-                    clause.append(var)
-                clauses.append(clause)
-                
-                # Au plus une fois
-                for r1 in range(1, self.size + 1):
-                    for r2 in range(r1 + 1, self.size + 1):
-                        var1 = self.encode_variable(r1, col, value)
-                        var2 = self.encode_variable(r2, col, value)
-                        clauses.append([-var1, -var2])
-        
-        # Contrainte 5: Chaque sous-grille 3x3 contient chaque chiffre exactement une fois
-        for box_row in range(3):
-            for box_col in range(3):
-                for value in range(1, self.size + 1):
-                    # Au moins une fois dans la box
-                    clause = []
-                    for r in range(3):
-                        for c in range(3):
-                            row = box_row * 3 + r + 1
-                            col = box_col * 3 + c + 1
-                            var = self.encode_variable(row, col, value)
-                            clause.append(var)
-                    clauses.append(clause)
-                    
-                    # Au plus une fois dans la box
-                    cells = []
-                    for r in range(3):
-                        for c in range(3):
-                            row = box_row * 3 + r + 1
-                            col = box_col * 3 + c + 1
-                            cells.append((row, col))
-                    
-                    for i in range(len(cells)):
-                        for j in range(i + 1, len(cells)):
-                            r1, c1 = cells[i]
-                            r2, c2 = cells[j]
-                            var1 = self.encode_variable(r1, c1, value)
-                            var2 = self.encode_variable(r2, c2, value)
-                            clauses.append([-var1, -var2])
-        
-        # Contrainte 6: Cellules pré-remplies
-        for row in range(1, self.size + 1):
-            for col in range(1, self.size + 1):
-                value = grid[row - 1][col - 1]
-                if value != 0:  # Cellule pré-remplie
-                    var = self.encode_variable(row, col, value)
-                    clauses.append([var])
-        
-        nb_clauses = len(clauses)
-        
         # Ligne p cnf
         cnf_lines.append(f"p cnf {nb_variables} {nb_clauses}")
+        header = ("\n".join(cnf_lines) + "\n").encode('ascii')
         
-        # Ajouter toutes les clauses
-        for clause in clauses:
-            clause_str = " ".join(map(str, clause)) + " 0"
-            cnf_lines.append(clause_str)
+        def chunks() -> Iterator[bytes]:
+            yield header
+            for serialize, lits, mask in blocks:
+                block = serialize(lits, mask)
+                if block:
+                    yield block
         
-        cnf_content = "\n".join(cnf_lines)
-        return cnf_content, nb_variables, nb_clauses
+        return nb_variables, nb_clauses, chunks()
     
-    def plot_sudoku(self, initial_grid: List[List[int]], 
-                    solved_grid: List[List[int]]) -> str:
+    def write_cnf(self, out: BinaryIO, grid: Grid) -> Tuple[int, int]:
+        """
+        Écrit le CNF dans un flux binaire (fichier, BytesIO, stdin d'un processus)
+
+        Returns:
+            (nb_variables, nb_clauses)
+        """
+        nb_variables, nb_clauses, chunks = self.iter_cnf_chunks(grid)
+        out.writelines(chunks)
+        return nb_variables, nb_clauses
+    
+    def generate_cnf(self, grid: Grid) -> Tuple[str, int, int]:
+        """
+        Génère le CNF complet en mémoire (cf. write_cnf)
+
+        Returns:
+            (cnf_content, nb_variables, nb_clauses)
+        """
+        buffer = io.BytesIO()
+        nb_variables, nb_clauses = self.write_cnf(buffer, grid)
+        return buffer.getvalue().decode('ascii'), nb_variables, nb_clauses
+    
+    def plot_sudoku(self, initial_grid: Grid, solved_grid: Grid) -> str:
         """
         Génère une visualisation du Sudoku résolu
         
+        L'image est assemblée directement en NumPy à partir de tuiles
+        précalculées (une par chiffre et type de case), en mode palette,
+        sur un fond contenant déjà les titres et la légende
+        
         Args:
-            initial_grid: Grille initiale (avec 0 pour cases vides)
-            solved_grid: Grille résolue
+            initial_grid: Grille initiale (avec 0 pour cases vides), listes ou tableau 9x9
+            solved_grid: Grille résolue, listes ou tableau 9x9
             
         Returns:
-            Image encodée en base64
+            Image PNG encodée en base64
         """
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 8))
-        
-        # Fonction pour dessiner une grille
-        def draw_grid(ax, grid, title, show_colors=False):
-            ax.set_xlim(0, 9)
-            ax.set_ylim(0, 9)
-            ax.set_aspect('equal')
-            ax.axis('off')
-            ax.set_title(title, fontsize=18, fontweight='bold', pad=20)
-            
-            # Dessiner les lignes de la grille
-            for i in range(10):
-                lw = 3 if i % 3 == 0 else 0.5
-                ax.plot([0, 9], [i, i], 'k-', linewidth=lw)
-                ax.plot([i, i], [0, 9], 'k-', linewidth=lw)
-            
-            # Remplir les cellules
-            for i in range(9):
-                for j in range(9):
-                    val = grid[i][j]
-                    if val != 0:
-                        # Colorier le fond des cellules pré-remplies
-                        if show_colors and initial_grid[i][j] != 0:
-                            rect = plt.Rectangle((j, 8-i), 1, 1, 
-                                                facecolor='lightblue', 
-                                                edgecolor='none')
-                            ax.add_patch(rect)
-                        
-                        # Texte
-                        color = 'black' if initial_grid[i][j] != 0 else 'blue'
-                        weight = 'bold' if initial_grid[i][j] != 0 else 'normal'
-                        ax.text(j + 0.5, 8 - i + 0.5, str(val),
-                               ha='center', va='center',
-                               fontsize=20, color=color, fontweight=weight)
-        
-        # Grille initiale
-        draw_grid(ax1, initial_grid, "Grille Initiale", show_colors=False)
-        
-        # Grille résolue
-        draw_grid(ax2, solved_grid, "Grille Résolue", show_colors=True)
-        
-        # Ajouter une légende
-        legend_text = "Noir/Fond bleu: Cases initiales\nBleu: Cases calculées"
-        fig.text(0.5, 0.02, legend_text, ha='center', fontsize=12,
-                bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
-        
-        plt.tight_layout()
+        initial = np.asarray(initial_grid, dtype=np.intp)
+        solved = np.asarray(solved_grid, dtype=np.intp)
+        
+        # Tuile de chaque case : cases initiales en gras (sur fond bleu dans
+        # la grille résolue), cases calculées en bleu
+        panels = (
+            np.where(initial != 0, 9 + initial, 0),
+            np.where(initial != 0, 18 + initial, solved),
+        )
+        
+        canvas = _BACKGROUND.copy()
+        size = 9 * _CELL_SIZE
+        for left, tiles in zip(_PANEL_LEFTS, panels):
+            # (lignes, colonnes, C, C) -> (lignes * C, colonnes * C)
+            cells = _TILES[tiles].transpose(0, 2, 1, 3).reshape(size, size)
+            panel = canvas[_PANEL_TOP:_PANEL_TOP + _PANEL_SIZE, left:left + _PANEL_SIZE]
+            panel[:size, :size] = cells
+            panel[_GRID_LINES] = 1
+        
+        image = Image.fromarray(canvas, mode='P')
+        image.putpalette(_PALETTE)
         
         # Convertir en base64
         buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-        plt.close()
-        
-        return image_base64
+        image.save(buffer, format='PNG')
+        return base64.b64encode(buffer.getvalue()).decode('utf-8')
+    
+    def render_plot(self, initial_grid: Grid, solved_grid: Grid) -> Optional[str]:
+        """Visualisation de la grille résolue (base64), None en cas d'erreur de tracé"""
+        try:
+            return self.plot_sudoku(initial_grid, solved_grid)
+        except Exception as e:
+            print(f"Erreur lors de la génération du plot: {e}")
+            return None
     
-    def solve(self, grid: List[List[int]]) -> Dict:
+    def solve(self, grid: List[List[int]], include_cnf: bool = True, plot: bool = True) -> Dict:
         """
         Résout le Sudoku
         
         Args:
             grid: Grille 9x9 avec 0 pour les cases vides, 1-9 pour les cases remplies
+            include_cnf: garder une copie du CNF pour la réponse (sinon
+                         "cnf_file" vaut None et le CNF n'est jamais assemblé)
+            plot: générer la visualisation (sinon "plot" vaut None et
+                  l'image peut être produite à part avec render_plot)
             
         Returns:
             Dictionnaire avec:
             - satisfiable: bool
             - solution: List[List[int]] ou None (la grille résolue)
-            - cnf_file: str (le fichier CNF généré)
+            - cnf_file: str (le fichier CNF généré, None si résolu par propagation
+              ou sans include_cnf)
+            - fast_path: bool (résolu par propagation, sans GopherSAT)
             - stats: Dict (statistiques)
         """
-        # Validation
-        if len(grid) != 9 or any(len(row) != 9 for row in grid):
-            return {"error": "La grille doit être 9x9"}
+        cells, result = self._prepare(grid, plot)
+        if result is not None:
+            return result
         
-        # Vérifier que toutes les valeurs sont entre 0 et 9
-        for row in grid:
-            for val in row:
-                if not (0 <= val <= 9):
-                    return {"error": f"Valeur invalide: {val}. Les valeurs doivent être entre 0 (vide) et 9"}
-        
-        # Générer le CNF
+        # Générer le CNF (les blocs sont sérialisés pendant la résolution)
         try:
-            cnf_content, nb_vars, nb_clauses = self.generate_cnf(grid)
+            nb_vars, nb_clauses, chunks = self.iter_cnf_chunks(cells)
         except Exception as e:
             return {"error": f"Erreur lors de la génération du CNF: {str(e)}"}
         
-        # Créer un fichier temporaire avec encodage UTF-8
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.cnf', delete=False, newline='\n', encoding='utf-8') as temp_file:
-            temp_path = temp_file.name
-            temp_file.write(cnf_content)
-            temp_file.write('\n')
-            temp_file.flush()
+        stats = self._stats(cells, nb_vars, nb_clauses)
+        cnf_parts = []  # Copie du CNF pour la réponse (cnf_file)
+        
+        def cnf_chunks():
+            for chunk in chunks:
+                if include_cnf:
+                    cnf_parts.append(chunk)
+                yield chunk
         
         try:
-            # Exécuter GopherSAT
-            result = subprocess.run(
-                [self.gophersat_path, temp_path],
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
-            
-            # Parser la sortie
-            stdout_lines = result.stdout.strip().split('\n')
-            
-            status = "UNKNOWN"
-            solution_vars = []
-            
-            for line in stdout_lines:
-                line = line.strip()
-                if line.startswith('s '):
-                    status = line[2:].strip()
-                elif line.startswith('v '):
-                    vars_str = line[2:].strip()
-                    solution_vars.extend(vars_str.split())
-            
-            # Nettoyer la solution
-            if solution_vars and solution_vars[-1] == '0':
-                solution_vars = solution_vars[:-1]
-            
-            if status == "SATISFIABLE":
-                # Décoder la solution
-                solved_grid = [[0] * 9 for _ in range(9)]
-                
-                for var_str in solution_vars:
-                    if var_str != '0':
-                        var_num = int(var_str)
-                        if var_num > 0:  # Variable vraie
-                            row, col, value = self.decode_variable(var_num)
-                            solved_grid[row - 1][col - 1] = value
-                
-                # Générer la visualisation
-                try:
-                    plot_image = self.plot_sudoku(grid, solved_grid)
-                except Exception as e:
-                    plot_image = None
-                    print(f"Erreur lors de la génération du plot: {e}")
-                
-                return {
-                    "satisfiable": True,
-                    "solution": solved_grid,
-                    "message": "Sudoku résolu avec succès",
-                    "plot": plot_image,  # Image base64
-                    "cnf_file": cnf_content,
-                    "stats": {
-                        "nb_variables": nb_vars,
-                        "nb_clauses": nb_clauses,
-                        "filled_cells": sum(1 for row in grid for val in row if val != 0),
-                        "empty_cells": sum(1 for row in grid for val in row if val == 0)
-                    }
-                }
-            else:
-                return {
-                    "satisfiable": False,
-                    "solution": None,
-                    "message": "Aucune solution n'existe pour ce Sudoku (grille invalide)",
-                    "cnf_file": cnf_content,
-                    "stats": {
-                        "nb_variables": nb_vars,
-                        "nb_clauses": nb_clauses,
-                        "filled_cells": sum(1 for row in grid for val in row if val != 0),
-                        "empty_cells": sum(1 for row in grid for val in row if val == 0)
-                    }
-                }
-                
+            # Exécuter GopherSAT en lui envoyant le CNF au fil de sa génération
+            result = self.backend.run_stream(cnf_chunks(), timeout=60, text=False)
+            cnf_content = b"".join(cnf_parts).decode('ascii') if include_cnf else None
+            return self._decode_result(cells, result.stdout, stats, cnf_content, plot)
         except subprocess.TimeoutExpired:
             return {"error": "Timeout lors de l'exécution du solveur (>60s)"}
         except Exception as e:
             return {"error": f"Erreur lors de l'exécution: {str(e)}"}
-        finally:
-            # Nettoyer le fichier temporaire
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
\ No newline at end of file
+    
+    def _prepare(self, grid: List[List[int]], plot: bool) -> Tuple[Optional[np.ndarray], Optional[Dict]]:
+        """
+        Validation et pré-solveur, communs à solve et prepare_sudoku_grid
+        
+        Returns:
+            (cells, None) s'il faut passer par GopherSAT, sinon (None, résultat
+            final : erreur ou grille résolue par propagation)
+        """
+        # Validation
+        if len(grid) != 9 or any(len(row) != 9 for row in grid):
+            return None, {"error": "La grille doit être 9x9"}
+        
+        # Vérifier que toutes les valeurs sont entre 0 et 9
+        cells = np.asarray(grid)
+        invalid = cells[(cells < 0) | (cells > 9)]
+        if len(invalid):
+            return None, {"error": f"Valeur invalide: {invalid[0]}. Les valeurs doivent être entre 0 (vide) et 9"}
+        
+        # La grille devient un seul bloc contigu de 81 octets, utilisé par
+        # toutes les étapes ; les listes ne sont rétablies que pour la réponse
+        cells = cells.astype(np.int8)
+        
+        # Pré-solveur : les grilles faciles sont résolues par propagation seule
+        solved_grid = solve_by_propagation(cells)
+        if solved_grid is None:
+            return cells, None
+        
+        plot_image = self.render_plot(cells, solved_grid) if plot else None
+        return None, {
+            "satisfiable": True,
+            "solution": solved_grid,
+            "message": "Sudoku résolu avec succès (propagation de contraintes)",
+            "plot": plot_image,  # Image base64
+            "cnf_file": None,
+            "fast_path": True,
+            "stats": self._stats(cells, 0, 0)
+        }
+    
+    def _stats(self, cells: np.ndarray, nb_vars: int, nb_clauses: int) -> Dict:
+        """Statistiques de la réponse"""
+        filled_cells = int(np.count_nonzero(cells))
+        return {
+            "nb_variables": nb_vars,
+            "nb_clauses": nb_clauses,
+            "filled_cells": filled_cells,
+            "empty_cells": cells.size - filled_cells
+        }
+    
+    def _decode_result(self, cells: np.ndarray, stdout: bytes, stats: Dict,
+                       cnf_content: Optional[str], plot: bool) -> Dict:
+        """Réponse à partir de la sortie de GopherSAT"""
+        # Parser la sortie (une seule passe regex sur les bytes)
+        parsed = parse_output(stdout)
+        status = parsed["status"]
+        model = parsed["model"]
+        
+        if status == "SATISFIABLE":
+            # Décoder la solution (variables vraies, vectorisé - cf. decode_variable) :
+            # seuls les candidats des cases vides comptent, les cases
+            # pré-remplies gardent leur valeur. Variable - 1 = 9 * case + v - 1
+            is_candidate = self.compute_candidates(cells).reshape(-1)
+            true_vars = model[(model > 0) & (model <= self.size ** 3)] - 1
+            cell, value = np.divmod(true_vars[is_candidate[true_vars]], self.size)
+            solved = cells.copy().reshape(-1)
+            solved[cell] = value + 1
+            solved = solved.reshape(self.size, self.size)
+            solved_grid = solved.tolist()
+            
+            # Générer la visualisation
+            plot_image = self.render_plot(cells, solved) if plot else None
+            
+            return {
+                "satisfiable": True,
+                "solution": solved_grid,
+                "message": "Sudoku résolu avec succès",
+                "plot": plot_image,  # Image base64
+                "cnf_file": cnf_content,
+                "fast_path": False,
+                "stats": stats
+            }
+        else:
+            return {
+                "satisfiable": False,
+                "solution": None,
+                "message": "Aucune solution n'existe pour ce Sudoku (grille invalide)",
+                "cnf_file": cnf_content,
+                "fast_path": False,
+                "stats": stats
+            }
+
+
+def render_sudoku_plot(initial_grid: Grid, solved_grid: Grid) -> Optional[str]:
+    """
+    Visualisation d'une grille résolue (base64), hors de la résolution
+    Fonction de module pour pouvoir être exécutée dans un ProcessPoolExecutor
+    """
+    return SudokuSAT(gophersat_path=None).render_plot(initial_grid, solved_grid)
+
+
+def solve_sudoku_grid(backend: SolverBackend, grid: Grid, include_cnf: bool = True,
+                      plot: bool = True) -> Dict:
+    """
+    Résout une grille avec le backend donné (cf. SudokuSAT.solve)
+    Fonction de module pour pouvoir être exécutée dans un ProcessPoolExecutor :
+    la génération du CNF se fait alors hors du GIL du serveur
+    """
+    return SudokuSAT(backend.gophersat_path, backend=backend).solve(grid, include_cnf=include_cnf, plot=plot)
+
+
+def prepare_sudoku_grid(grid: Grid) -> Dict:
+    """
+    Partie CPU de SudokuSAT.solve, sans GopherSAT : validation, propagation,
+    CNF complet. Fonction de module pour un ProcessPoolExecutor ; l'étape SAT
+    se fait ensuite dans le serveur (finish_sudoku_grid), où le backend garde
+    ses processus GopherSAT préchauffés (WarmPoolBackend)
+    
+    Returns:
+        Le résultat final (erreur, résolu par propagation), ou
+        {"cells", "cnf": bytes, "stats"} à passer à finish_sudoku_grid
+    """
+    sudoku = SudokuSAT(gophersat_path=None)
+    cells, result = sudoku._prepare(grid, plot=False)
+    if result is not None:
+        return result
+    try:
+        nb_vars, nb_clauses, chunks = sudoku.iter_cnf_chunks(cells)
+        cnf = b"".join(chunks)
+    except Exception as e:
+        return {"error": f"Erreur lors de la génération du CNF: {str(e)}"}
+    return {"cells": cells, "cnf": cnf, "stats": sudoku._stats(cells, nb_vars, nb_clauses)}
+
+
+async def finish_sudoku_grid(backend: SolverBackend, prepared: Dict, include_cnf: bool = True) -> Dict:
+    """
+    Étape SAT d'une grille préparée par prepare_sudoku_grid (sans visualisation)
+    Les résultats finaux sont rendus tels quels
+    """
+    if "cnf" not in prepared:
+        return prepared
+    sudoku = SudokuSAT(backend.gophersat_path, backend=backend)
+    try:
+        result = await backend.run_async(prepared["cnf"], timeout=60)
+    except subprocess.TimeoutExpired:
+        return {"error": "Timeout lors de l'exécution du solveur (>60s)"}
+    except Exception as e:
+        return {"error": f"Erreur lors de l'exécution: {str(e)}"}
+    cnf_content = prepared["cnf"].decode('ascii') if include_cnf else None
+    return sudoku._decode_result(prepared["cells"], result.stdout, prepared["stats"], cnf_content, plot=False)
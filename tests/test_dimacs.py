@@ -0,0 +1,61 @@
+"""
+Test de la lecture des CNF DIMACS (parse_dimacs, utilisé par PySATBackend)
+Ne lance ni l'API ni GopherSAT
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from gophersat_backend import PySATBackend, PySATSolver, parse_dimacs, parse_output
+
+# Fichier au format SATLIB : commentaires, puis "%" et "0" après la dernière clause
+SATLIB_CNF = b"""c uf3-01.cnf
+p cnf 3 2
+ 1 -2 0
+ 2  3 0
+%
+0
+
+"""
+
+def test_satlib_trailer():
+    """La fin de fichier "%" de SATLIB n'est pas lue comme des clauses"""
+    nb_vars, clauses = parse_dimacs(SATLIB_CNF)
+    assert nb_vars == 3
+    assert clauses == [[1, -2], [2, 3]]
+
+def test_invalid_literal():
+    """Un littéral non entier donne une ValueError explicite"""
+    try:
+        parse_dimacs(b"p cnf 2 1\n1 x 0\n")
+    except ValueError as e:
+        assert "CNF DIMACS invalide" in str(e)
+    else:
+        raise AssertionError("ValueError attendue")
+
+def test_parse_output():
+    """Les lignes "v" sont rassemblées, sans les 0"""
+    parsed = parse_output(b"c ok\ns SATISFIABLE\nv 1 -2\nv 3 0\n")
+    assert parsed["status"] == "SATISFIABLE"
+    assert parsed["model"].tolist() == [1, -2, 3]
+    assert parse_output(b"s UNSATISFIABLE\n")["model"].tolist() == []
+
+def test_pysat_backend():
+    """PySATBackend résout un fichier SATLIB et signale un fichier illisible comme GopherSAT"""
+    if PySATSolver is None:
+        print("python-sat non installé : test PySATBackend ignoré")
+        return
+    backend = PySATBackend("", "glucose4")
+    result = backend.run(SATLIB_CNF)
+    assert result.returncode == 0
+    assert parse_output(result.stdout.encode())["status"] == "SATISFIABLE"
+
+    result = backend.run(b"p cnf 2 1\n1 x 0\n")
+    assert result.returncode != 0
+    assert "CNF DIMACS invalide" in result.stderr
+
+if __name__ == "__main__":
+    for test in (test_satlib_trailer, test_invalid_literal, test_parse_output, test_pysat_backend):
+        test()
+        print(f"✓ {test.__name__}")
+    print("\n✅ TESTS PASSÉS")
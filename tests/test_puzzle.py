@@ -0,0 +1,90 @@
+"""
+Test du taquin : A* bidirectionnel contre A* simple, pour chaque heuristique
+Ne lance ni l'API ni GopherSAT
+"""
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import puzzle_solver
+from puzzle_solver import MOVES, PuzzleState, create_example_states, load_pdb, solve_puzzle
+
+HEURISTICS = ('manhattan', 'misplaced', 'euclidean', 'pdb')
+
+def random_board(goal: PuzzleState, steps: int, rng: random.Random):
+    """Grille atteignable : marche aléatoire de la case vide depuis le but"""
+    key, empty = goal.key, goal.empty_idx
+    for _ in range(steps):
+        j, _ = rng.choice(MOVES[empty])
+        moved = (key >> (4 * j)) & 0xF
+        key = (key & ~(0xF << (4 * j))) | (moved << (4 * empty))
+        empty = j
+    return PuzzleState.from_key(key, empty).board
+
+def replay(board, actions):
+    """Applique les actions (déplacements de la case vide) et retourne la grille finale"""
+    state = PuzzleState(board)
+    for action in actions:
+        state = next(succ for succ in state.successors() if succ.action == action)
+    return state.board
+
+def test_bidirectional_matches_unidirectional():
+    """Même longueur de plan optimal dans les deux modes, et plans valides"""
+    rng = random.Random(0)
+    _, goal = create_example_states()
+    boards = [random_board(goal, rng.randint(5, 30), rng) for _ in range(8)]
+    for heuristic in HEURISTICS:
+        for board in boards:
+            single, _ = solve_puzzle(board, goal.board, heuristic, bidirectional=False)
+            both, _ = solve_puzzle(board, goal.board, heuristic, bidirectional=True)
+            assert single is not None and both is not None, (heuristic, board)
+            assert len(single) == len(both), (heuristic, board, len(single), len(both))
+            assert replay(board, both) == goal.board, (heuristic, board)
+
+def test_bidirectional_pdb_builds_goal_database_only():
+    """La recherche arrière ne construit pas de base de motifs par initial"""
+    rng = random.Random(1)
+    _, goal = create_example_states()
+    load_pdb.cache_clear()
+    for _ in range(4):
+        solve_puzzle(random_board(goal, 20, rng), goal.board, 'pdb', bidirectional=True)
+    assert load_pdb.cache_info().currsize == 1
+
+def test_pdb_disk_cache_is_validated_and_bounded():
+    """Un fichier de base altéré est reconstruit ; le répertoire reste borné"""
+    _, goal = create_example_states()
+    saved_dir, saved_max = puzzle_solver.PDB_CACHE_DIR, puzzle_solver.PDB_CACHE_MAX_FILES
+    with tempfile.TemporaryDirectory() as cache_dir:
+        puzzle_solver.PDB_CACHE_DIR, puzzle_solver.PDB_CACHE_MAX_FILES = cache_dir, 1
+        try:
+            load_pdb.cache_clear()
+            expected = load_pdb(goal.key)
+            path = os.path.join(cache_dir, f"{goal.key:09x}.pdb")
+            assert puzzle_solver._read_pdb(path, goal.key) == expected
+
+            # Base de la bonne taille mais fausse (distance du but non nulle)
+            data = bytearray(Path(path).read_bytes())
+            data[puzzle_solver.PDB_HEADER.size + puzzle_solver._rank(goal.key)] = 5
+            Path(path).write_bytes(bytes(data))
+            assert puzzle_solver._read_pdb(path, goal.key) is None
+            load_pdb.cache_clear()
+            assert load_pdb(goal.key) == expected
+            assert puzzle_solver._read_pdb(path, goal.key) == expected
+
+            # Une deuxième base évince la première (PDB_CACHE_MAX_FILES = 1)
+            other = PuzzleState([[1, 2, 3], [4, 5, 6], [7, 0, 8]])
+            load_pdb(other.key)
+            assert os.listdir(cache_dir) == [f"{other.key:09x}.pdb"]
+        finally:
+            puzzle_solver.PDB_CACHE_DIR, puzzle_solver.PDB_CACHE_MAX_FILES = saved_dir, saved_max
+            load_pdb.cache_clear()
+
+if __name__ == "__main__":
+    for test in (test_bidirectional_matches_unidirectional, test_bidirectional_pdb_builds_goal_database_only,
+                 test_pdb_disk_cache_is_validated_and_bounded):
+        test()
+        print(f"✓ {test.__name__}")
+    print("\n✅ TESTS PASSÉS")
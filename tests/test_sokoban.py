@@ -7,11 +7,14 @@ from pathlib import Path
 
 API_URL = "http://127.0.0.1:8000"
 
+# Taille des tranches de base64 décodées à la fois (multiple de 4)
+DECODE_CHUNK = 1 << 16
+
 def save_image(base64_data, filename):
-    """Sauvegarde une image base64 en fichier PNG"""
-    image_data = base64.b64decode(base64_data)
-    with open(filename, 'wb') as f:
-        f.write(image_data)
+    """Sauvegarde une image base64 en fichier PNG (décodée par tranches, sans copie complète)"""
+    with open(filename, 'wb', buffering=1 << 20) as f:
+        for start in range(0, len(base64_data), DECODE_CHUNK):
+            f.write(base64.b64decode(base64_data[start:start + DECODE_CHUNK]))
     print(f"✓ Image sauvegardée: {filename}")
 
 def test_sokoban_simple():
@@ -0,0 +1,108 @@
+"""
+Test des recherches du Sokorridor : BFS bidirectionnel et A* contre BFS,
+validité des plans, noyaux (corps Python) contre les versions à dictionnaires
+Ne lance ni l'API ni GopherSAT
+"""
+import random
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import sokorridor_search
+from sokorridor_search import (WORKER_BITS, SokorridorSearchSolver, SokorridorState, _bfs_kernel,
+                               _dfs_kernel, encode, mask_boxes, successors)
+
+# Corps Python des noyaux, même quand Numba les a compilés
+BFS_KERNEL = getattr(_bfs_kernel, 'py_func', _bfs_kernel)
+DFS_KERNEL = getattr(_dfs_kernel, 'py_func', _dfs_kernel)
+
+def random_corridors(count: int, rng: random.Random):
+    """
+    Couloirs aléatoires (worker, caisses, goals, cases) : goals atteints par
+    une marche aléatoire depuis l'état initial, un couloir sur quatre avec
+    des goals tirés au hasard (souvent sans solution)
+    """
+    corridors = []
+    for i in range(count):
+        num_cells = rng.randint(5, 11)
+        cells = rng.sample(range(num_cells), rng.randint(1, 3) + 1)
+        worker, boxes = cells[0], cells[1:]
+        if i % 4 == 0:
+            goals = rng.sample(range(num_cells), len(boxes))
+        else:
+            key = encode(worker, sum(1 << b for b in boxes))
+            for _ in range(rng.randint(5, 80)):
+                moves = successors(key, num_cells)
+                if not moves:
+                    break  # Worker coincé entre deux paires de caisses
+                key = rng.choice(moves)[0]
+            goals = list(mask_boxes(key >> WORKER_BITS))
+        corridors.append((worker, boxes, goals, num_cells))
+    return corridors
+
+def make_solver(worker, boxes, goals, num_cells):
+    return SokorridorSearchSolver(SokorridorState(worker, boxes, num_cells=num_cells), goals)
+
+def replay(solver, plan):
+    """Rejoue le plan avec successors et vérifie qu'il finit sur le but"""
+    key = solver.initial_key
+    for state, action in plan:
+        assert (state.key, action) in successors(key, solver.num_cells), (key, state, action)
+        key = state.key
+    assert key >> WORKER_BITS == solver.goals_mask
+
+def kernel_args(solver):
+    """Arguments des noyaux (indice dense masque * num_cells + worker, cf. _kernel_args)"""
+    mask = solver.initial_key >> WORKER_BITS
+    worker = solver.initial_key & ((1 << WORKER_BITS) - 1)
+    return mask * solver.num_cells + worker, solver.goals_mask, solver.num_cells
+
+def as_keys(plan):
+    return None if plan is None else [(state.key, action) for state, action in plan]
+
+def test_search_lengths_match_bfs():
+    """bibfs et astar trouvent un plan de même longueur que bfs, et tous les plans sont valides"""
+    for corridor in random_corridors(60, random.Random(0)):
+        reference = make_solver(*corridor).bfs()
+        for algorithm in ('bibfs', 'astar', 'dfs'):
+            solver = make_solver(*corridor)
+            plan = getattr(solver, algorithm)()
+            assert (plan is None) == (reference is None), (algorithm, corridor)
+            if plan is None:
+                continue
+            if algorithm != 'dfs':  # DFS : plan valide, pas forcément minimal
+                assert len(plan) == len(reference), (algorithm, corridor, len(plan), len(reference))
+            replay(solver, plan)
+        if reference is not None:
+            replay(make_solver(*corridor), reference)
+
+def test_kernels_match_dict_searches():
+    """Les noyaux reproduisent chemins et stats des versions à dictionnaires"""
+    # Sans njit, bfs et dfs prennent les versions à dictionnaires même si Numba est installé
+    saved_njit, sokorridor_search.njit = sokorridor_search.njit, None
+    try:
+        for corridor in random_corridors(40, random.Random(1)):
+            check_kernels(corridor)
+    finally:
+        sokorridor_search.njit = saved_njit
+
+def check_kernels(corridor):
+    solver = make_solver(*corridor)
+    plan = solver.bfs()
+    kernel = make_solver(*corridor)
+    kernel_plan = kernel._from_kernel(*BFS_KERNEL(*kernel_args(kernel)))
+    assert as_keys(kernel_plan) == as_keys(plan), ('bfs', corridor)
+    assert kernel.stats == solver.stats, ('bfs', corridor, kernel.stats, solver.stats)
+
+    for max_depth in (None, 2, 6):
+        plan = solver.dfs(max_depth=max_depth)
+        kernel_plan = kernel._from_kernel(*DFS_KERNEL(*kernel_args(kernel),
+                                                      -1 if max_depth is None else max_depth))
+        assert as_keys(kernel_plan) == as_keys(plan), ('dfs', max_depth, corridor)
+        assert kernel.stats == solver.stats, ('dfs', max_depth, corridor, kernel.stats, solver.stats)
+
+if __name__ == "__main__":
+    for test in (test_search_lengths_match_bfs, test_kernels_match_dict_searches):
+        test()
+        print(f"✓ {test.__name__}")
+    print("\n✅ TESTS PASSÉS")
@@ -1,122 +1,277 @@
 """
 Script de test pour vérifier que les visualisations fonctionnent
+Les résolutions (table TESTS) partent en une seule requête POST /batch ; les
+visualisations sont ensuite récupérées en parallèle (asyncio)
+
+Avec --runs N : test de charge (N requêtes par endpoint, --concurrency en vol)
+
+HTTP/2 est utilisé si h2 est installé (pip install "httpx[http2]") et que
+le serveur le négocie (derrière un proxy HTTPS : API_URL=https://...)
 """
-import requests
-import base64
+import argparse
+import asyncio
+import time
+import httpx
+import orjson
+import binascii
+import os
+from http import HTTPStatus
 from pathlib import Path
+from typing import Optional
+
+try:
+    import h2  # noqa: F401 (extra httpx[http2])
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+API_URL = os.environ.get("API_URL", "http://127.0.0.1:8000")
+
+# Entrées des tests, figées en tuples (orjson les sérialise comme des listes)
+_GRAPH_V = ("A", "B", "C", "D")
+_GRAPH_E = (("A", "B"), ("A", "C"), ("B", "C"), ("B", "D"), ("C", "D"))
+_GRAPH_K = ("r", "v", "b")
+
+_SUDOKU_GRID = (
+    (5, 3, 0, 0, 7, 0, 0, 0, 0),
+    (6, 0, 0, 1, 9, 5, 0, 0, 0),
+    (0, 9, 8, 0, 0, 0, 0, 6, 0),
+    (8, 0, 0, 0, 6, 0, 0, 0, 3),
+    (4, 0, 0, 8, 0, 3, 0, 0, 1),
+    (7, 0, 0, 0, 2, 0, 0, 0, 6),
+    (0, 6, 0, 0, 0, 0, 2, 8, 0),
+    (0, 0, 0, 4, 1, 9, 0, 0, 5),
+    (0, 0, 0, 0, 8, 0, 0, 7, 9),
+)
+
+GRAPH_DATA = {"V": _GRAPH_V, "E": _GRAPH_E, "K": _GRAPH_K}
+SUDOKU_DATA = {"grid": _SUDOKU_GRID}
+
+# Tests : (titre, endpoint, entrée, image produite)
+TESTS = [
+    ("Coloriage de Graphe", "/graph-coloring", GRAPH_DATA, "graph_coloring_result.png"),
+    ("Sudoku", "/sudoku", SUDOKU_DATA, "sudoku_result.png"),
+]
+
+# Corps de la requête /batch (une sous-requête par test, nommée par son
+# endpoint), sérialisé une seule fois avec orjson
+# (ce test vérifie les visualisations : plot reste activé)
+BATCH_BODY = orjson.dumps({"requests": {
+    path: {"path": path, "body": payload, "params": {"plot": True}}
+    for _, path, payload, _ in TESTS
+}})
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Corps des endpoints individuels, pour le test de charge
+STRESS_BODIES = {path: orjson.dumps(payload) for _, path, payload, _ in TESTS}
+
+# Affichage des grilles : les cases vides (0) deviennent "."
+EMPTY_CELL = str.maketrans({"0": "."})
 
-API_URL = "http://127.0.0.1:8000"
-
-def save_image(base64_data, filename):
-    """Sauvegarde une image base64 en fichier PNG"""
-    image_data = base64.b64decode(base64_data)
-    with open(filename, 'wb') as f:
-        f.write(image_data)
-    print(f"✓ Image sauvegardée: {filename}")
-
-def test_graph_coloring():
-    """Test de coloriage de graphe avec visualisation"""
-    print("\n" + "="*60)
-    print("TEST: Coloriage de Graphe")
-    print("="*60)
-    
-    data = {
-        "V": ["A", "B", "C", "D"],
-        "E": [["A", "B"], ["A", "C"], ["B", "C"], ["B", "D"], ["C", "D"]],
-        "K": ["r", "v", "b"]
-    }
-    
+# Séparateurs de l'affichage, construits une seule fois
+SEP = "=" * 60
+BANNER = "\n" + SEP
+
+# Taille des tranches de base64 décodées à la fois (multiple de 4)
+DECODE_CHUNK = 1 << 16
+
+# En dessous de 1 Mio décodé, l'image est écrite d'un seul os.write
+SMALL_IMAGE_B64 = (1 << 20) // 3 * 4
+
+def banner(title):
+    """Affiche l'en-tête d'un test"""
+    print(f"{BANNER}\nTEST: {title}\n{SEP}")
+
+def make_client(limits: httpx.Limits) -> httpx.AsyncClient:
+    """
+    Client partagé par les tests ; en HTTP/2 (si disponible) les requêtes
+    simultanées sont multiplexées sur une seule connexion
+    """
+    return httpx.AsyncClient(base_url=API_URL, timeout=30.0, limits=limits, http2=HTTP2_AVAILABLE)
+
+def handle(response: dict) -> Optional[dict]:
+    """Corps d'une sous-réponse du lot ; None (après affichage de l'erreur) si elle a échoué"""
+    if response["status_code"] != HTTPStatus.OK:
+        print(f"\n✗ Erreur HTTP {response['status_code']}\n{response['body']}")
+        return None
+    return response["body"]
+
+def save_image(base64_data, filename) -> int:
+    """
+    Sauvegarde une image base64 (str ou bytes) en fichier PNG : d'un seul appel
+    système pour une petite image, sinon décodée par tranches (mémoire bornée
+    à une tranche et au tampon d'écriture) ; retourne la taille écrite
+    Bloquant : appelé via asyncio.to_thread depuis les tests, qui affichent le résultat
+    """
+    if len(base64_data) < SMALL_IMAGE_B64:
+        image_data = binascii.a2b_base64(base64_data)
+        fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, image_data)
+        finally:
+            os.close(fd)
+        return len(image_data)
+
+    if isinstance(base64_data, bytes):
+        base64_data = memoryview(base64_data)  # tranches sans copie
+    with open(filename, 'wb', buffering=1 << 20) as f:
+        for start in range(0, len(base64_data), DECODE_CHUNK):
+            f.write(binascii.a2b_base64(base64_data[start:start + DECODE_CHUNK]))
+        return f.tell()
+
+async def download_plot(client: httpx.AsyncClient, url: str, filename) -> int:
+    """
+    Télécharge une visualisation en PNG brut (Accept: image/png) directement
+    dans un fichier ; retourne la taille écrite (0 si indisponible)
+    """
+    async with client.stream("GET", url, headers={"Accept": "image/png"}) as response:
+        if response.status_code != HTTPStatus.OK:
+            return 0
+        with open(filename, 'wb', buffering=1 << 20) as f:
+            async for chunk in response.aiter_bytes():
+                f.write(chunk)
+            return f.tell()
+
+def describe_graph(data: dict):
+    """Affiche l'entrée du coloriage"""
     print(f"\nGraphe: V={data['V']}, E={data['E']}, K={data['K']}")
-    
-    response = requests.post(f"{API_URL}/graph-coloring", json=data)
-    
-    if response.status_code == 200:
-        result = response.json()
-        
-        if result["satisfiable"]:
-            print(f"\n✓ SATISFIABLE")
-            print(f"Coloriage φ: {result['phi']}")
-            print(f"Couleurs utilisées: {result['stats']['colors_used']}")
-            
-            if result.get("plot"):
-                save_image(result["plot"], "graph_coloring_result.png")
-            else:
-                print("⚠ Pas de visualisation disponible")
-        else:
-            print(f"\n✗ NON SATISFIABLE: {result['message']}")
-    else:
-        print(f"\n✗ Erreur HTTP {response.status_code}")
-        print(response.text)
-
-def test_sudoku():
-    """Test de Sudoku avec visualisation"""
-    print("\n" + "="*60)
-    print("TEST: Sudoku")
-    print("="*60)
-    
-    data = {
-        "grid": [
-            [5, 3, 0, 0, 7, 0, 0, 0, 0],
-            [6, 0, 0, 1, 9, 5, 0, 0, 0],
-            [0, 9, 8, 0, 0, 0, 0, 6, 0],
-            [8, 0, 0, 0, 6, 0, 0, 0, 3],
-            [4, 0, 0, 8, 0, 3, 0, 0, 1],
-            [7, 0, 0, 0, 2, 0, 0, 0, 6],
-            [0, 6, 0, 0, 0, 0, 2, 8, 0],
-            [0, 0, 0, 4, 1, 9, 0, 0, 5],
-            [0, 0, 0, 0, 8, 0, 0, 7, 9]
-        ]
-    }
-    
+
+def report_graph(result: dict):
+    """Affiche le coloriage trouvé"""
+    print(f"Coloriage φ: {result['phi']}")
+    print(f"Couleurs utilisées: {result['stats']['colors_used']}")
+
+def describe_sudoku(data: dict):
+    """Affiche la grille initiale"""
     print("\nGrille initiale:")
-    for row in data["grid"]:
-        print("  " + " ".join(str(x) if x != 0 else "." for x in row))
-    
-    response = requests.post(f"{API_URL}/sudoku", json=data)
-    
-    if response.status_code == 200:
-        result = response.json()
-        
-        if result["satisfiable"]:
-            print(f"\n✓ SATISFIABLE")
-            print(f"Cases initiales: {result['stats']['filled_cells']}")
-            print(f"Cases résolues: {result['stats']['empty_cells']}")
-            
-            print("\nGrille résolue:")
-            for row in result["solution"]:
-                print("  " + " ".join(str(x) for x in row))
-            
-            if result.get("plot"):
-                save_image(result["plot"], "sudoku_result.png")
-            else:
-                print("⚠ Pas de visualisation disponible")
-        else:
-            print(f"\n✗ NON SATISFIABLE: {result['message']}")
+    print("\n".join("  " + " ".join(map(str, row)).translate(EMPTY_CELL) for row in data["grid"]))
+
+def report_sudoku(result: dict):
+    """Affiche la grille résolue"""
+    stats = result["stats"]
+    print(f"Cases initiales: {stats['filled_cells']}")
+    print(f"Cases résolues: {stats['empty_cells']}")
+
+    print("\nGrille résolue:")
+    print("\n".join("  " + " ".join(map(str, row)) for row in result["solution"]))
+
+# Affichage propre à chaque endpoint : (entrée, résultat)
+REPORTERS = {
+    "/graph-coloring": (describe_graph, report_graph),
+    "/sudoku": (describe_sudoku, report_sudoku),
+}
+
+async def run_test(client: httpx.AsyncClient, title: str, path: str, payload: dict, out_png: str,
+                   response: dict):
+    """Test d'un endpoint avec visualisation (response : sous-réponse du lot)"""
+    describe, report = REPORTERS[path]
+
+    # Requêtes d'abord, affichage ensuite : la sortie des tests
+    # concurrents ne s'entremêle pas
+    result = response["body"] if response["status_code"] == HTTPStatus.OK else None
+
+    # La visualisation est générée après la réponse : récupérée en PNG brut
+    # (une image déjà dans la réponse est décodée hors de la boucle asyncio)
+    plot_size = 0
+    if result and result["satisfiable"]:
+        if result.get("plot"):
+            plot_size = await asyncio.to_thread(save_image, result["plot"], out_png)
+        elif result.get("plot_id"):
+            plot_size = await download_plot(client, f"{path}/plot/{result['plot_id']}", out_png)
+
+    banner(title)
+    describe(payload)
+
+    result = handle(response)
+    if result is None:
+        return
+    if not result["satisfiable"]:
+        print(f"\n✗ NON SATISFIABLE: {result['message']}")
+        return
+
+    print(f"\n✓ SATISFIABLE")
+    report(result)
+
+    if plot_size:
+        print(f"✓ Image sauvegardée: {out_png} ({plot_size} octets)")
     else:
-        print(f"\n✗ Erreur HTTP {response.status_code}")
-        print(response.text)
+        print("⚠ Pas de visualisation disponible")
+
+async def main():
+    """Résout tous les problèmes en un aller-retour, puis lance les tests en même temps"""
+    limits = httpx.Limits(max_keepalive_connections=8)
+    async with make_client(limits) as client:
+        batch = await client.post("/batch", content=BATCH_BODY, headers=JSON_HEADERS)
+        batch.raise_for_status()
+        responses = orjson.loads(batch.content)["responses"]
+        await asyncio.gather(*(run_test(client, *test, responses[test[1]]) for test in TESTS))
+
+async def stress(runs: int, concurrency: int):
+    """
+    Test de charge : runs requêtes par endpoint, au plus concurrency en vol
+    Mêmes entrées à chaque fois : après la première, les réponses viennent
+    du cache du serveur. Seules les statistiques agrégées sont affichées
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    durations = {path: [0] * runs for path in STRESS_BODIES}
+
+    async def timed(client: httpx.AsyncClient, path: str, index: int):
+        async with semaphore:
+            start = time.perf_counter_ns()
+            response = await client.post(path, content=STRESS_BODIES[path], headers=JSON_HEADERS)
+            durations[path][index] = time.perf_counter_ns() - start
+            response.raise_for_status()
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with make_client(limits) as client:
+        start = time.perf_counter()
+        async with asyncio.TaskGroup() as group:
+            for index in range(runs):
+                for path in STRESS_BODIES:
+                    group.create_task(timed(client, path, index))
+        elapsed = time.perf_counter() - start
+
+    print(f"\n{len(STRESS_BODIES) * runs} requêtes en {elapsed:.2f} s "
+          f"({len(STRESS_BODIES) * runs / elapsed:.1f} req/s, concurrence {concurrency})")
+    for path, values in durations.items():
+        values.sort()
+        ms = [value / 1e6 for value in (values[len(values) // 2], values[int(len(values) * 0.95)], values[-1])]
+        print(f"  {path:16} médiane {ms[0]:7.2f} ms   p95 {ms[1]:7.2f} ms   max {ms[2]:7.2f} ms")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Test des visualisations de l'API")
+    parser.add_argument("--runs", type=int, default=0,
+                        help="Test de charge : nombre de requêtes par endpoint (défaut : test simple)")
+    parser.add_argument("--concurrency", type=int, default=20,
+                        help="Requêtes simultanées au plus pendant le test de charge")
+    args = parser.parse_args()
+
+    if args.runs > 0:
+        try:
+            asyncio.run(stress(args.runs, args.concurrency))
+        except* httpx.ConnectError:
+            print("\n✗ ERREUR: Impossible de se connecter à l'API")
+            print(f"Vérifiez que l'API est lancée sur {API_URL}")
+        raise SystemExit
+
     print("\n🎨 Test des Visualisations")
-    print("="*60)
-    
+    print(SEP)
+
     try:
-        test_graph_coloring()
-        test_sudoku()
-        
-        print("\n" + "="*60)
+        asyncio.run(main())
+
+        print(BANNER)
         print("✓ Tests terminés!")
-        print("="*60)
+        print(SEP)
         print("\nImages générées:")
-        print("  - graph_coloring_result.png")
-        print("  - sudoku_result.png")
+        print("\n".join(f"  - {out_png}" for *_, out_png in TESTS))
         print("\nOuvrez ces fichiers pour voir les visualisations!")
-        
-    except requests.exceptions.ConnectionError:
+
+    except httpx.ConnectError:
         print("\n✗ ERREUR: Impossible de se connecter à l'API")
         print(f"Vérifiez que l'API est lancée sur {API_URL}")
         print("Lancez: python gophersat_api.py")
     except Exception as e:
         print(f"\n✗ ERREUR: {e}")
         import traceback
-        traceback.print_exc()
\ No newline at end of file
+        traceback.print_exc()